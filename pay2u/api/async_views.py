@@ -0,0 +1,49 @@
+from django.views import View
+
+from .catalog import CATALOG_COUNTER, aget_catalog
+from .conditional import versioned_get
+from .renderers import json_response
+
+
+@versioned_get(CATALOG_COUNTER)
+class AvailableServicesView(View):
+    async def get(self, request):
+        """
+        Метод получения доступных сервисов.
+
+        Возвращает:
+            Сервисы с тегом "available=True".
+        """
+        return json_response((await aget_catalog()).available())
+
+
+@versioned_get(CATALOG_COUNTER)
+class CategoriesView(View):
+    async def get(self, request, category_name: str):
+        """
+        Метод получения данных о сервисах по категории.
+
+        Параметры:
+            category_name: название категории
+
+        Возвращает:
+            Сервисы по указанной категории.
+        """
+        return json_response(
+            (await aget_catalog()).by_category(category_name)
+        )
+
+
+@versioned_get(CATALOG_COUNTER)
+class ServiceView(View):
+    async def get(self, request, service_name: str):
+        """
+        Метод получения данных о сервисе по названию.
+
+        Параметры:
+            service_name: название сервиса
+
+        Возвращает:
+            Планы подписки указанного сервиса.
+        """
+        return json_response((await aget_catalog()).by_service(service_name))
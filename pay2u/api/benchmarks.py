@@ -0,0 +1,67 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connection
+from django.test.utils import setup_databases, teardown_databases
+
+from users.ledger import InsufficientFunds
+
+OUTCOMES = ("ok", "declined", "errors")
+
+
+@contextmanager
+def bench_database():
+    """
+    Переключает процесс на отдельную тестовую БД на время бенчмарка
+    и удаляет ее после него.
+
+    Параллельные бенчмарки записи фиксируют транзакции из разных
+    потоков, поэтому их нельзя откатить одной транзакцией; рабочая
+    БД при этом не меняется.
+    """
+    old_config = setup_databases(
+        verbosity=0, interactive=False, aliases={DEFAULT_DB_ALIAS}
+    )
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=0)
+
+
+def run_concurrently(threads: int, attempts: int, attempt):
+    """
+    Вызывает attempt(step) attempts раз в каждом из threads потоков,
+    step - номер попытки в потоке начиная с 1.
+
+    Возвращает:
+        Кортеж (количество успешных попыток, отказов из-за нехватки
+        средств и ошибок БД по ключам OUTCOMES, время в секундах).
+    """
+    results = dict.fromkeys(OUTCOMES, 0)
+    lock = threading.Lock()
+
+    def worker():
+        counts = dict.fromkeys(OUTCOMES, 0)
+        try:
+            for step in range(1, attempts + 1):
+                try:
+                    attempt(step)
+                    counts["ok"] += 1
+                except InsufficientFunds:
+                    counts["declined"] += 1
+                except DatabaseError:
+                    counts["errors"] += 1
+        finally:
+            connection.close()
+            with lock:
+                for key, value in counts.items():
+                    results[key] += value
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return results, time.perf_counter() - started
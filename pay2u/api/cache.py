@@ -0,0 +1,335 @@
+import functools
+import hashlib
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.connection import ConnectionProxy
+from rest_framework.response import Response
+
+from .decorators import get_method_decorator
+
+SUBSCRIPTIONS_CACHE = "subscriptions"
+PAYMENTS_CACHE = "payments"
+CACHE_FAMILIES = (SUBSCRIPTIONS_CACHE, PAYMENTS_CACHE)
+
+HITS = "hits"
+MISSES = "misses"
+
+# Области персональных ответов: у каждого пользователя, счёта и платежа
+# свой счётчик поколений, идентификатор берется из <scope>_id в URL.
+USER_SCOPE = "user"
+ACCOUNT_SCOPE = "account"
+PAYMENT_SCOPE = "payment"
+
+# Версии семейств и счётчики поколений.
+counters = ConnectionProxy(caches, "counters")
+
+# Попадания и промахи процесса по семействам.
+_stats = {family: {HITS: 0, MISSES: 0} for family in CACHE_FAMILIES}
+_stats_lock = threading.Lock()
+
+# Снимок счётчиков процесса: ключ -> (значение, время чтения).
+_local_versions = {}
+LOCAL_VERSIONS_LIMIT = 10000
+
+
+def _version_key(family: str) -> str:
+    return f"api:{family}:version"
+
+
+def _generation_key(scope: str, object_id) -> str:
+    return f"api:{scope}:{object_id}:generation"
+
+
+def _count(family: str, outcome: str) -> None:
+    with _stats_lock:
+        _stats[family][outcome] += 1
+
+
+def _local(keys) -> tuple:
+    """
+    Значения из снимка процесса, прочитанные не раньше
+    CHANGE_COUNTER_TTL секунд назад, и ключи, которых в снимке нет.
+    """
+    now = time.monotonic()
+    ttl = settings.CHANGE_COUNTER_TTL
+    values, stale = {}, []
+    for key in keys:
+        cached = _local_versions.get(key)
+        if cached is not None and now - cached[1] < ttl:
+            values[key] = cached[0]
+        else:
+            stale.append(key)
+    return values, stale
+
+
+def _remember(values: dict) -> None:
+    if len(_local_versions) > LOCAL_VERSIONS_LIMIT:
+        _local_versions.clear()
+    now = time.monotonic()
+    for key, version in values.items():
+        _local_versions[key] = (version, now)
+
+
+def _versions(*keys: str) -> list:
+    """
+    Текущие значения счётчиков версий. Общие счётчики читаются
+    одним обращением к кэшу counters не чаще раза в
+    CHANGE_COUNTER_TTL секунд, в остальное время - из снимка процесса.
+    Если счётчика нет в кэше (первое обращение или вытеснение),
+    берется текущее время в наносекундах, чтобы не совпасть
+    с прежними значениями.
+    """
+    values, stale = _local(keys)
+    if stale:
+        fresh = counters.get_many(stale)
+        for key in stale:
+            if key not in fresh:
+                version = time.time_ns()
+                if not counters.add(key, version, timeout=None):
+                    version = counters.get(key, version)
+                fresh[key] = version
+        _remember(fresh)
+        values.update(fresh)
+    return [values[key] for key in keys]
+
+
+async def _aversions(*keys: str) -> list:
+    values, stale = _local(keys)
+    if stale:
+        fresh = await counters.aget_many(stale)
+        for key in stale:
+            if key not in fresh:
+                version = time.time_ns()
+                if not await counters.aadd(key, version, timeout=None):
+                    version = await counters.aget(key, version)
+                fresh[key] = version
+        _remember(fresh)
+        values.update(fresh)
+    return [values[key] for key in keys]
+
+
+def _bump(key: str) -> None:
+    """
+    Увеличивает общий счётчик. Текущий процесс видит новое значение
+    сразу, остальные - не позже чем через CHANGE_COUNTER_TTL секунд.
+    """
+    try:
+        counters.incr(key)
+    except ValueError:
+        counters.set(key, time.time_ns(), timeout=None)
+    _local_versions.pop(key, None)
+
+
+def family_version(family: str) -> int:
+    return _versions(_version_key(family))[0]
+
+
+def generation(scope: str, object_id) -> int:
+    return _versions(_generation_key(scope, object_id))[0]
+
+
+def invalidate(*families: str) -> None:
+    """
+    Делает недействительными все ответы семейств, увеличивая их версию.
+    Старые записи не удаляются и вытесняются по TIMEOUT.
+    """
+    for family in families:
+        _bump(_version_key(family))
+
+
+def invalidate_on_commit(*families: str) -> None:
+    transaction.on_commit(lambda: invalidate(*families))
+
+
+def invalidate_generations(scope: str, object_ids) -> None:
+    """
+    Делает недействительными персональные ответы области scope
+    (пользователей, счетов или платежей), увеличивая их счётчики
+    поколений. Ответы остальных объектов остаются в кэше.
+    """
+    for object_id in set(object_ids):
+        _bump(_generation_key(scope, object_id))
+
+
+def invalidate_generations_on_commit(scope: str, object_ids) -> None:
+    object_ids = set(object_ids)
+    transaction.on_commit(
+        lambda: invalidate_generations(scope, object_ids)
+    )
+
+
+def invalidate_users(user_ids) -> None:
+    invalidate_generations(USER_SCOPE, user_ids)
+
+
+def invalidate_users_on_commit(user_ids) -> None:
+    invalidate_generations_on_commit(USER_SCOPE, user_ids)
+
+
+def cache_stats() -> dict:
+    """
+    Попадания и промахи по семействам ключей в текущем процессе.
+    Статистика хранится в памяти, чтение из кэша ничего не записывает.
+    """
+    with _stats_lock:
+        return {family: dict(stats) for family, stats in _stats.items()}
+
+
+def reset_cache_stats() -> None:
+    with _stats_lock:
+        for stats in _stats.values():
+            stats[HITS] = stats[MISSES] = 0
+
+
+def process_local_cache() -> bool:
+    """
+    Метод проверяет, что счётчики версий хранятся в памяти процесса,
+    а воркеров несколько. Сброс версий и поколений в одном воркере тогда
+    не виден остальным, и они отдавали бы устаревшие ответы. Сами ответы
+    могут храниться в памяти процесса: их ключи содержат общие версии.
+    """
+    return settings.WEB_CONCURRENCY > 1 and isinstance(
+        caches["counters"], LocMemCache
+    )
+
+
+@checks.register()
+def check_shared_cache(app_configs, **kwargs):
+    if process_local_cache():
+        return [
+            checks.Warning(
+                "Счётчики версий в памяти процесса при "
+                f"{settings.WEB_CONCURRENCY} воркерах: кэширование "
+                "ответов API выключено.",
+                hint="Задайте общий кэш счётчиков через "
+                "COUNTER_CACHE_BACKEND (БД или Redis).",
+                id="api.W002",
+            )
+        ]
+    return []
+
+
+def _version_keys(family: str, scope) -> list:
+    keys = [_version_key(family)]
+    if scope is not None:
+        keys.append(_generation_key(*scope))
+    return keys
+
+
+def _response_key(family: str, request, versions) -> str:
+    """
+    Ключ ответа: версия семейства, поколение пользователя, счёта
+    или платежа (для персональных ответов), текущий пользователь, формат
+    и полный путь запроса. Асинхронные представления отдают
+    только JSON.
+    """
+    renderer = getattr(request, "accepted_renderer", None)
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return (
+        f"api:{family}:{':'.join(map(str, versions))}:{request.user.pk}:"
+        f"{renderer.format if renderer else 'json'}:{path}"
+    )
+
+
+def response_key(family: str, request, scope=None) -> str:
+    versions = _versions(*_version_keys(family, scope))
+    return _response_key(family, request, versions)
+
+
+async def aresponse_key(family: str, request, scope=None) -> str:
+    versions = await _aversions(*_version_keys(family, scope))
+    return _response_key(family, request, versions)
+
+
+def cache_response(family: str, scope: str = None):
+    """
+    Декоратор метода get: кэширует отрисованный ответ 200.
+    Потоковые ответы не кэшируются, а при счётчиках версий в памяти
+    процесса и нескольких воркерах кэширование выключено.
+
+    Параметры:
+        scope: ответ зависит только от данных одного пользователя,
+            счёта или платежа (<scope>_id из URL, для пользователя -
+            текущий, если в URL его нет) и сбрасывается по счётчику
+            поколений этого объекта, а не по версии всего семейства.
+    """
+
+    def owner(request, kwargs):
+        if scope is None:
+            return None
+        if scope == USER_SCOPE:
+            return scope, kwargs.get("user_id", request.user.pk)
+        return scope, kwargs[f"{scope}_id"]
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            return acache_response(family, owner, view_func)
+
+        @functools.wraps(view_func)
+        def wrapped(request, *args, **kwargs):
+            if process_local_cache():
+                return view_func(request, *args, **kwargs)
+            key = response_key(family, request, owner(request, kwargs))
+            cached = cache.get(key)
+            if cached is not None:
+                _count(family, HITS)
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+            _count(family, MISSES)
+            response = view_func(request, *args, **kwargs)
+            if isinstance(response, Response) and response.status_code == 200:
+
+                def store(rendered):
+                    cache.set(
+                        key, (rendered.content, rendered["Content-Type"])
+                    )
+
+                response.add_post_render_callback(store)
+            return response
+
+        return wrapped
+
+    return decorator
+
+
+def acache_response(family: str, owner, view_func):
+    """
+    То же, что cache_response, для асинхронных представлений,
+    которые возвращают готовый HttpResponse.
+    """
+
+    @functools.wraps(view_func)
+    async def wrapped(request, *args, **kwargs):
+        if process_local_cache():
+            return await view_func(request, *args, **kwargs)
+        key = await aresponse_key(family, request, owner(request, kwargs))
+        cached = await cache.aget(key)
+        if cached is not None:
+            _count(family, HITS)
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+        _count(family, MISSES)
+        response = await view_func(request, *args, **kwargs)
+        if not response.streaming and response.status_code == 200:
+            await cache.aset(
+                key, (response.content, response["Content-Type"])
+            )
+        return response
+
+    return wrapped
+
+
+def cached_get(family: str, scope: str = None):
+    """
+    Декоратор класса представления: кэширует ответы метода get
+    в семействе family (см. cache_response).
+    """
+    return get_method_decorator(cache_response(family, scope))
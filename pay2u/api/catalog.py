@@ -0,0 +1,127 @@
+import threading
+
+from subscriptions.models import ServiceCatalog
+from . import counters
+
+CATALOG_COUNTER = "catalog"
+
+
+class CatalogRecord:
+    __slots__ = (
+        "service_name",
+        "image",
+        "min_price",
+        "period",
+        "cashback",
+        "trial_period_days",
+        "trial_period_cost",
+        "category_id",
+        "category_name",
+        "popularity",
+    )
+
+    def __init__(self, *values):
+        for field, value in zip(self.__slots__, values):
+            setattr(self, field, value)
+
+    def to_representation(self) -> dict:
+        data = {
+            "service_name": self.service_name,
+            "image": self.image,
+            "min_subscription_cost": self.min_price,
+            "period": self.period,
+            "cashback": self.cashback,
+        }
+        if self.trial_period_days is not None:
+            data["trial_period_days"] = self.trial_period_days
+            data["trial_period_cost"] = self.trial_period_cost
+        data["category_id"] = self.category_id
+        data["category_name"] = self.category_name
+        data["popularity"] = self.popularity
+        return data
+
+
+class Catalog:
+    """
+    Каталог сервисов в памяти процесса с индексами
+    по названию категории и названию сервиса.
+    """
+
+    def __init__(self, version: int, records):
+        self.version = version
+        self.records = tuple(records)
+        self.categories = {}
+        self.services = {}
+        for record in self.records:
+            self.categories.setdefault(record.category_name, []).append(
+                record
+            )
+            self.services.setdefault(record.service_name, []).append(record)
+
+    @staticmethod
+    def rows():
+        return ServiceCatalog.objects.order_by("service_id").values_list(
+            *CatalogRecord.__slots__
+        )
+
+    @classmethod
+    def load(cls, version: int) -> "Catalog":
+        return cls(version, (CatalogRecord(*row) for row in cls.rows()))
+
+    @classmethod
+    async def aload(cls, version: int) -> "Catalog":
+        return cls(
+            version,
+            [CatalogRecord(*row) async for row in cls.rows()],
+        )
+
+    def available(self):
+        return [record.to_representation() for record in self.records]
+
+    def by_category(self, category_name: str):
+        return [
+            record.to_representation()
+            for record in self.categories.get(category_name, ())
+        ]
+
+    def by_service(self, service_name: str):
+        return [
+            record.to_representation()
+            for record in self.services.get(service_name, ())
+        ]
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> Catalog:
+    """
+    Возвращает каталог процесса, перестраивая его
+    при изменении счётчика версии каталога.
+    """
+    global _catalog
+    version, _ = counters.current(CATALOG_COUNTER)
+    catalog = _catalog
+    if catalog is not None and catalog.version == version:
+        return catalog
+    with _catalog_lock:
+        if _catalog is None or _catalog.version != version:
+            _catalog = Catalog.load(version)
+        return _catalog
+
+
+async def aget_catalog() -> Catalog:
+    """
+    То же, что get_catalog, для асинхронных представлений.
+    Пока каталог перестраивается, параллельные запросы могут
+    загрузить его повторно: результат у всех одинаковый.
+    """
+    global _catalog
+    version, _ = await counters.acurrent(CATALOG_COUNTER)
+    catalog = _catalog
+    if catalog is not None and catalog.version == version:
+        return catalog
+    catalog = await Catalog.aload(version)
+    _catalog = catalog
+    return catalog
@@ -0,0 +1,61 @@
+import functools
+
+from asgiref.sync import iscoroutinefunction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import condition
+
+from . import counters
+from .decorators import get_method_decorator
+
+
+def versioned(counter_name: str):
+    """
+    Декоратор представления: добавляет ETag и Last-Modified
+    из счётчика изменений и отвечает 304 до выполнения представления.
+    Асинхронные представления читают счётчик через async ORM.
+    """
+
+    def etag(request, *args, **kwargs):
+        version, _ = counters.current(counter_name)
+        return f"{counter_name}-{version}"
+
+    def last_modified(request, *args, **kwargs):
+        _, updated = counters.current(counter_name)
+        return updated
+
+    def decorator(view_func):
+        if not iscoroutinefunction(view_func):
+            return condition(
+                etag_func=etag, last_modified_func=last_modified
+            )(view_func)
+
+        @functools.wraps(view_func)
+        async def wrapped(request, *args, **kwargs):
+            version, updated = await counters.acurrent(counter_name)
+            res_etag = quote_etag(f"{counter_name}-{version}")
+            res_last_modified = int(updated.timestamp())
+            response = get_conditional_response(
+                request, etag=res_etag, last_modified=res_last_modified
+            )
+            if response is None:
+                response = await view_func(request, *args, **kwargs)
+            if request.method in ("GET", "HEAD"):
+                if not response.has_header("Last-Modified"):
+                    response.headers["Last-Modified"] = http_date(
+                        res_last_modified
+                    )
+                response.headers.setdefault("ETag", res_etag)
+            return response
+
+        return wrapped
+
+    return decorator
+
+
+def versioned_get(counter_name: str):
+    """
+    Декоратор класса представления: добавляет ETag и Last-Modified
+    из счётчика изменений и отвечает 304 до выполнения метода get.
+    """
+    return get_method_decorator(versioned(counter_name))
@@ -0,0 +1,78 @@
+import os
+import threading
+
+from django.conf import settings
+from django.core import checks
+from django.db import connections
+
+_stats = {"requests": 0, "opened": {}}
+_stats_lock = threading.Lock()
+
+
+def count_request() -> None:
+    with _stats_lock:
+        _stats["requests"] += 1
+
+
+def count_connection(alias: str) -> None:
+    with _stats_lock:
+        _stats["opened"][alias] = _stats["opened"].get(alias, 0) + 1
+
+
+def connection_stats() -> dict:
+    """
+    Статистика соединений с БД текущего процесса: сколько HTTP-запросов
+    обслужено и сколько соединений открыто за это время. Соединение,
+    не прошедшее проверку (CONN_HEALTH_CHECKS), открывается заново
+    и тоже учитывается.
+    """
+    with _stats_lock:
+        requests = _stats["requests"]
+        opened = dict(_stats["opened"])
+    databases = {}
+    for alias in connections:
+        database = connections.settings[alias]
+        count = opened.get(alias, 0)
+        databases[alias] = {
+            "vendor": connections[alias].vendor,
+            "conn_max_age": database["CONN_MAX_AGE"],
+            "health_checks": database["CONN_HEALTH_CHECKS"],
+            "opened": count,
+            "requests_per_connection": (
+                round(requests / count, 2) if count else None
+            ),
+        }
+    return {
+        "pid": os.getpid(),
+        "requests": requests,
+        "workers": settings.WEB_CONCURRENCY,
+        "threads": settings.WEB_THREADS,
+        "max_connections": settings.DB_MAX_CONNECTIONS,
+        "databases": databases,
+    }
+
+
+def reset_connection_stats() -> None:
+    with _stats_lock:
+        _stats["requests"] = 0
+        _stats["opened"] = {}
+
+
+@checks.register()
+def check_connection_limit(app_configs, **kwargs):
+    """
+    Все воркеры вместе не должны открывать больше соединений,
+    чем допускает сервер БД.
+    """
+    total = settings.WEB_CONCURRENCY * settings.WEB_THREADS
+    if total > settings.DB_MAX_CONNECTIONS:
+        return [
+            checks.Warning(
+                f"{settings.WEB_CONCURRENCY} воркеров по "
+                f"{settings.WEB_THREADS} потоков ({total} соединений) больше "
+                f"DB_MAX_CONNECTIONS ({settings.DB_MAX_CONNECTIONS}).",
+                hint="Уменьшите WEB_CONCURRENCY или WEB_THREADS.",
+                id="api.W001",
+            )
+        ]
+    return []
@@ -0,0 +1,51 @@
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ChangeCounter
+
+DOCUMENT_COUNTER = "document"
+
+_local_versions = {}
+
+
+def bump(name: str) -> None:
+    """
+    Увеличивает счётчик изменений в рамках текущей транзакции.
+    """
+    updated = ChangeCounter.objects.filter(name=name).update(
+        version=F("version") + 1, updated=timezone.now()
+    )
+    if not updated:
+        ChangeCounter.objects.get_or_create(name=name)
+    transaction.on_commit(lambda: _local_versions.pop(name, None))
+
+
+def current(name: str):
+    """
+    Текущая версия и время последнего изменения счётчика.
+    Значение кэшируется в процессе на CHANGE_COUNTER_TTL секунд.
+    """
+    cached = _local_versions.get(name)
+    now = time.monotonic()
+    if cached is not None and now - cached[2] < settings.CHANGE_COUNTER_TTL:
+        return cached[0], cached[1]
+    counter, _ = ChangeCounter.objects.get_or_create(name=name)
+    _local_versions[name] = (counter.version, counter.updated, now)
+    return counter.version, counter.updated
+
+
+async def acurrent(name: str):
+    """
+    То же, что current, для асинхронных представлений.
+    """
+    cached = _local_versions.get(name)
+    now = time.monotonic()
+    if cached is not None and now - cached[2] < settings.CHANGE_COUNTER_TTL:
+        return cached[0], cached[1]
+    counter, _ = await ChangeCounter.objects.aget_or_create(name=name)
+    _local_versions[name] = (counter.version, counter.updated, now)
+    return counter.version, counter.updated
@@ -0,0 +1,28 @@
+import functools
+
+from asgiref.sync import iscoroutinefunction
+from django.utils.decorators import method_decorator
+
+
+def get_method_decorator(decorator):
+    """
+    Превращает декоратор функции-представления в декоратор класса,
+    который оборачивает метод get. В отличие от method_decorator,
+    асинхронный get остается корутиной, поэтому Django распознает
+    представление как асинхронное.
+    """
+
+    def class_decorator(view_class):
+        method = view_class.get
+        if not iscoroutinefunction(method):
+            return method_decorator(decorator, name="get")(view_class)
+
+        @functools.wraps(method)
+        async def get(self, request, *args, **kwargs):
+            view_func = decorator(functools.partial(method, self))
+            return await view_func(request, *args, **kwargs)
+
+        view_class.get = get
+        return view_class
+
+    return class_decorator
@@ -0,0 +1,144 @@
+from django.utils import timezone
+
+
+async def aiterate(queryset, fields, chunk_size: int = 2000):
+    """
+    Асинхронный обход queryset пачками по chunk_size строк.
+    Строки - кортежи значений fields, как у values_list(*fields).
+    QuerySet.aiterator() у values_list() в Django 5.0 выполняет
+    запрос прямо в цикле событий (SynchronousOnlyOperation),
+    поэтому читаются словари values().
+    """
+    rows = queryset.values(*fields).aiterator(chunk_size=chunk_size)
+    async for values in rows:
+        yield tuple(values[field] for field in fields)
+
+
+def datetime_representation(value):
+    """
+    То же, что DateTimeField DRF в формате ISO 8601.
+    """
+    if not value:
+        return None
+    value = value.astimezone(timezone.get_current_timezone()).isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+def file_representation(model, field_name: str):
+    """
+    То же, что FileField/ImageField DRF без request в контексте:
+    относительная ссылка хранилища или None.
+    """
+    storage = model._meta.get_field(field_name).storage
+
+    def to_representation(value):
+        if not value:
+            return None
+        return storage.url(value)
+
+    return to_representation
+
+
+class Field:
+    def __init__(self, name: str, source: str = None,
+                 to_representation=None):
+        self.name = name
+        self.source = source or name
+        self.to_representation = to_representation
+
+
+class Nested:
+    def __init__(self, name: str, source, fields,
+                 null_source: str = None):
+        self.name = name
+        self.source = source
+        self.fields = fields
+        # source=None - вложенный объект из полей той же записи.
+        # null_source - поле, по которому определяется отсутствие
+        # связанной записи (для необязательных внешних ключей).
+        self.null_source = null_source
+
+
+class FlatSerializer:
+    """
+    Сериализатор только для чтения поверх строк values_list().
+
+    Поля описываются так же, как в ModelSerializer, но без
+    интроспекции: при создании вычисляются пути полей в запросе
+    и позиции значений в строке. Результат совпадает с выводом
+    соответствующего ModelSerializer байт в байт.
+    """
+
+    def __init__(self, *fields):
+        self.paths = []
+        self.getters = self._compile(fields, "")
+
+    def _path(self, source: str) -> int:
+        if source not in self.paths:
+            self.paths.append(source)
+        return self.paths.index(source)
+
+    def _compile(self, fields, prefix: str):
+        getters = []
+        for field in fields:
+            if isinstance(field, Nested):
+                nested_prefix = prefix
+                if field.source is not None:
+                    nested_prefix = f"{prefix}{field.source}__"
+                null_index = None
+                if field.null_source is not None:
+                    null_index = self._path(
+                        f"{nested_prefix}{field.null_source}"
+                    )
+                getters.append(
+                    (
+                        field.name,
+                        null_index,
+                        self._compile(field.fields, nested_prefix),
+                        None,
+                    )
+                )
+            else:
+                getters.append(
+                    (
+                        field.name,
+                        self._path(f"{prefix}{field.source}"),
+                        None,
+                        field.to_representation,
+                    )
+                )
+        return tuple(getters)
+
+    def index(self, source: str) -> int:
+        return self.paths.index(source)
+
+    def rows(self, queryset):
+        return queryset.values_list(*self.paths)
+
+    def to_representation(self, row, getters=None) -> dict:
+        data = {}
+        for name, index, nested, convert in getters or self.getters:
+            if nested is not None:
+                if index is not None and row[index] is None:
+                    data[name] = None
+                else:
+                    data[name] = self.to_representation(row, nested)
+            elif convert is not None:
+                data[name] = convert(row[index])
+            else:
+                data[name] = row[index]
+        return data
+
+    def arows(self, queryset, chunk_size: int = 2000):
+        return aiterate(queryset, self.paths, chunk_size)
+
+    def serialize(self, queryset) -> list:
+        return [self.to_representation(row) for row in self.rows(queryset)]
+
+    async def aserialize(self, queryset) -> list:
+        return [
+            self.to_representation(row)
+            async for row in self.rows(queryset)
+        ]
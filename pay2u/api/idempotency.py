@@ -0,0 +1,127 @@
+import hashlib
+import json
+import time
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+
+def _fingerprint(request) -> str:
+    payload = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _claim(scope: str, key: str, fingerprint: str):
+    """
+    Занимает ключ за текущим запросом.
+
+    Возвращает:
+        Запись ключа и признак того, что ключ занят этим запросом.
+    """
+    now = timezone.now()
+    records = IdempotencyKey.objects.filter(scope=scope, key=key)
+    records.filter(expires__lte=now).delete()
+    # Ключ, зависший после падения процесса, можно занять заново.
+    abandoned = now - timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT)
+    records.filter(status_code__isnull=True, created__lte=abandoned).delete()
+    try:
+        with transaction.atomic():
+            record = IdempotencyKey.objects.create(
+                scope=scope,
+                key=key,
+                fingerprint=fingerprint,
+                created=now,
+                expires=now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+            )
+        return record, True
+    except IntegrityError:
+        return records.first(), False
+
+
+def _replay(record):
+    response = Response(record.response, status=record.status_code)
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+def idempotent(method):
+    """
+    Декоратор метода APIView, поддерживающий заголовок Idempotency-Key.
+
+    Первый запрос с ключом выполняется, его статус и тело сохраняются
+    в той же транзакции и повторяются для последующих запросов с этим
+    ключом. Ошибки API (ValidationError и т.п.) - тоже окончательный
+    ответ: изменения метода откатываются, а ответ сохраняется.
+    Ключ освобождается только при ответе 5xx или непредвиденном
+    исключении. Параллельные дубликаты ждут завершения первого запроса.
+    """
+
+    @wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return method(self, request, *args, **kwargs)
+        scope = request.path
+        fingerprint = _fingerprint(request)
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+        while True:
+            record, claimed = _claim(scope, key, fingerprint)
+            if claimed:
+                break
+            # record is None - первый запрос завершился ошибкой и освободил
+            # ключ; ключ занимается заново после той же паузы.
+            if record is not None:
+                if record.fingerprint != fingerprint:
+                    return Response(
+                        {"error": "Ключ уже использован с другим запросом."},
+                        status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    )
+                if record.status_code is not None:
+                    return _replay(record)
+            if time.monotonic() >= deadline:
+                return Response(
+                    {"error": "Запрос с этим ключом ещё выполняется."},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            time.sleep(settings.IDEMPOTENCY_POLL_INTERVAL)
+
+        try:
+            with transaction.atomic():
+                try:
+                    with transaction.atomic():
+                        response = method(self, request, *args, **kwargs)
+                except Exception as exc:
+                    # Непредвиденные исключения handle_exception
+                    # пробрасывает дальше.
+                    response = self.handle_exception(exc)
+                if response.status_code >= 500:
+                    transaction.set_rollback(True)
+                else:
+                    IdempotencyKey.objects.filter(id=record.id).update(
+                        status_code=response.status_code,
+                        response=response.data,
+                    )
+        except Exception:
+            IdempotencyKey.objects.filter(id=record.id).delete()
+            raise
+        if response.status_code >= 500:
+            IdempotencyKey.objects.filter(id=record.id).delete()
+        return response
+
+    return wrapper
+
+
+def purge_expired_keys() -> int:
+    deleted, _ = IdempotencyKey.objects.filter(
+        expires__lte=timezone.now()
+    ).delete()
+    return deleted
@@ -0,0 +1,369 @@
+import asyncio
+import bisect
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from socketserver import ThreadingMixIn
+from urllib.parse import quote, urlsplit
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from django.conf import settings
+from django.core.wsgi import get_wsgi_application
+
+# Границы корзин гистограммы задержек, мс.
+BUCKETS = (
+    1, 2, 3, 5, 7, 10, 15, 20, 30, 50, 75, 100, 150, 200, 300, 500, 750,
+    1000, 2000, 5000,
+)
+
+# Смеси сценариев: название сценария и его вес.
+# default повторяет распределение запросов мобильного приложения:
+# каталог и главный экран - большая часть трафика, покупки - редкие.
+MIXES = {
+    "default": {
+        "catalog_available": 25,
+        "catalog_category": 10,
+        "catalog_service": 10,
+        "main_page": 20,
+        "home": 10,
+        "payment_history": 10,
+        "active": 8,
+        "rules": 5,
+        "purchase": 2,
+    },
+    "catalog": {
+        "catalog_available": 50,
+        "catalog_category": 25,
+        "catalog_service": 25,
+    },
+    "account": {
+        "main_page": 30,
+        "home": 30,
+        "payment_history": 25,
+        "active": 15,
+    },
+    "purchase": {
+        "purchase": 100,
+    },
+    "read": {
+        "catalog_available": 25,
+        "catalog_category": 10,
+        "catalog_service": 10,
+        "main_page": 20,
+        "home": 10,
+        "payment_history": 10,
+        "active": 8,
+        "rules": 5,
+    },
+}
+WRITE_SCENARIOS = {"purchase"}
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def start_wsgi_server(host: str = "127.0.0.1"):
+    """
+    Запускает приложение в многопоточном WSGI-сервере текущего процесса.
+
+    Возвращает:
+        Сервер и его адрес http://host:port.
+    """
+    server = make_server(
+        host, 0, get_wsgi_application(),
+        server_class=ThreadingWSGIServer, handler_class=QuietHandler,
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_port}"
+
+
+# Команды запуска приложения в отдельном процессе gunicorn:
+# синхронные воркеры (как в Dockerfile) и воркеры uvicorn (ASGI).
+SERVERS = {
+    "wsgi": (["pay2u.wsgi"], "False"),
+    "asgi": (
+        ["--worker-class", "uvicorn.workers.UvicornWorker",
+         "pay2u.asgi:application"],
+        "True",
+    ),
+}
+
+
+def free_port(host: str) -> int:
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+def start_server_process(kind: str, workers: int = 1,
+                         host: str = "127.0.0.1", timeout: float = 30.0,
+                         env=None):
+    """
+    Запускает приложение в gunicorn в отдельном процессе и ждет,
+    пока сервер начнет принимать соединения.
+
+    Параметры:
+        kind: wsgi или asgi (ключ SERVERS)
+        workers: количество воркеров gunicorn
+        env: дополнительные переменные окружения сервера
+
+    Возвращает:
+        Процесс и адрес сервера http://host:port.
+    """
+    arguments, async_views = SERVERS[kind]
+    port = free_port(host)
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "gunicorn",
+            "--bind", f"{host}:{port}",
+            "--workers", str(workers),
+            "--backlog", "2048",
+            "--log-level", "warning",
+            *arguments,
+        ],
+        cwd=settings.BASE_DIR,
+        env={**os.environ, "ASYNC_VIEWS": async_views, **(env or {})},
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Сервер {kind} завершился при запуске.")
+        try:
+            socket.create_connection((host, port), timeout=1).close()
+            return process, f"http://{host}:{port}"
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"Сервер {kind} не запустился за {timeout} с.")
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.samples = []
+
+    def add(self, milliseconds: float):
+        self.counts[bisect.bisect_left(BUCKETS, milliseconds)] += 1
+        self.samples.append(milliseconds)
+
+    def percentile(self, percent: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(len(ordered) * percent / 100))
+        return ordered[index]
+
+    def summary(self) -> dict:
+        return {
+            "requests": len(self.samples),
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": max(self.samples, default=0.0),
+            "buckets": {
+                (f"<={BUCKETS[index]}" if index < len(BUCKETS)
+                 else f">{BUCKETS[-1]}"): count
+                for index, count in enumerate(self.counts)
+                if count
+            },
+        }
+
+
+@dataclass
+class Response:
+    status: int
+    headers: dict
+    body: bytes
+
+
+@dataclass
+class Session:
+    cookies: dict = field(default_factory=dict)
+    csrf_token: str = ""
+
+
+async def http_request(base_url: str, method: str, path: str,
+                       session: Session, body=None,
+                       headers=None) -> Response:
+    """
+    Выполняет один HTTP/1.1-запрос на отдельном соединении
+    и читает ответ до закрытия соединения.
+    """
+    url = urlsplit(base_url)
+    reader, writer = await asyncio.open_connection(url.hostname, url.port)
+    payload = b"" if body is None else json.dumps(body).encode()
+    lines = [
+        f"{method} {path} HTTP/1.1",
+        f"Host: {url.hostname}:{url.port}",
+        "Connection: close",
+        "Accept: application/json",
+        f"Content-Length: {len(payload)}",
+    ]
+    if body is not None:
+        lines.append("Content-Type: application/json")
+    if session.cookies:
+        lines.append("Cookie: " + "; ".join(
+            f"{name}={value}" for name, value in session.cookies.items()
+        ))
+    if session.csrf_token and method != "GET":
+        lines.append(f"X-CSRFToken: {session.csrf_token}")
+    for name, value in (headers or {}).items():
+        lines.append(f"{name}: {value}")
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + payload)
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, content = raw.partition(b"\r\n\r\n")
+    status_line, *header_lines = head.decode("latin-1").split("\r\n")
+    response_headers = {}
+    for line in header_lines:
+        name, _, value = line.partition(":")
+        name = name.strip().lower()
+        value = value.strip()
+        if name == "set-cookie":
+            cookie_name, _, cookie_value = value.split(";")[0].partition("=")
+            session.cookies[cookie_name] = cookie_value
+        response_headers[name] = value
+    if response_headers.get("transfer-encoding") == "chunked":
+        content = dechunk(content)
+    return Response(int(status_line.split()[1]), response_headers, content)
+
+
+def dechunk(content: bytes) -> bytes:
+    body = b""
+    while content:
+        size_line, _, content = content.partition(b"\r\n")
+        size = int(size_line.split(b";")[0], 16)
+        if not size:
+            break
+        body += content[:size]
+        content = content[size + 2:]
+    return body
+
+
+@dataclass
+class Fixture:
+    """
+    Данные, из которых сценарии подставляют параметры запросов.
+    """
+    users: list
+    accounts: dict
+    plans: list
+    categories: list
+    services: list
+
+
+def scenario_request(name: str, fixture: Fixture, rng: random.Random):
+    """
+    Возвращает метод, путь, тело и заголовки запроса сценария.
+    """
+    user_id = rng.choice(fixture.users)
+    if name == "catalog_available":
+        return "GET", "/api/v1/services/available/", None, None
+    if name == "catalog_category":
+        category = quote(rng.choice(fixture.categories))
+        return "GET", f"/api/v1/categories/{category}/", None, None
+    if name == "catalog_service":
+        service = quote(rng.choice(fixture.services))
+        return "GET", f"/api/v1/services/{service}/", None, None
+    if name == "main_page":
+        return "GET", f"/api/v1/users/{user_id}/main_page/", None, None
+    if name == "home":
+        return "GET", f"/api/v1/users/{user_id}/home/", None, None
+    if name == "payment_history":
+        return (
+            "GET", f"/api/v1/users/{user_id}/payments/?limit=50", None, None
+        )
+    if name == "active":
+        return "GET", f"/api/v1/users/{user_id}/active/", None, None
+    if name == "rules":
+        return "GET", "/api/v1/rules/", None, None
+    if name == "purchase":
+        return (
+            "POST",
+            f"/api/v1/users/{user_id}/subscriptions/",
+            {
+                "subscription_id": rng.choice(fixture.plans),
+                "account_id": fixture.accounts[user_id],
+            },
+            {"Idempotency-Key": uuid.UUID(int=rng.getrandbits(128)).hex},
+        )
+    raise ValueError(name)
+
+
+async def run_load(base_url: str, fixture: Fixture, mix: dict,
+                   concurrency: int, duration: float, seed: int) -> dict:
+    """
+    Запускает concurrency клиентов, которые duration секунд
+    выполняют запросы сценариев в пропорциях mix.
+
+    Возвращает:
+        Пропускную способность, задержки и гистограммы
+        по сценариям и в целом.
+    """
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    histograms = {name: Histogram() for name in names}
+    total = Histogram()
+    errors = {}
+
+    async def client(number: int):
+        rng = random.Random(f"{seed}:{number}")
+        session = Session()
+        response = await http_request(
+            base_url, "GET", "/api/v1/token/", session
+        )
+        session.csrf_token = json.loads(response.body)["csrf_token"]
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            method, path, body, headers = scenario_request(
+                name, fixture, rng
+            )
+            started = time.perf_counter()
+            try:
+                response = await http_request(
+                    base_url, method, path, session, body, headers
+                )
+                failed = response.status >= 500
+                status = response.status
+            except OSError as error:
+                failed = True
+                status = type(error).__name__
+            elapsed = (time.perf_counter() - started) * 1000
+            if failed:
+                key = f"{name} {status}"
+                errors[key] = errors.get(key, 0) + 1
+                continue
+            histograms[name].add(elapsed)
+            total.add(elapsed)
+
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(client(number) for number in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "duration_s": elapsed,
+        "concurrency": concurrency,
+        "throughput_rps": len(total.samples) / elapsed,
+        "total": total.summary(),
+        "scenarios": {
+            name: histogram.summary()
+            for name, histogram in histograms.items()
+        },
+        "errors": errors,
+    }
@@ -0,0 +1,116 @@
+import asyncio
+import json
+import os
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api.loadtest import MIXES, SERVERS, run_load, start_server_process
+from .bench_http import current_commit, load_fixture
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнение синхронного и асинхронного развертывания: одна и та "
+        "же смесь запросов чтения выполняется против gunicorn с "
+        "синхронными воркерами (pay2u.wsgi) и против gunicorn с "
+        "воркерами uvicorn (pay2u.asgi, асинхронные представления). "
+        "Результат сохраняется в JSON с хешем текущего коммита."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mix", choices=MIXES, default="read")
+        parser.add_argument("--concurrency", type=int, default=500)
+        parser.add_argument(
+            "--duration", type=float, default=20.0, help="Секунд."
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Воркеров gunicorn у каждого сервера.",
+        )
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument(
+            "--server",
+            choices=SERVERS,
+            action="append",
+            help="Какие серверы проверять (по умолчанию оба).",
+        )
+        parser.add_argument("--output-dir", default="bench-results")
+
+    def handle(self, *args, **options):
+        mix = MIXES[options["mix"]]
+        fixture = load_fixture(options["users"])
+        if not fixture.users or not fixture.services:
+            raise CommandError(
+                "Нет пользователей со счетами или сервисов в витрине: "
+                "заполните БД, например командой generate_dataset."
+            )
+        connection.close()
+        results = {}
+        for kind in options["server"] or list(SERVERS):
+            process, base_url = start_server_process(
+                kind, options["workers"]
+            )
+            try:
+                results[kind] = asyncio.run(
+                    run_load(
+                        base_url,
+                        fixture,
+                        mix,
+                        options["concurrency"],
+                        options["duration"],
+                        options["seed"],
+                    )
+                )
+            finally:
+                process.terminate()
+                process.wait()
+            self.report(kind, results[kind])
+
+        result = {
+            "commit": current_commit(),
+            "mix": options["mix"],
+            "weights": mix,
+            "workers": options["workers"],
+            "database": connection.vendor,
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "servers": results,
+        }
+        if "wsgi" in results and "asgi" in results:
+            wsgi = results["wsgi"]["throughput_rps"]
+            asgi = results["asgi"]["throughput_rps"]
+            self.stdout.write(
+                f"запросов в секунду: wsgi {wsgi:.0f}, asgi {asgi:.0f}"
+                + (f", x{asgi / wsgi:.2f}" if wsgi else "")
+            )
+        os.makedirs(options["output_dir"], exist_ok=True)
+        path = os.path.join(
+            options["output_dir"],
+            f"{result['commit']}-asgi-{datetime.now():%Y%m%d%H%M%S}.json",
+        )
+        with open(path, "w", encoding="utf-8") as output:
+            json.dump(result, output, ensure_ascii=False, indent=2)
+        self.stdout.write(f"Результат сохранен: {path}")
+
+    def report(self, kind: str, result: dict):
+        total = result["total"]
+        errors = sum(result["errors"].values())
+        self.stdout.write(
+            f"{kind}: клиентов {result['concurrency']}, "
+            f"{result['duration_s']:.1f} с, "
+            f"запросов в секунду: {result['throughput_rps']:.0f}, "
+            f"p50 {total['p50_ms']:.1f} мс, p95 {total['p95_ms']:.1f} мс, "
+            f"p99 {total['p99_ms']:.1f} мс, ошибок {errors}"
+        )
+        for name, scenario in result["scenarios"].items():
+            self.stdout.write(
+                f"  {name}: {scenario['requests']} запросов, "
+                f"p50 {scenario['p50_ms']:.1f} мс, "
+                f"p95 {scenario['p95_ms']:.1f} мс"
+            )
+        for error, count in result["errors"].items():
+            self.stderr.write(f"  ошибка {error}: {count}")
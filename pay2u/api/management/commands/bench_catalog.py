@@ -0,0 +1,73 @@
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+from api.views import AvailableServicesView, CategoriesView, ServiceView
+from subscriptions.models import ServiceCatalog
+from subscriptions.serializers import AvailableServiceSerializer
+
+
+class OrmAvailableServicesView(APIView):
+    def get(self, request):
+        catalog = ServiceCatalog.objects.all()
+        ser_data = AvailableServiceSerializer(catalog, many=True).data
+        return Response(ser_data, status=status.HTTP_200_OK)
+
+
+class OrmCategoriesView(APIView):
+    def get(self, request, category_name):
+        catalog = ServiceCatalog.objects.filter(category_name=category_name)
+        ser_data = AvailableServiceSerializer(catalog, many=True).data
+        return Response(ser_data, status=status.HTTP_200_OK)
+
+
+class OrmServiceView(APIView):
+    def get(self, request, service_name):
+        catalog = ServiceCatalog.objects.filter(service_name=service_name)
+        ser_data = AvailableServiceSerializer(catalog, many=True).data
+        return Response(ser_data, status=status.HTTP_200_OK)
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает каталог в памяти процесса с запросами к БД "
+        "(запросов в секунду на каждый эндпоинт каталога)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        entry = ServiceCatalog.objects.first()
+        if entry is None:
+            self.stderr.write("Витрина пуста: нечего измерять.")
+            return
+        endpoints = (
+            ("available", AvailableServicesView, OrmAvailableServicesView,
+             {}),
+            ("category", CategoriesView, OrmCategoriesView,
+             {"category_name": entry.category_name}),
+            ("service", ServiceView, OrmServiceView,
+             {"service_name": entry.service_name}),
+        )
+        for name, engine_view, orm_view, kwargs in endpoints:
+            orm_rps = self.measure(orm_view, kwargs, options["requests"])
+            engine_rps = self.measure(engine_view, kwargs, options["requests"])
+            self.stdout.write(
+                f"{name:<10} orm: {orm_rps:>10.0f} rps  "
+                f"engine: {engine_rps:>10.0f} rps  "
+                f"x{engine_rps / orm_rps:.1f}"
+            )
+
+    def measure(self, view_class, kwargs, requests):
+        view = view_class.as_view()
+        request = APIRequestFactory().get("/")
+        view(request, **kwargs).render()
+        started = time.perf_counter()
+        for _ in range(requests):
+            view(request, **kwargs).render()
+        return requests / (time.perf_counter() - started)
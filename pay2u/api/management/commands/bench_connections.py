@@ -0,0 +1,139 @@
+import asyncio
+import json
+import os
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api.loadtest import (
+    MIXES,
+    Session,
+    http_request,
+    run_load,
+    start_server_process
+)
+from .bench_http import current_commit, load_fixture
+
+DUMMY_CACHE = "django.core.cache.backends.dummy.DummyCache"
+
+
+async def load_and_stats(base_url: str, fixture, mix: dict, options):
+    result = await run_load(
+        base_url,
+        fixture,
+        mix,
+        options["concurrency"],
+        options["duration"],
+        options["seed"],
+    )
+    response = await http_request(
+        base_url, "GET", "/api/v1/db/stats/", Session()
+    )
+    result["connections"] = (
+        json.loads(response.body) if response.status == 200 else None
+    )
+    return result
+
+
+class Command(BaseCommand):
+    help = (
+        "Задержка запросов с новым соединением с БД на каждый запрос "
+        "(DB_CONN_MAX_AGE=0) и с постоянными соединениями. Приложение "
+        "запускается в gunicorn с синхронными воркерами, кэш ответов "
+        "отключен, чтобы каждый запрос обращался к БД."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mix", choices=MIXES, default="account")
+        parser.add_argument(
+            "--conn-max-age",
+            type=int,
+            default=60,
+            help="DB_CONN_MAX_AGE постоянных соединений, секунд.",
+        )
+        parser.add_argument("--concurrency", type=int, default=1)
+        parser.add_argument(
+            "--duration", type=float, default=10.0, help="Секунд."
+        )
+        parser.add_argument("--workers", type=int, default=1)
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--output-dir", default="bench-results")
+
+    def handle(self, *args, **options):
+        mix = MIXES[options["mix"]]
+        fixture = load_fixture(options["users"])
+        if not fixture.users:
+            raise CommandError(
+                "Нет пользователей со счетами: заполните БД, например "
+                "командой generate_dataset."
+            )
+        connection.close()
+        modes = {
+            "per_request": 0,
+            "persistent": options["conn_max_age"],
+        }
+        results = {}
+        for mode, conn_max_age in modes.items():
+            process, base_url = start_server_process(
+                "wsgi",
+                options["workers"],
+                env={
+                    "DB_CONN_MAX_AGE": str(conn_max_age),
+                    "CACHE_BACKEND": DUMMY_CACHE,
+                    "COUNTER_CACHE_BACKEND": DUMMY_CACHE,
+                },
+            )
+            try:
+                results[mode] = asyncio.run(
+                    load_and_stats(base_url, fixture, mix, options)
+                )
+            finally:
+                process.terminate()
+                process.wait()
+            self.report(mode, conn_max_age, results[mode])
+
+        before = results["per_request"]["total"]
+        after = results["persistent"]["total"]
+        self.stdout.write(
+            "экономия на запрос: "
+            f"p50 {before['p50_ms'] - after['p50_ms']:.2f} мс, "
+            f"p95 {before['p95_ms'] - after['p95_ms']:.2f} мс"
+        )
+        result = {
+            "commit": current_commit(),
+            "mix": options["mix"],
+            "weights": mix,
+            "workers": options["workers"],
+            "database": connection.vendor,
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "modes": results,
+        }
+        os.makedirs(options["output_dir"], exist_ok=True)
+        path = os.path.join(
+            options["output_dir"],
+            f"{result['commit']}-connections-"
+            f"{datetime.now():%Y%m%d%H%M%S}.json",
+        )
+        with open(path, "w", encoding="utf-8") as output:
+            json.dump(result, output, ensure_ascii=False, indent=2)
+        self.stdout.write(f"Результат сохранен: {path}")
+
+    def report(self, mode: str, conn_max_age: int, result: dict):
+        total = result["total"]
+        self.stdout.write(
+            f"{mode} (DB_CONN_MAX_AGE={conn_max_age}): "
+            f"запросов в секунду: {result['throughput_rps']:.0f}, "
+            f"p50 {total['p50_ms']:.2f} мс, p95 {total['p95_ms']:.2f} мс, "
+            f"p99 {total['p99_ms']:.2f} мс"
+        )
+        stats = result["connections"]
+        if stats:
+            for alias, database in stats["databases"].items():
+                self.stdout.write(
+                    f"  {alias}: HTTP-запросов {stats['requests']}, "
+                    f"открыто соединений {database['opened']}"
+                )
+        for error, count in result["errors"].items():
+            self.stderr.write(f"  ошибка {error}: {count}")
@@ -0,0 +1,198 @@
+import asyncio
+import json
+import os
+import subprocess
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api.loadtest import (
+    BUCKETS,
+    MIXES,
+    WRITE_SCENARIOS,
+    Fixture,
+    run_load,
+    start_wsgi_server
+)
+from subscriptions.models import ServiceCatalog, Subscription
+from users.models import Account
+
+
+def current_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def load_fixture(users: int) -> Fixture:
+    accounts = {}
+    for user_id, account_id in Account.objects.order_by(
+        "user_id", "id"
+    ).values_list("user_id", "id").iterator():
+        accounts.setdefault(user_id, account_id)
+        if len(accounts) >= users:
+            break
+    return Fixture(
+        users=list(accounts),
+        accounts=accounts,
+        plans=list(Subscription.objects.values_list("id", flat=True)),
+        categories=list(
+            ServiceCatalog.objects.values_list(
+                "category_name", flat=True
+            ).distinct()
+        ),
+        services=list(
+            ServiceCatalog.objects.values_list("service_name", flat=True)
+        ),
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Нагрузочный тест API: асинхронные клиенты выполняют запросы "
+        "к маршрутам api/urls.py в пропорциях выбранной смеси "
+        "сценариев. По умолчанию приложение запускается в "
+        "многопоточном WSGI-сервере этого процесса. Результат "
+        "сохраняется в JSON с хешем текущего коммита."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mix", choices=MIXES, default="default")
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument(
+            "--duration", type=float, default=10.0, help="Секунд."
+        )
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=1000,
+            help="Сколько пользователей со счетами использовать.",
+        )
+        parser.add_argument(
+            "--url",
+            default=None,
+            help="Адрес уже запущенного сервера вместо встроенного.",
+        )
+        parser.add_argument(
+            "--read-only",
+            action="store_true",
+            help="Исключить сценарии с записью (покупки).",
+        )
+        parser.add_argument("--output-dir", default="bench-results")
+        parser.add_argument(
+            "--compare",
+            default=None,
+            help="Файл предыдущего прогона для сравнения.",
+        )
+
+    def handle(self, *args, **options):
+        mix = dict(MIXES[options["mix"]])
+        if options["read_only"]:
+            for name in WRITE_SCENARIOS:
+                mix.pop(name, None)
+        if not mix:
+            raise CommandError("В смеси не осталось сценариев.")
+        fixture = load_fixture(options["users"])
+        if not fixture.users or not fixture.services:
+            raise CommandError(
+                "Нет пользователей со счетами или сервисов в витрине: "
+                "заполните БД, например командой generate_dataset."
+            )
+        server = None
+        base_url = options["url"]
+        if base_url is None:
+            server, base_url = start_wsgi_server()
+        connection.close()
+        try:
+            result = asyncio.run(
+                run_load(
+                    base_url,
+                    fixture,
+                    mix,
+                    options["concurrency"],
+                    options["duration"],
+                    options["seed"],
+                )
+            )
+        finally:
+            if server is not None:
+                server.shutdown()
+
+        result.update(
+            {
+                "commit": current_commit(),
+                "mix": options["mix"],
+                "weights": mix,
+                "server": options["url"] or "wsgiref",
+                "database": connection.vendor,
+                "started_at": datetime.now().isoformat(timespec="seconds"),
+            }
+        )
+        self.report(result)
+        os.makedirs(options["output_dir"], exist_ok=True)
+        path = os.path.join(
+            options["output_dir"],
+            f"{result['commit']}-{options['mix']}-"
+            f"{datetime.now():%Y%m%d%H%M%S}.json",
+        )
+        with open(path, "w", encoding="utf-8") as output:
+            json.dump(result, output, ensure_ascii=False, indent=2)
+        self.stdout.write(f"Результат сохранен: {path}")
+        if options["compare"]:
+            self.compare(result, options["compare"])
+
+    def report(self, result: dict):
+        total = result["total"]
+        self.stdout.write(
+            f"коммит {result['commit']}, смесь {result['mix']}, "
+            f"клиентов {result['concurrency']}, "
+            f"{result['duration_s']:.1f} с\n"
+            f"запросов в секунду: {result['throughput_rps']:.0f}, "
+            f"p50 {total['p50_ms']:.1f} мс, p95 {total['p95_ms']:.1f} мс, "
+            f"p99 {total['p99_ms']:.1f} мс"
+        )
+        for name, scenario in result["scenarios"].items():
+            self.stdout.write(
+                f"  {name}: {scenario['requests']} запросов, "
+                f"p50 {scenario['p50_ms']:.1f} мс, "
+                f"p95 {scenario['p95_ms']:.1f} мс"
+            )
+        widest = max(total["buckets"].values(), default=0)
+        for bucket in [f"<={limit}" for limit in BUCKETS] + [
+            f">{BUCKETS[-1]}"
+        ]:
+            count = total["buckets"].get(bucket)
+            if count:
+                bar = "#" * max(1, 50 * count // widest)
+                self.stdout.write(f"  {bucket:>7} мс {count:>7} {bar}")
+        for error, count in result["errors"].items():
+            self.stderr.write(f"  ошибка {error}: {count}")
+
+    def compare(self, result: dict, path: str):
+        with open(path, encoding="utf-8") as previous_file:
+            previous = json.load(previous_file)
+        self.stdout.write(
+            f"сравнение с {previous['commit']} ({path}):\n"
+            f"  запросов в секунду: {previous['throughput_rps']:.0f} -> "
+            f"{result['throughput_rps']:.0f}\n"
+            f"  p95: {previous['total']['p95_ms']:.1f} -> "
+            f"{result['total']['p95_ms']:.1f} мс"
+        )
+        for name, scenario in result["scenarios"].items():
+            before = previous["scenarios"].get(name)
+            if before:
+                self.stdout.write(
+                    f"  {name}: p50 {before['p50_ms']:.1f} -> "
+                    f"{scenario['p50_ms']:.1f} мс, p95 "
+                    f"{before['p95_ms']:.1f} -> {scenario['p95_ms']:.1f} мс"
+                )
@@ -0,0 +1,82 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import ORJSONRenderer
+from api.seeding import Rollback, seed_user
+
+ENDPOINTS = (
+    "/api/v1/users/{user_id}/payments/",
+    "/api/v1/users/{user_id}/user_subscriptions/",
+    "/api/v1/users/{user_id}/payments_plan/",
+    "/api/v1/users/{user_id}/main_page/",
+    "/api/v1/services/available/",
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает время кодирования JSON стандартным рендерером DRF "
+        "и рендерером на orjson, а также размер ответа без сжатия и "
+        "с gzip для самых больших списков. Тестовые данные создаются "
+        "в откатываемой транзакции."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        standard = JSONRenderer()
+        fast = ORJSONRenderer()
+        client = Client(HTTP_HOST="localhost")
+        mismatches = []
+        try:
+            with transaction.atomic():
+                user = seed_user(options["rows"])["user"]
+                for endpoint in ENDPOINTS:
+                    path = endpoint.format(user_id=user.id)
+                    plain = client.get(path)
+                    if plain.status_code != 200:
+                        raise CommandError(
+                            f"{path}: ответ {plain.status_code}"
+                        )
+                    compressed = client.get(
+                        path, HTTP_ACCEPT_ENCODING="gzip"
+                    )
+                    data = plain.data
+                    if standard.render(data) != fast.render(data):
+                        mismatches.append(endpoint)
+                    standard_time = self.measure(
+                        lambda: standard.render(data), options["repeat"]
+                    )
+                    fast_time = self.measure(
+                        lambda: fast.render(data), options["repeat"]
+                    )
+                    self.stdout.write(
+                        f"{endpoint}: {len(plain.content)} байт, gzip "
+                        f"{len(compressed.content)} байт "
+                        f"({compressed.get('Content-Encoding', 'нет')}), "
+                        f"кодирование DRF {standard_time * 1e3:.2f} мс, "
+                        f"orjson {fast_time * 1e3:.2f} мс, "
+                        f"ускорение {standard_time / fast_time:.1f}x"
+                    )
+                raise Rollback
+        except Rollback:
+            pass
+        if mismatches:
+            raise CommandError("JSON отличается: " + ", ".join(mismatches))
+        self.stdout.write(self.style.SUCCESS("JSON совпадает байт в байт."))
+
+    @staticmethod
+    def measure(render, repeat: int) -> float:
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            render()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
@@ -0,0 +1,106 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from api.seeding import Rollback, seed_user
+from payments.models import Payment
+from payments.serializers import FLAT_PAYMENTS, PaymentsSerializer
+from subscriptions.models import UserSubscription
+from subscriptions.serializers import (
+    FLAT_MAIN_PAGE,
+    FLAT_PAYMENTS_PLAN,
+    FLAT_USER_SUBSCRIPTION,
+    FLAT_USER_SUBSCRIPTIONS,
+    MainPageSerializer,
+    UserPaymentsPlanSerializer,
+    UserSubscriptionSerializer,
+    UserSubscriptionsSerializer
+)
+
+
+def families(user):
+    user_subscriptions = UserSubscription.objects.filter(
+        user_id=user
+    ).select_related(
+        "subscription__service_id",
+        "subscription__trial_period",
+        "access_code",
+    ).order_by("id")
+    payments = Payment.objects.filter(account_id__user=user).select_related(
+        "user_subscription__service_id", "account_id", "cashback_applied"
+    ).order_by("date", "id")
+    return (
+        ("payments", payments, PaymentsSerializer, FLAT_PAYMENTS),
+        ("user_subscription", user_subscriptions,
+         UserSubscriptionSerializer, FLAT_USER_SUBSCRIPTION),
+        ("user_subscriptions", user_subscriptions,
+         UserSubscriptionsSerializer, FLAT_USER_SUBSCRIPTIONS),
+        ("main_page", user_subscriptions, MainPageSerializer,
+         FLAT_MAIN_PAGE),
+        ("payments_plan", user_subscriptions, UserPaymentsPlanSerializer,
+         FLAT_PAYMENTS_PLAN),
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает стоимость строки списка у сериализаторов DRF "
+        "и быстрых сериализаторов поверх values_list() и проверяет, "
+        "что JSON совпадает байт в байт. Тестовые данные создаются "
+        "в откатываемой транзакции."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        renderer = JSONRenderer()
+        mismatches = []
+        try:
+            with transaction.atomic():
+                user = seed_user(options["rows"])["user"]
+                for name, queryset, serializer_class, flat in families(user):
+                    drf_data = serializer_class(queryset, many=True).data
+                    flat_data = flat.serialize(queryset)
+                    if renderer.render(drf_data) != renderer.render(
+                        flat_data
+                    ):
+                        mismatches.append(name)
+                    drf_time = self.measure(
+                        lambda: serializer_class(
+                            queryset.all(), many=True
+                        ).data,
+                        options["repeat"],
+                    )
+                    flat_time = self.measure(
+                        lambda: flat.serialize(queryset.all()),
+                        options["repeat"],
+                    )
+                    rows = len(flat_data)
+                    self.stdout.write(
+                        f"{name}: строк {rows}, DRF "
+                        f"{drf_time / rows * 1e6:.1f} мкс/строка, "
+                        f"быстрый {flat_time / rows * 1e6:.1f} мкс/строка, "
+                        f"ускорение {drf_time / flat_time:.1f}x"
+                    )
+                raise Rollback
+        except Rollback:
+            pass
+        if mismatches:
+            raise CommandError(
+                "JSON отличается: " + ", ".join(mismatches)
+            )
+        self.stdout.write(self.style.SUCCESS("JSON совпадает байт в байт."))
+
+    @staticmethod
+    def measure(serialize, repeat: int) -> float:
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            serialize()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
@@ -0,0 +1,406 @@
+import contextlib
+import csv
+import io
+import multiprocessing
+import random
+import time
+from datetime import datetime, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.utils import timezone
+
+from payments.models import (
+    CashbackApplied,
+    Document,
+    Payment,
+    increment_receipt_number
+)
+from payments.rollups import rebuild_spend_rollups
+from services.models import Category, Service
+from subscriptions.catalog import rebuild_service_catalog
+from subscriptions.constants import SUB_METHODS
+from subscriptions.models import (
+    AccessCode,
+    Subscription,
+    TrialPeriod,
+    UserSubscription
+)
+from users.models import Account, BalanceSnapshot, User
+
+BASE_DATE = datetime(2023, 1, 1)
+PERIODS = (30, 90, 180, 365)
+PRICES = (99, 149, 199, 299, 399, 499, 799, 999)
+
+
+@contextlib.contextmanager
+def historical_dates():
+    """
+    Позволяет задавать дату платежа при bulk_create:
+    auto_now_add иначе перезаписывает ее текущим временем.
+    """
+    field = Payment._meta.get_field("date")
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+def create_catalog(rng, options):
+    categories = Category.objects.bulk_create(
+        Category(name=f"g{options['seed']}-{number}")
+        for number in range(options["categories"])
+    )
+    services = Service.objects.bulk_create(
+        Service(
+            name=f"g{options['seed']}-service-{number}",
+            image="services/images/generated.png",
+            description="",
+            conditions="",
+            website="https://example.com",
+            instruction="",
+            rules="",
+            popularity=rng.randint(0, 1000),
+            category=rng.choice(categories),
+        )
+        for number in range(options["services"])
+    )
+    trial_periods = TrialPeriod.objects.bulk_create(
+        TrialPeriod(period_days=days, period_cost=1) for days in (7, 14, 30)
+    )
+    plans = Subscription.objects.bulk_create(
+        Subscription(
+            name=f"g{options['seed']}-plan-{service.id}-{number}",
+            availability=True,
+            price=rng.choice(PRICES),
+            period=rng.choice(PERIODS),
+            cashback=rng.choice((0, 5, 10, 25)),
+            service_id=service,
+            trial_period=(
+                rng.choice(trial_periods) if rng.random() < 0.3 else None
+            ),
+            activation_method=rng.choice(list(SUB_METHODS)),
+        )
+        for service in services
+        for number in range(options["plans_per_service"])
+    )
+    plans_by_service = {}
+    for plan in plans:
+        plans_by_service.setdefault(plan.service_id_id, []).append(
+            (plan.id, plan.price, plan.period, plan.cashback)
+        )
+    return plans_by_service
+
+
+def copy_rows(model, fields, rows):
+    """
+    Записывает строки в таблицу модели через COPY (только PostgreSQL).
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    quote = connection.ops.quote_name
+    columns = ", ".join(
+        quote(model._meta.get_field(field).column) for field in fields
+    )
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {quote(model._meta.db_table)} ({columns}) "
+            f"FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+
+
+def reserve_ids(model, count: int):
+    table = model._meta.db_table
+    column = model._meta.pk.column
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, %s)) "
+            "FROM generate_series(1, %s)",
+            [table, column, count],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def copy_payments(payments):
+    """
+    Записывает кэшбэки и платежи через COPY. Идентификаторы кэшбэков
+    резервируются заранее, номера чеков выдаются как при обычной
+    вставке платежа.
+    """
+    cashback_ids = reserve_ids(CashbackApplied, len(payments))
+    copy_rows(
+        CashbackApplied,
+        ("id", "amount", "applied_status"),
+        (
+            (cashback_id, cashback.amount, cashback.applied_status)
+            for cashback_id, (_, cashback) in zip(cashback_ids, payments)
+        ),
+    )
+    copy_rows(
+        Payment,
+        (
+            "amount",
+            "date",
+            "receipt",
+            "document",
+            "cashback_applied",
+            "user_subscription",
+            "account_id",
+        ),
+        (
+            (
+                payment.amount,
+                payment.date.isoformat(),
+                increment_receipt_number(),
+                payment.document_id,
+                cashback_id,
+                payment.user_subscription_id,
+                payment.account_id_id,
+            )
+            for cashback_id, (payment, _) in zip(cashback_ids, payments)
+        ),
+    )
+
+
+def generate_chunk(rng, first_user, last_user, options, context):
+    """
+    Создает пользователей с номерами first_user..last_user-1,
+    их счета, подписки, коды доступа, кэшбэки и платежи.
+    """
+    seed = options["seed"]
+    batch_size = options["batch_size"]
+    now = timezone.now()
+    base = timezone.make_aware(BASE_DATE)
+    history_days = (now - base).days
+    service_ids = list(context["plans_by_service"])
+
+    users = User.objects.bulk_create(
+        (
+            User(
+                phone=f"g{seed}-{number}",
+                email=f"user{number}@example.com",
+                password=context["password"],
+            )
+            for number in range(first_user, last_user)
+        ),
+        batch_size=batch_size,
+    )
+    accounts = Account.objects.bulk_create(
+        (
+            Account(user=user, account_status=True)
+            for user in users
+            for _ in range(2 if rng.random() < 0.3 else 1)
+        ),
+        batch_size=batch_size,
+    )
+    BalanceSnapshot.objects.bulk_create(
+        (
+            BalanceSnapshot(account=account, balance=rng.randint(0, 5000))
+            for account in accounts
+        ),
+        batch_size=batch_size,
+    )
+    user_accounts = {}
+    for account in accounts:
+        user_accounts.setdefault(account.user_id, []).append(account)
+
+    plans = []
+    for user in users:
+        count = min(
+            rng.randint(0, 2 * options["subscriptions_per_user"]),
+            len(service_ids),
+        )
+        for service_id in rng.sample(service_ids, count):
+            plans.append(
+                (user, rng.choice(context["plans_by_service"][service_id]))
+            )
+    starts = [
+        base + timedelta(days=rng.randint(0, history_days)) for _ in plans
+    ]
+    access_codes = AccessCode.objects.bulk_create(
+        (
+            AccessCode(end_date=start + timedelta(days=plan[2]))
+            for (_, plan), start in zip(plans, starts)
+        ),
+        batch_size=batch_size,
+    )
+    user_subscriptions = []
+    payments = []
+    for (user, plan), start, access_code in zip(plans, starts, access_codes):
+        plan_id, price, period, cashback = plan
+        charges = min(
+            rng.randint(1, 2 * options["payments_per_subscription"]),
+            (now - start).days // period + 1,
+        )
+        end = start + timedelta(days=period * charges)
+        user_subscriptions.append(
+            UserSubscription(
+                user_id=user,
+                subscription_id=plan_id,
+                access_code=access_code,
+                status=end > now,
+                renewal=rng.random() < 0.7,
+                activation=True,
+                start=start,
+                end=end,
+                trial=False,
+            )
+        )
+        account = rng.choice(user_accounts[user.id])
+        for charge in range(charges):
+            payments.append(
+                (
+                    Payment(
+                        amount=price,
+                        date=start + timedelta(days=period * charge),
+                        document_id=context["document_id"],
+                        user_subscription_id=plan_id,
+                        account_id=account,
+                    ),
+                    CashbackApplied(
+                        amount=price * cashback // 100,
+                        applied_status=rng.random() < 0.5,
+                    ),
+                )
+            )
+    UserSubscription.objects.bulk_create(
+        user_subscriptions, batch_size=batch_size
+    )
+    if connection.vendor == "postgresql":
+        copy_payments(payments)
+    else:
+        cashbacks = CashbackApplied.objects.bulk_create(
+            (cashback for _, cashback in payments), batch_size=batch_size
+        )
+        for (payment, _), cashback in zip(payments, cashbacks):
+            payment.cashback_applied = cashback
+        with historical_dates():
+            Payment.objects.bulk_create(
+                (payment for payment, _ in payments), batch_size=batch_size
+            )
+    return {
+        "users": len(users),
+        "accounts": len(accounts),
+        "subscriptions": len(user_subscriptions),
+        "payments": len(payments),
+    }
+
+
+def generate_shard(task):
+    shard, first_user, last_user, options, context = task
+    rng = random.Random(f"{options['seed']}:{shard}")
+    try:
+        with transaction.atomic():
+            return generate_chunk(rng, first_user, last_user, options,
+                                  context)
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Создает синтетический набор данных заданного масштаба: "
+        "пользователи, счета, сервисы, планы, подписки, коды доступа, "
+        "кэшбэки и платежи. При одинаковом --seed содержимое "
+        "совпадает. Пользователи делятся на пачки, которые "
+        "записываются параллельно процессами; в PostgreSQL платежи "
+        "и кэшбэки загружаются через COPY."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--users", type=int, default=10_000)
+        parser.add_argument("--categories", type=int, default=10)
+        parser.add_argument("--services", type=int, default=200)
+        parser.add_argument("--plans-per-service", type=int, default=3)
+        parser.add_argument(
+            "--subscriptions-per-user",
+            type=int,
+            default=3,
+            help="Среднее количество подписок пользователя.",
+        )
+        parser.add_argument(
+            "--payments-per-subscription",
+            type=int,
+            default=3,
+            help="Среднее количество платежей по подписке.",
+        )
+        parser.add_argument(
+            "--chunk-users",
+            type=int,
+            default=5000,
+            help="Пользователей в одной пачке (транзакции).",
+        )
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=multiprocessing.cpu_count(),
+            help="Параллельных процессов; SQLite всегда пишет в один.",
+        )
+
+    def handle(self, *args, **options):
+        if User.objects.filter(phone__startswith=f"g{options['seed']}-"
+                               ).exists():
+            raise CommandError(
+                f"Данные с --seed {options['seed']} уже созданы."
+            )
+        workers = options["workers"]
+        if connection.vendor == "sqlite":
+            workers = 1
+        started = time.perf_counter()
+        rng = random.Random(options["seed"])
+        with transaction.atomic():
+            plans_by_service = create_catalog(rng, options)
+            document = Document.objects.order_by("id").last()
+            if document is None:
+                document = Document.objects.create(
+                    name="Условия Сервиса", text=""
+                )
+        context = {
+            "plans_by_service": plans_by_service,
+            "document_id": document.id,
+            "password": make_password(None),
+        }
+        chunk = options["chunk_users"]
+        tasks = [
+            (shard, first, min(first + chunk, options["users"]), options,
+             context)
+            for shard, first in enumerate(range(0, options["users"], chunk))
+        ]
+        totals = {"users": 0, "accounts": 0, "subscriptions": 0,
+                  "payments": 0}
+        if workers > 1:
+            connections.close_all()
+            with multiprocessing.get_context("fork").Pool(workers) as pool:
+                results = pool.imap_unordered(generate_shard, tasks)
+                self.collect(results, totals, started)
+        else:
+            self.collect(map(generate_shard, tasks), totals, started)
+
+        catalog = rebuild_service_catalog()
+        rollups = rebuild_spend_rollups()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Готово за {elapsed:.1f} с: пользователей "
+                f"{totals['users']}, счетов {totals['accounts']}, подписок "
+                f"{totals['subscriptions']}, платежей {totals['payments']} "
+                f"({totals['payments'] / elapsed:.0f} в секунду), строк "
+                f"витрины {catalog}, строк сводки расходов {rollups}."
+            )
+        )
+
+    def collect(self, results, totals, started):
+        for result in results:
+            for key, value in result.items():
+                totals[key] += value
+            self.stdout.write(
+                f"пользователей: {totals['users']}, платежей: "
+                f"{totals['payments']}, "
+                f"{time.perf_counter() - started:.1f} с"
+            )
@@ -0,0 +1,59 @@
+# Generated by Django 5.0.3 on 2026-10-17 17:41
+
+from django.db import migrations, models
+
+BLOCK_SIZE = 100
+
+SEQUENCES = (
+    ("receipt_number_seq", "payments", "Payment", "receipt", "R"),
+    ("account_number_seq", "users", "Account", "account_number", "AN"),
+)
+
+
+def create_sequences(apps, schema_editor):
+    NumberSequence = apps.get_model("api", "NumberSequence")
+    for name, app_label, model_name, field, prefix in SEQUENCES:
+        model = apps.get_model(app_label, model_name)
+        last_number = (
+            model.objects.order_by("id").values_list(field, flat=True).last()
+        )
+        start = int(last_number.split(prefix)[-1]) + 1 if last_number else 1
+        if schema_editor.connection.vendor == "postgresql":
+            schema_editor.execute(
+                f"CREATE SEQUENCE IF NOT EXISTS {name} "
+                f"INCREMENT BY {BLOCK_SIZE} START WITH {start}"
+            )
+        else:
+            NumberSequence.objects.update_or_create(
+                name=name, defaults={"value": start}
+            )
+
+
+def drop_sequences(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        for name, *_ in SEQUENCES:
+            schema_editor.execute(f"DROP SEQUENCE IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_idempotencykey'),
+        ('payments', '0008_alter_payment_account_id_and_more'),
+        ('users', '0013_account_account_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NumberSequence',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=1)),
+            ],
+            options={
+                'verbose_name': 'Последовательность номеров',
+                'verbose_name_plural': 'Последовательности номеров',
+            },
+        ),
+        migrations.RunPython(create_sequences, drop_sequences),
+    ]
@@ -0,0 +1,49 @@
+from django.db import models
+
+
+class ChangeCounter(models.Model):
+    name = models.CharField(max_length=50, primary_key=True)
+    version = models.BigIntegerField(default=0)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Счётчик изменений"
+        verbose_name_plural = "Счётчики изменений"
+
+    def __str__(self):
+        return f"{self.name}: {self.version}"
+
+
+class IdempotencyKey(models.Model):
+    id = models.BigAutoField(primary_key=True)
+    scope = models.CharField(max_length=255)
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(blank=True, null=True)
+    response = models.JSONField(blank=True, null=True)
+    created = models.DateTimeField()
+    expires = models.DateTimeField(db_index=True)
+
+    class Meta:
+        verbose_name = "Ключ идемпотентности"
+        verbose_name_plural = "Ключи идемпотентности"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["scope", "key"], name="unique_idempotency_key"
+            ),
+        ]
+
+    def __str__(self):
+        return self.key
+
+
+class NumberSequence(models.Model):
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.BigIntegerField(default=1)
+
+    class Meta:
+        verbose_name = "Последовательность номеров"
+        verbose_name_plural = "Последовательности номеров"
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
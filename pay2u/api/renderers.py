@@ -0,0 +1,54 @@
+import orjson
+from django.http import HttpResponse
+from rest_framework import renderers
+from rest_framework.utils import encoders
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+_encoder = encoders.JSONEncoder()
+
+
+def dumps(data) -> bytes:
+    """
+    Кодирует данные в компактный JSON (UTF-8) через orjson.
+    Типы, которых orjson не знает (Decimal, ленивые строки,
+    QuerySet и т.п.), и даты кодируются так же, как в DRF.
+    Результат совпадает с JSONRenderer байт в байт.
+    """
+    content = orjson.dumps(data, default=_encoder.default,
+                           option=ORJSON_OPTIONS)
+    # Как и DRF, экранирует разделители строк, недопустимые в JavaScript.
+    if b"\xe2\x80\xa8" in content or b"\xe2\x80\xa9" in content:
+        content = content.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+    return content
+
+
+def json_response(data=None, status: int = 200) -> HttpResponse:
+    """
+    Ответ JSON для представлений без DRF (асинхронных).
+    Тело совпадает с ответом ORJSONRenderer.
+    """
+    return HttpResponse(
+        b"" if data is None else dumps(data),
+        content_type="application/json",
+        status=status,
+    )
+
+
+class ORJSONRenderer(renderers.JSONRenderer):
+    """
+    JSONRenderer на orjson. Ответы с отступами (запрошенные через
+    параметр indent в Accept) отдаются стандартным рендерером.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        return dumps(data)
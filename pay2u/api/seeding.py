@@ -0,0 +1,120 @@
+import uuid
+from datetime import timedelta
+
+from django.utils import timezone
+
+from payments.models import CashbackApplied, Document, Payment
+from payments.rollups import add_payments
+from services.models import Category, Service
+from subscriptions.models import (
+    AccessCode,
+    Subscription,
+    TrialPeriod,
+    UserSubscription
+)
+from users.ledger import credit
+from users.models import Account, LedgerEntry, User
+
+
+class Rollback(Exception):
+    """
+    Выбрасывается, чтобы откатить транзакцию с тестовыми данными.
+    """
+
+
+def seed_user(size: int, accounts: int = 3, balance: int = 100000) -> dict:
+    """
+    Создает пользователя с size подписками на разные сервисы
+    (с пробным периодом и кодом доступа) и по одному платежу
+    на каждую подписку, распределенному по accounts счетам.
+
+    Возвращает:
+        Словарь созданных объектов: user, accounts, services, plans,
+        user_subscriptions, payments.
+    """
+    tag = uuid.uuid4().hex[:8]
+    now = timezone.now()
+    user = User.objects.create_user(
+        phone=f"seed-{tag}",
+        email=f"seed-{tag}@example.com",
+        password="seed",
+    )
+    user_accounts = [
+        Account.objects.create(user=user) for _ in range(accounts)
+    ]
+    for account in user_accounts:
+        credit(account.id, balance, LedgerEntry.TOPUP)
+    category = Category.objects.create(name=f"seed-{tag}")
+    services = []
+    plans = []
+    for number in range(size):
+        service = Service.objects.create(
+            name=f"seed-{tag}-{number}",
+            image="services/images/seed.png",
+            description="",
+            conditions="",
+            website="https://example.com",
+            instruction="",
+            rules="",
+            category=category,
+        )
+        services.append(service)
+        plans.append(
+            Subscription.objects.create(
+                name=f"seed-{tag}-{number}",
+                availability=True,
+                price=10,
+                period=30,
+                cashback=5,
+                service_id=service,
+                trial_period=TrialPeriod.objects.create(
+                    period_days=7, period_cost=1
+                ),
+                activation_method="Телефон",
+            )
+        )
+    access_codes = AccessCode.objects.bulk_create(
+        AccessCode(end_date=now + timedelta(days=30)) for _ in plans
+    )
+    user_subscriptions = UserSubscription.objects.bulk_create(
+        UserSubscription(
+            user_id=user,
+            subscription=plan,
+            access_code=access_code,
+            status=number % 3 != 0,
+            renewal=number % 2 == 0,
+            activation=True,
+            start=now,
+            end=now + timedelta(days=number + 1),
+            trial=False,
+        )
+        for number, (plan, access_code) in enumerate(
+            zip(plans, access_codes)
+        )
+    )
+    document = Document.objects.order_by("id").last()
+    if document is None:
+        document = Document.objects.create(name="seed", text="")
+    cashbacks = CashbackApplied.objects.bulk_create(
+        CashbackApplied(amount=plan.price * plan.cashback // 100)
+        for plan in plans
+    )
+    payments = Payment.objects.bulk_create(
+        Payment(
+            amount=plan.price,
+            document=document,
+            cashback_applied=cashback,
+            user_subscription=plan,
+            account_id=user_accounts[number % accounts],
+        )
+        for number, (plan, cashback) in enumerate(zip(plans, cashbacks))
+    )
+    add_payments([payment.id for payment in payments])
+    return {
+        "user": user,
+        "accounts": user_accounts,
+        "services": services,
+        "plans": plans,
+        "user_subscriptions": user_subscriptions,
+        "payments": payments,
+    }
@@ -0,0 +1,104 @@
+import os
+import threading
+
+from django.db import connection, transaction
+from django.db.models import F
+
+from .models import NumberSequence
+
+# Должен совпадать с INCREMENT BY последовательностей в миграции
+# api.0003_numbersequence.
+BLOCK_SIZE = 100
+
+RECEIPT_SEQUENCE = "receipt_number_seq"
+ACCOUNT_NUMBER_SEQUENCE = "account_number_seq"
+
+
+class _Block(threading.local):
+    """
+    Блок номеров потока: блок, зарезервированный в транзакции,
+    принадлежит соединению этого потока до ее фиксации.
+    """
+
+    pid = None
+    next = 0
+    end = 0
+    pending = None
+
+
+class BlockAllocator:
+    """
+    Выдает номера из последовательности блоками по BLOCK_SIZE.
+    Обращение к БД происходит один раз на блок; у каждого потока
+    свой блок, номера уникальны между потоками и процессами,
+    но неиспользованный остаток блока теряется.
+
+    В PostgreSQL блок резервирует nextval() последовательности
+    с шагом BLOCK_SIZE, в остальных СУБД - строка NumberSequence.
+    Вне транзакции увеличение строки фиксируется сразу. Внутри
+    транзакции оно откатывается вместе с ней, поэтому блок выдает
+    номера только в этой же транзакции, пока она не зафиксирована;
+    после отката (в том числе до точки сохранения) блок отбрасывается.
+    """
+
+    def __init__(self, sequence_name: str):
+        self.sequence_name = sequence_name
+        self._block = _Block()
+
+    def next(self) -> int:
+        block = self._block
+        if (
+            block.pid != os.getpid()
+            or block.next >= block.end
+            or not self._block_committed(block)
+        ):
+            block.next = self._reserve_block(block)
+            block.end = block.next + BLOCK_SIZE
+            block.pid = os.getpid()
+        number = block.next
+        block.next += 1
+        return number
+
+    def discard_block(self) -> None:
+        """
+        Следующий номер потока будет взят из нового блока.
+        """
+        self._block.end = self._block.next
+
+    @staticmethod
+    def _block_committed(block: _Block) -> bool:
+        """
+        Блок можно использовать, если его резервирование зафиксировано
+        или будет зафиксировано вместе с текущей транзакцией потока.
+        """
+        pending = block.pending
+        if pending is None:
+            return True
+        return any(
+            callback is pending
+            for _, callback, _ in connection.run_on_commit
+        )
+
+    def _reserve_block(self, block: _Block) -> int:
+        block.pending = None
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT nextval(%s)", [self.sequence_name])
+                return cursor.fetchone()[0]
+        in_transaction = connection.in_atomic_block
+        with transaction.atomic():
+            sequences = NumberSequence.objects.filter(name=self.sequence_name)
+            sequences.update(value=F("value") + BLOCK_SIZE)
+            start = sequences.values_list("value", flat=True).get()
+        if in_transaction:
+            def committed():
+                if block.pending is committed:
+                    block.pending = None
+
+            block.pending = committed
+            transaction.on_commit(committed)
+        return start - BLOCK_SIZE
+
+
+receipt_numbers = BlockAllocator(RECEIPT_SEQUENCE)
+account_numbers = BlockAllocator(ACCOUNT_NUMBER_SEQUENCE)
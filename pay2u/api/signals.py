@@ -0,0 +1,89 @@
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from payments.models import Document, Payment
+from services.models import Service
+from subscriptions.catalog import catalog_changed
+from subscriptions.models import (
+    AccessCode,
+    Subscription,
+    TrialPeriod,
+    UserSubscription
+)
+from users.models import Account
+from .cache import (
+    ACCOUNT_SCOPE,
+    PAYMENTS_CACHE,
+    PAYMENT_SCOPE,
+    SUBSCRIPTIONS_CACHE,
+    invalidate_generations_on_commit,
+    invalidate_on_commit,
+    invalidate_users_on_commit
+)
+from .catalog import CATALOG_COUNTER
+from .connections import count_connection, count_request
+from .counters import DOCUMENT_COUNTER, bump
+
+# Семейства кэша ответов, которые зависят от модели. Платежи и счета
+# сбрасывают только ответы своего пользователя, счёта и платежа.
+CACHE_DEPENDENCIES = {
+    Service: (SUBSCRIPTIONS_CACHE, PAYMENTS_CACHE),
+    Subscription: (SUBSCRIPTIONS_CACHE,),
+    TrialPeriod: (SUBSCRIPTIONS_CACHE,),
+    AccessCode: (SUBSCRIPTIONS_CACHE,),
+}
+
+
+@receiver(catalog_changed)
+def bump_catalog_version(sender, **kwargs):
+    bump(CATALOG_COUNTER)
+
+
+@receiver(post_save, sender=Document)
+@receiver(post_delete, sender=Document)
+def bump_document_version(sender, **kwargs):
+    bump(DOCUMENT_COUNTER)
+
+
+def invalidate_cached_responses(sender, **kwargs):
+    invalidate_on_commit(*CACHE_DEPENDENCIES[sender])
+
+
+for model in CACHE_DEPENDENCIES:
+    post_save.connect(invalidate_cached_responses, sender=model)
+    post_delete.connect(invalidate_cached_responses, sender=model)
+
+
+@receiver(post_save, sender=UserSubscription)
+@receiver(post_delete, sender=UserSubscription)
+def invalidate_user_subscriptions(sender, instance, **kwargs):
+    invalidate_users_on_commit([instance.user_id_id])
+
+
+@receiver(post_save, sender=Account)
+@receiver(post_delete, sender=Account)
+def invalidate_account_payments(sender, instance, **kwargs):
+    invalidate_generations_on_commit(ACCOUNT_SCOPE, [instance.id])
+    invalidate_users_on_commit([instance.user_id])
+
+
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Payment)
+def invalidate_payment(sender, instance, **kwargs):
+    invalidate_generations_on_commit(PAYMENT_SCOPE, [instance.id])
+    invalidate_generations_on_commit(
+        ACCOUNT_SCOPE, [instance.account_id_id]
+    )
+    invalidate_users_on_commit([instance.account_id.user_id])
+
+
+@receiver(request_started)
+def count_http_request(sender, **kwargs):
+    count_request()
+
+
+@receiver(connection_created)
+def count_db_connection(sender, connection, **kwargs):
+    count_connection(connection.alias)
@@ -0,0 +1,586 @@
+import json
+import os
+import re
+import statistics
+import threading
+import time
+from contextlib import nullcontext
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import OperationalError, connection, transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.permissions import IsAdminUser
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from payments.views import PaymentsView
+from subscriptions.models import Subscription
+from subscriptions.purchases import (
+    CREATED,
+    DUPLICATE_SERVICE,
+    EXTENDED,
+    NOT_FOUND,
+    REPLACED
+)
+from subscriptions.views import ActiveUserSubscriptionView
+from users.ledger import account_balance
+from users.models import User
+from .cache import invalidate_users
+from .idempotency import IDEMPOTENCY_HEADER
+from .models import IdempotencyKey
+from .seeding import Rollback, seed_user
+from .sequences import (
+    ACCOUNT_NUMBER_SEQUENCE,
+    BLOCK_SIZE,
+    BlockAllocator,
+    account_numbers,
+    receipt_numbers
+)
+from .urls import urlpatterns
+from .views import AddUserSubscriptionsBatchView, AddUserSubscriptionView
+
+# Замеряется стоимость ответа без кэша.
+NO_CACHE = {
+    alias: {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+    for alias in ("default", "counters")
+}
+
+# Количество запросов к БД на один вызов маршрута.
+# Количество не должно зависеть от объема данных пользователя.
+QUERY_BUDGETS = {
+    "GET v1/users/<int:user_id>/main_page/": 1,
+    "GET v1/users/<int:user_id>/home/": 3,
+    "GET v1/users/<int:user_id>/payments/": 2,
+    "GET v1/users/<int:user_id>/payments/export/<str:export_format>/": 1,
+    "GET v1/users/<int:user_id>/services/<service_id>/payment_history/": 2,
+    "GET v1/accounts/<int:account_id>/payment_history/": 1,
+    # Номер счёта берется из нового блока последовательности
+    # (см. exhaust_number_blocks): резервирование выполняется в своей
+    # точке сохранения, это четыре запроса вместе с SAVEPOINT/RELEASE.
+    "POST v1/users/account/<int:account_id>/<str:account_status>/": 6,
+    "PATCH v1/users/account/<int:account_id>/<str:account_status>/": 2,
+    "GET v1/users/<int:user_id>/payment_history/<str:time_period>/": 2,
+    "GET v1/users/<int:user_id>/spend/<str:time_period>/": 3,
+    "GET v1/user_subscriptions/<int:subscription_id>/": 1,
+    "GET v1/users/<int:user_id>/active/": 1,
+    "GET v1/users/<int:user_id>/nonactive/": 1,
+    "GET v1/users/<int:user_id>/user_subscriptions/": 1,
+    "GET v1/users/<int:user_id>/payments_plan/": 1,
+    "GET v1/users/<int:user_id>/services/<int:service_id>/": 1,
+    "GET v1/rules/": 1,
+    "GET v1/payments/<int:payment_id>/": 1,
+    "GET v1/token/": 0,
+    "GET v1/cache/stats/": 0,
+    "GET v1/db/stats/": 0,
+    "GET v1/services/available/": 0,
+    "GET v1/categories/<str:category_name>/": 0,
+    "GET v1/services/<str:service_name>/": 0,
+    "PATCH v1/user_subscriptions/<int:user_subscription_id>/autorenewal/":
+        2,
+    "POST v1/users/<int:user_id>/subscriptions/": 11,
+    "POST v1/users/<int:user_id>/subscriptions/batch/": 12,
+}
+
+# Отчет о задержках маршрутов для самого большого набора данных.
+# Если файл отчета уже есть, задержки сравниваются с ним.
+LATENCY_REPORT = os.getenv("QUERY_BUDGET_REPORT", "query_budget.json")
+LATENCY_REPEAT = int(os.getenv("QUERY_BUDGET_REPEAT", "20"))
+
+METHODS = ("get", "post", "patch", "put", "delete")
+PARAMETER = re.compile(r"<(?:\w+:)?(\w+)>")
+
+
+def route_kwargs(seed: dict) -> dict:
+    today = timezone.localdate()
+    return {
+        "user_id": seed["user"].id,
+        "service_id": seed["services"][0].id,
+        "account_id": seed["accounts"][0].id,
+        "account_status": "true",
+        "time_period": f"{today - timedelta(days=365)}_{today}",
+        "subscription_id": seed["user_subscriptions"][1].id,
+        "user_subscription_id": seed["user_subscriptions"][0].id,
+        "payment_id": seed["payments"][0].id,
+        "category_name": seed["services"][0].category.name,
+        "service_name": seed["services"][0].name,
+        "export_format": "csv",
+    }
+
+
+def request_body(key: str, seed: dict):
+    account_id = seed["accounts"][0].id
+    bodies = {
+        "POST v1/users/<int:user_id>/subscriptions/": {
+            "subscription_id": seed["plans"][0].id,
+            "account_id": account_id,
+        },
+        "POST v1/users/<int:user_id>/subscriptions/batch/": {
+            "subscription_ids": [plan.id for plan in seed["plans"]],
+            "account_id": account_id,
+        },
+        "PATCH v1/user_subscriptions/<int:user_subscription_id>/"
+        "autorenewal/": {"renewal": False},
+    }
+    return bodies.get(key, {})
+
+
+def route_methods():
+    for pattern in urlpatterns:
+        route = str(pattern.pattern)
+        for method in METHODS:
+            if hasattr(pattern.callback.view_class, method):
+                yield f"{method.upper()} {route}", pattern, method
+
+
+def admin_only(pattern) -> bool:
+    return IsAdminUser in pattern.callback.view_class.permission_classes
+
+
+def percentile(values, percent: int) -> float:
+    if len(values) < 2:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[
+        percent - 1
+    ]
+
+
+def exhaust_number_blocks():
+    """
+    Следующий номер счёта или чека резервирует новый блок, поэтому
+    количество запросов не зависит от состояния процесса.
+    """
+    for allocator in (account_numbers, receipt_numbers):
+        allocator.discard_block()
+
+
+@override_settings(CACHES=NO_CACHE)
+class QueryBudgetTests(TestCase):
+    sizes = (2, 10, 50)
+
+    @classmethod
+    def setUpTestData(cls):
+        # Маршруты статистики доступны только сотрудникам.
+        cls.staff = User.objects.create_superuser(
+            phone="budget-staff",
+            email="budget-staff@example.com",
+            password="budget-staff",
+        )
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+    def call_route(self, pattern, method: str, key: str, seed: dict,
+                   queries: int = None):
+        """
+        Вызывает маршрут и откатывает его изменения в БД.
+        Если задано queries, проверяет количество запросов вызова.
+        """
+        kwargs = route_kwargs(seed)
+        route = str(pattern.pattern)
+        path = "/api/" + PARAMETER.sub(
+            lambda match: str(kwargs[match.group(1)]), route
+        )
+        request = getattr(self.factory, method)(
+            path, request_body(key, seed), format="json"
+        )
+        force_authenticate(
+            request, user=self.staff if admin_only(pattern) else seed["user"]
+        )
+        exhaust_number_blocks()
+        try:
+            with transaction.atomic():
+                with (
+                    nullcontext() if queries is None
+                    else self.assertNumQueries(queries)
+                ):
+                    response = pattern.callback(
+                        request,
+                        **{
+                            name: kwargs[name]
+                            for name in PARAMETER.findall(route)
+                        },
+                    )
+                    if response.streaming:
+                        b"".join(response.streaming_content)
+                    else:
+                        response.render()
+                raise Rollback
+        except Rollback:
+            pass
+        return response
+
+    def test_every_route_has_budget(self):
+        for key, _, _ in route_methods():
+            with self.subTest(route=key):
+                self.assertIn(key, QUERY_BUDGETS)
+
+    def test_query_budgets(self):
+        """
+        Количество запросов каждого маршрута равно бюджету
+        и не растет с количеством подписок и платежей.
+        Задержки p50/p95 на самом большом наборе данных сохраняются
+        в отчет LATENCY_REPORT.
+        """
+        routes = {}
+        for size in self.sizes:
+            seed = seed_user(size)
+            for key, pattern, method in route_methods():
+                with self.subTest(route=key, size=size):
+                    # Первый вызов заполняет кэши процесса (каталог,
+                    # счетчики версий), они не входят в бюджет.
+                    self.call_route(pattern, method, key, seed)
+                    response = self.call_route(
+                        pattern, method, key, seed, QUERY_BUDGETS[key]
+                    )
+                    if admin_only(pattern):
+                        self.assertEqual(response.status_code, 200)
+                    self.assertLess(response.status_code, 500)
+                if size == self.sizes[-1]:
+                    routes[key] = {
+                        "budget": QUERY_BUDGETS[key],
+                        "status": response.status_code,
+                        **self.latency(pattern, method, key, seed),
+                    }
+        self.write_report(routes)
+
+    def latency(self, pattern, method: str, key: str, seed: dict) -> dict:
+        timings = []
+        for _ in range(LATENCY_REPEAT):
+            started = time.perf_counter()
+            self.call_route(pattern, method, key, seed)
+            timings.append((time.perf_counter() - started) * 1000)
+        return {
+            "p50_ms": percentile(timings, 50) if timings else 0.0,
+            "p95_ms": percentile(timings, 95) if timings else 0.0,
+        }
+
+    def write_report(self, routes: dict):
+        """
+        Сохраняет задержки маршрутов и печатает их сравнение
+        с предыдущим отчетом, если он есть.
+        """
+        previous = {}
+        if os.path.exists(LATENCY_REPORT):
+            with open(LATENCY_REPORT, encoding="utf-8") as report:
+                previous = json.load(report).get("routes", {})
+        lines = []
+        for key, route in routes.items():
+            line = (
+                f"{key}: p50 {route['p50_ms']:.2f} мс, "
+                f"p95 {route['p95_ms']:.2f} мс"
+            )
+            before = previous.get(key)
+            if before is not None:
+                line += (
+                    f" (было p50 {before['p50_ms']:.2f} мс, "
+                    f"p95 {before['p95_ms']:.2f} мс)"
+                )
+            lines.append(line)
+        print("\n".join(lines))
+        report = {
+            "sizes": list(self.sizes),
+            "repeat": LATENCY_REPEAT,
+            "routes": routes,
+        }
+        with open(LATENCY_REPORT, "w", encoding="utf-8") as output:
+            json.dump(report, output, ensure_ascii=False, indent=2)
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+
+    def get(self, view, user, path: str, **kwargs):
+        request = self.factory.get(path)
+        force_authenticate(request, user=user)
+        response = view.as_view()(request, **kwargs)
+        if hasattr(response, "render"):
+            response.render()
+        return response
+
+    def test_hit_does_not_query_database(self):
+        """
+        Повторный ответ берется из кэша без обращения к БД,
+        сброс поколения пользователя виден сразу.
+        """
+        user = seed_user(2)["user"]
+        path = f"/api/v1/users/{user.id}/active/"
+        view = ActiveUserSubscriptionView
+        first = self.get(view, user, path, user_id=user.id)
+        with self.assertNumQueries(0):
+            response = self.get(view, user, path, user_id=user.id)
+        self.assertEqual(response.content, first.content)
+        invalidate_users([user.id])
+        # Счётчик поколения перечитывается из общего кэша.
+        with self.assertNumQueries(2):
+            self.get(view, user, path, user_id=user.id)
+
+    def test_payment_change_invalidates_only_its_owner(self):
+        """
+        Изменение платежа сбрасывает ответы его владельца,
+        кэш платежей других пользователей остается.
+        """
+        owner, other = seed_user(2), seed_user(2)
+        for seed in (owner, other):
+            user = seed["user"]
+            self.get(
+                PaymentsView, user, f"/api/v1/users/{user.id}/payments/",
+                user_id=user.id,
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            owner["payments"][0].save()
+        user = other["user"]
+        with self.assertNumQueries(0):
+            self.get(
+                PaymentsView, user, f"/api/v1/users/{user.id}/payments/",
+                user_id=user.id,
+            )
+        user = owner["user"]
+        # Счётчик поколения и два запроса представления.
+        with self.assertNumQueries(3):
+            self.get(
+                PaymentsView, user, f"/api/v1/users/{user.id}/payments/",
+                user_id=user.id,
+            )
+
+
+class PurchaseTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.buyer = seed_user(3)
+        self.other = seed_user(2)
+        self.account = self.buyer["accounts"][0]
+
+    def post(self, view, body: dict, key: str = None):
+        user = self.buyer["user"]
+        headers = {IDEMPOTENCY_HEADER: key} if key else {}
+        request = self.factory.post(
+            f"/api/v1/users/{user.id}/subscriptions/",
+            body,
+            format="json",
+            headers=headers,
+        )
+        force_authenticate(request, user=user)
+        response = view.as_view()(request, user_id=user.id)
+        response.render()
+        return response
+
+    def purchase_body(self) -> dict:
+        return {
+            "subscription_id": self.buyer["plans"][0].id,
+            "account_id": self.account.id,
+        }
+
+    def test_replay_does_not_debit_twice(self):
+        """
+        Повтор запроса с тем же ключом и телом возвращает сохраненный
+        ответ, деньги списываются один раз.
+        """
+        balance = account_balance(self.account.id)
+        first = self.post(AddUserSubscriptionView, self.purchase_body(), "k")
+        replay = self.post(
+            AddUserSubscriptionView, self.purchase_body(), "k"
+        )
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(replay.status_code, 200)
+        self.assertEqual(replay["Idempotent-Replayed"], "true")
+        self.assertEqual(replay.content, first.content)
+        price = self.buyer["plans"][0].price
+        self.assertEqual(account_balance(self.account.id), balance - price)
+
+    def test_key_reused_with_other_body(self):
+        self.post(AddUserSubscriptionView, self.purchase_body(), "k")
+        body = self.purchase_body()
+        body["subscription_id"] = self.buyer["plans"][1].id
+        response = self.post(AddUserSubscriptionView, body, "k")
+        self.assertEqual(response.status_code, 422)
+
+    @override_settings(IDEMPOTENCY_WAIT_TIMEOUT=0)
+    def test_key_in_progress(self):
+        """
+        Пока первый запрос с ключом не завершен, дубликат получает 409.
+        """
+        self.post(AddUserSubscriptionView, self.purchase_body(), "k")
+        IdempotencyKey.objects.filter(key="k").update(
+            status_code=None, response=None
+        )
+        response = self.post(
+            AddUserSubscriptionView, self.purchase_body(), "k"
+        )
+        self.assertEqual(response.status_code, 409)
+
+    def test_validation_error_replayed(self):
+        """
+        Ответ 400 на некорректный запрос сохраняется за ключом
+        и повторяется, ключ не освобождается.
+        """
+        body = {"subscription_id": 0, "account_id": self.account.id}
+        first = self.post(AddUserSubscriptionView, body, "k")
+        replay = self.post(AddUserSubscriptionView, body, "k")
+        self.assertEqual(first.status_code, 400)
+        self.assertEqual(replay.status_code, 400)
+        self.assertEqual(replay["Idempotent-Replayed"], "true")
+        self.assertEqual(replay.data, first.data)
+
+    @override_settings(
+        IDEMPOTENCY_WAIT_TIMEOUT=0.05, IDEMPOTENCY_POLL_INTERVAL=0.01
+    )
+    def test_released_key_waits_with_backoff(self):
+        """
+        Если ключ освобождается между попыткой занять его и чтением
+        записи, следующая попытка ждет паузу, а ожидание ограничено.
+        """
+        with mock.patch(
+            "api.idempotency._claim", return_value=(None, False)
+        ) as claim:
+            response = self.post(
+                AddUserSubscriptionView, self.purchase_body(), "k"
+            )
+        self.assertEqual(response.status_code, 409)
+        self.assertLessEqual(claim.call_count, 10)
+
+    def test_batch_results_per_plan(self):
+        """
+        Пакетная покупка возвращает результат по каждому плану
+        в порядке запроса и списывает сумму выбранных планов.
+        """
+        plans = self.buyer["plans"]
+        # Другой тариф сервиса с активной подпиской.
+        other_plan = Subscription.objects.get(id=plans[2].id)
+        other_plan.pk = None
+        other_plan.name += "-other"
+        other_plan.price = 25
+        other_plan.save()
+        balance = account_balance(self.account.id)
+        response = self.post(
+            AddUserSubscriptionsBatchView,
+            {
+                "subscription_ids": [
+                    plans[0].id,
+                    plans[1].id,
+                    other_plan.id,
+                    plans[1].id,
+                    0,
+                ],
+                "account_id": self.account.id,
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [item["result"] for item in response.data],
+            [CREATED, EXTENDED, REPLACED, DUPLICATE_SERVICE, NOT_FOUND],
+        )
+        self.assertEqual(
+            account_balance(self.account.id),
+            balance - plans[0].price - plans[1].price - other_plan.price,
+        )
+
+    def test_other_users_account_not_debited(self):
+        """
+        Покупка со счёта другого пользователя - 404 без списания.
+        """
+        account = self.other["accounts"][0]
+        balance = account_balance(account.id)
+        plans = self.buyer["plans"]
+        calls = (
+            (
+                AddUserSubscriptionView,
+                {"subscription_id": plans[0].id, "account_id": account.id},
+            ),
+            (
+                AddUserSubscriptionsBatchView,
+                {
+                    "subscription_ids": [plan.id for plan in plans],
+                    "account_id": account.id,
+                },
+            ),
+        )
+        for view, body in calls:
+            with self.subTest(view=view.__name__):
+                response = self.post(view, body)
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(account_balance(account.id), balance)
+
+    def test_invalid_account_id_rejected(self):
+        plan = self.buyer["plans"][0]
+        for account_id in ("abc", None, True, 1.5):
+            with self.subTest(account_id=account_id):
+                response = self.post(
+                    AddUserSubscriptionView,
+                    {"subscription_id": plan.id, "account_id": account_id},
+                )
+                self.assertEqual(response.status_code, 400)
+
+
+class CountingAllocator(BlockAllocator):
+    def __init__(self, sequence_name: str):
+        super().__init__(sequence_name)
+        self.reserved = 0
+        self._count_lock = threading.Lock()
+
+    def _reserve_block(self, *args) -> int:
+        start = super()._reserve_block(*args)
+        with self._count_lock:
+            self.reserved += 1
+        return start
+
+
+class BlockAllocatorTests(TestCase):
+    threads = 4
+    numbers = 250
+
+    def test_concurrent_numbers_unique(self):
+        """
+        Потоки получают номера из своих блоков: номера не повторяются,
+        пропуски - не больше остатка блока на поток.
+        """
+        allocator = CountingAllocator(ACCOUNT_NUMBER_SEQUENCE)
+        drawn = []
+        errors = []
+        lock = threading.Lock()
+
+        def draw():
+            # SQLite отвечает на одновременную запись ошибкой блокировки
+            # без ожидания; неудачное резервирование блока повторяется.
+            for _ in range(1000):
+                try:
+                    return allocator.next()
+                except OperationalError:
+                    time.sleep(0.001)
+            return allocator.next()
+
+        def worker():
+            numbers = []
+            try:
+                for position in range(self.numbers):
+                    if position % 2:
+                        numbers.append(draw())
+                        continue
+                    # Блок, зарезервированный в транзакции, используется
+                    # и после ее фиксации.
+                    with transaction.atomic():
+                        numbers.append(draw())
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+                with lock:
+                    drawn.extend(numbers)
+
+        pool = [threading.Thread(target=worker) for _ in range(self.threads)]
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+        self.assertEqual(errors, [])
+        total = self.threads * self.numbers
+        self.assertEqual(len(set(drawn)), total)
+        span = max(drawn) - min(drawn) + 1
+        self.assertLessEqual(span - total, self.threads * BLOCK_SIZE)
+        # Блок потока не отбрасывается из-за резервирований других
+        # потоков.
+        blocks = -(-self.numbers // BLOCK_SIZE)
+        self.assertLessEqual(allocator.reserved, self.threads * blocks)
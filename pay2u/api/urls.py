@@ -1,15 +1,21 @@
+from django.conf import settings
 from django.urls import path
 
+from payments import async_views as payments_async
 from payments.views import (
     AccountPaymentView,
     DocumentView,
     PaymentView,
+    PaymentsExportView,
     PaymentsPeriodView,
     PaymentsView,
-    ServicePaymentsView
+    ServicePaymentsView,
+    SpendSummaryView
 )
+from subscriptions import async_views as subscriptions_async
 from subscriptions.views import (
     ActiveUserSubscriptionView,
+    HomePageView,
     MainPageView,
     NonActiveUserSubscriptionView,
     ServiceUserSubscriptionsView,
@@ -19,12 +25,16 @@ from subscriptions.views import (
     UserSubscriptionsView
 )
 from users.views import AccountView
+from . import async_views as api_async
 from .views import (
     AvailableServicesView,
+    CacheStatsView,
     CategoriesView,
+    ConnectionStatsView,
     CSRFTokenView,
     ServiceView,
-    AddUserSubscriptionView
+    AddUserSubscriptionView,
+    AddUserSubscriptionsBatchView
 )
 
 urlpatterns = [
@@ -33,11 +43,21 @@ urlpatterns = [
         MainPageView.as_view(),
         name="main_page",
     ),
+    path(
+        "v1/users/<int:user_id>/home/",
+        HomePageView.as_view(),
+        name="home_page",
+    ),
     path(
         "v1/users/<int:user_id>/payments/",
         PaymentsView.as_view(),
         name="payments",
     ),
+    path(
+        "v1/users/<int:user_id>/payments/export/<str:export_format>/",
+        PaymentsExportView.as_view(),
+        name="payments_export",
+    ),
     path(
         "v1/users/<int:user_id>/services/<service_id>/payment_history/",
         ServicePaymentsView.as_view(),
@@ -58,6 +78,11 @@ urlpatterns = [
         PaymentsPeriodView.as_view(),
         name="payments_period",
     ),
+    path(
+        "v1/users/<int:user_id>/spend/<str:time_period>/",
+        SpendSummaryView.as_view(),
+        name="spend_summary",
+    ),
     path(
         "v1/user_subscriptions/<int:subscription_id>/",
         UserSubscriptionView.as_view(),
@@ -96,6 +121,16 @@ urlpatterns = [
         PaymentView.as_view(),
         name="payment",
     ),
+    path(
+        "v1/cache/stats/",
+        CacheStatsView.as_view(),
+        name="cache_stats",
+    ),
+    path(
+        "v1/db/stats/",
+        ConnectionStatsView.as_view(),
+        name="connection_stats",
+    ),
     path(
         "v1/token/",
         CSRFTokenView.as_view(),
@@ -125,5 +160,48 @@ urlpatterns = [
         "v1/users/<int:user_id>/subscriptions/",
         AddUserSubscriptionView.as_view(),
         name="add_user_subscription",
-    )
+    ),
+    path(
+        "v1/users/<int:user_id>/subscriptions/batch/",
+        AddUserSubscriptionsBatchView.as_view(),
+        name="add_user_subscriptions_batch",
+    ),
 ]
+
+# Асинхронные реализации представлений чтения. Включаются настройкой
+# ASYNC_VIEWS (по умолчанию - при запуске через pay2u.asgi).
+ASYNC_VIEWS = {
+    AvailableServicesView: api_async.AvailableServicesView,
+    CategoriesView: api_async.CategoriesView,
+    ServiceView: api_async.ServiceView,
+    AccountPaymentView: payments_async.AccountPaymentView,
+    DocumentView: payments_async.DocumentView,
+    PaymentView: payments_async.PaymentView,
+    PaymentsExportView: payments_async.PaymentsExportView,
+    PaymentsPeriodView: payments_async.PaymentsPeriodView,
+    PaymentsView: payments_async.PaymentsView,
+    ServicePaymentsView: payments_async.ServicePaymentsView,
+    SpendSummaryView: payments_async.SpendSummaryView,
+    ActiveUserSubscriptionView: subscriptions_async.ActiveUserSubscriptionView,
+    HomePageView: subscriptions_async.HomePageView,
+    MainPageView: subscriptions_async.MainPageView,
+    NonActiveUserSubscriptionView:
+        subscriptions_async.NonActiveUserSubscriptionView,
+    ServiceUserSubscriptionsView:
+        subscriptions_async.ServiceUserSubscriptionsView,
+    UserPaymentsPlanView: subscriptions_async.UserPaymentsPlanView,
+    UserSubscriptionView: subscriptions_async.UserSubscriptionView,
+    UserSubscriptionsView: subscriptions_async.UserSubscriptionsView,
+}
+
+if settings.ASYNC_VIEWS:
+    urlpatterns = [
+        path(
+            str(pattern.pattern),
+            ASYNC_VIEWS[pattern.callback.view_class].as_view(),
+            name=pattern.name,
+        )
+        if getattr(pattern.callback, "view_class", None) in ASYNC_VIEWS
+        else pattern
+        for pattern in urlpatterns
+    ]
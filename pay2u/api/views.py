@@ -1,35 +1,91 @@
-from datetime import datetime, timedelta
-
-from django.db.models import Min
 from django.middleware.csrf import get_token
-from django.shortcuts import get_object_or_404
-from rest_framework import status
+from rest_framework import permissions, status
 from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from services.models import Service
-from subscriptions.models import UserSubscription, Subscription
-from subscriptions.serializers import (
-    AvailableServiceSerializer, UserSubscriptionSerializer
+from subscriptions.models import Subscription
+from subscriptions.purchases import (
+    purchase_subscription,
+    purchase_subscriptions
 )
+from subscriptions.serializers import UserSubscriptionSerializer
+from users.authentication import issue_token
+from users.ledger import InsufficientFunds
 from users.models import Account, User
-from .utils import query_min_price_sort
+from .cache import cache_stats
+from .catalog import CATALOG_COUNTER, get_catalog
+from .connections import connection_stats
+from .conditional import versioned_get
+from .idempotency import idempotent
+
+
+def get_account_id_or_error(data) -> int:
+    """
+    Идентификатор счёта из тела запроса.
+    Если это не целое число - ValidationError.
+    """
+    account_id = data.get("account_id")
+    if isinstance(account_id, str) and account_id.isdigit():
+        return int(account_id)
+    if isinstance(account_id, int) and not isinstance(account_id, bool):
+        return account_id
+    raise ValidationError("account_id - идентификатор счёта.")
 
 
 class CSRFTokenView(APIView):
     def get(self, request):
         """
-        Метод получения токена CSRF.
+        Метод получения токена CSRF и токена авторизации.
         Postman use-case -  Headers: X-CSRFToken: <csrf_token>
+        или Authorization: Bearer <auth_token> (без CSRF и сессии)
 
         Возвращает:
-            CSRF токен.
+            CSRF токен и подписанный токен текущего пользователя.
         """
         csrf_token = get_token(request)
-        return Response({"csrf_token": csrf_token})
+        return Response(
+            {
+                "csrf_token": csrf_token,
+                "auth_token": (
+                    issue_token(request.user)
+                    if request.user.is_authenticated
+                    else None
+                ),
+            }
+        )
+
+
+class CacheStatsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        """
+        Метод получения статистики кэша ответов API процесса,
+        обработавшего запрос. Доступен только сотрудникам.
+
+        Возвращает:
+            Попадания и промахи по семействам ключей кэша.
+        """
+        return Response(cache_stats())
+
+
+class ConnectionStatsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        """
+        Метод получения статистики соединений с БД процесса,
+        обработавшего запрос. Доступен только сотрудникам.
 
+        Возвращает:
+            Настройки постоянных соединений, количество запросов
+            и открытых соединений.
+        """
+        return Response(connection_stats())
 
+
+@versioned_get(CATALOG_COUNTER)
 class AvailableServicesView(APIView):
     def get(self, request):
         """
@@ -38,32 +94,10 @@ class AvailableServicesView(APIView):
         Возвращает:
             Сервисы с тегом "available=True".
         """
-        try:
-            lowest_prices = (
-                Subscription.objects.select_related("service_id")
-                .select_related("trial_period")
-                .values(
-                    "service_id__name",
-                    "service_id__image",
-                    "period",
-                    "cashback",
-                    "trial_period__period_days",
-                    "trial_period__period_cost",
-                    "service_id__popularity",
-                    "service_id__category_id",
-                    "service_id__category_id__name",
-                )
-                .annotate(Min("price"))
-                .order_by("service_id")
-            )
-            ser_data = AvailableServiceSerializer(
-                query_min_price_sort(lowest_prices), many=True
-            ).data
-            return Response(ser_data, status=status.HTTP_200_OK)
-        except Service.DoesNotExist:
-            return Response(status=status.HTTP_404_NOT_FOUND)
+        return Response(get_catalog().available(), status=status.HTTP_200_OK)
 
 
+@versioned_get(CATALOG_COUNTER)
 class CategoriesView(APIView):
     def get(self, request, category_name: str):
         """
@@ -75,35 +109,12 @@ class CategoriesView(APIView):
         Возвращает:
             Сервисы по указанной категории.
         """
-        try:
-            lowest_prices = (
-                Subscription.objects.filter(
-                    service_id__category__name=category_name
-                )
-                .select_related("service_id")
-                .select_related("trial_period")
-                .values(
-                    "service_id__name",
-                    "service_id__image",
-                    "period",
-                    "cashback",
-                    "trial_period__period_days",
-                    "trial_period__period_cost",
-                    "service_id__popularity",
-                    "service_id__category_id",
-                    "service_id__category_id__name",
-                )
-                .annotate(Min("price"))
-                .order_by("service_id")
-            )
-            ser_data = AvailableServiceSerializer(
-                query_min_price_sort(lowest_prices), many=True
-            ).data
-            return Response(ser_data, status=status.HTTP_200_OK)
-        except Service.DoesNotExist:
-            return Response(status=status.HTTP_404_NOT_FOUND)
+        return Response(
+            get_catalog().by_category(category_name), status=status.HTTP_200_OK
+        )
 
 
+@versioned_get(CATALOG_COUNTER)
 class ServiceView(APIView):
     def get(self, request, service_name: str):
         """
@@ -115,112 +126,102 @@ class ServiceView(APIView):
         Возвращает:
             Сервис по указанному названию.
         """
-        try:
-            lowest_prices = (
-                Subscription.objects.filter(service_id__name=service_name)
-                .select_related("service_id")
-                .select_related("trial_period")
-                .values(
-                    "service_id__name",
-                    "service_id__image",
-                    "period",
-                    "cashback",
-                    "trial_period__period_days",
-                    "trial_period__period_cost",
-                    "service_id__popularity",
-                    "service_id__category_id",
-                    "service_id__category_id__name",
-                    "service_id__popularity",
-                )
-                .annotate(Min("price"))
-                .order_by("service_id")
-            )
-            ser_data = AvailableServiceSerializer(
-                query_min_price_sort(lowest_prices), many=True
-            ).data
-            return Response(ser_data, status=status.HTTP_200_OK)
-        except Service.DoesNotExist:
-            return Response(status=status.HTTP_404_NOT_FOUND)
+        return Response(
+            get_catalog().by_service(service_name), status=status.HTTP_200_OK
+        )
 
 
 class AddUserSubscriptionView(APIView):
+    @idempotent
     def post(self, request, user_id):
         """
         Метод организации подписок для пользователя.
         Если подписка уже есть - продлевает.
         Если подписка уже есть, но другой тариф - заменяет.
         Если подписки нет - создает новую.
+
+        Заголовки:
+            Idempotency-Key: повторный запрос с тем же ключом
+            возвращает сохраненный ответ без повторного списания.
         """
-        user = get_object_or_404(User, id=user_id)
         subscription_id = request.data.get("subscription_id")
         subscription = self.get_subscription_or_error(subscription_id)
-        account_id = request.data.get("account_id")
-        account_balance = get_object_or_404(Account, id=account_id)
-        if not self.check_balance(subscription, account_balance):
+        account_id = get_account_id_or_error(request.data)
+        try:
+            user_subscription = purchase_subscription(
+                user_id, subscription, account_id
+            )
+        except (User.DoesNotExist, Account.DoesNotExist):
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        except InsufficientFunds:
             return Response({"error": "Недостаточно средств на счете."},
                             status=status.HTTP_400_BAD_REQUEST)
-        active_subscription = self.get_active_subscription(
-            user_id, subscription.service_id
-        )
-        if active_subscription:
-            if active_subscription.subscription.id == subscription.id:
-                self.extend_subscription(active_subscription, subscription)
-            else:
-                self.deactivate_subscription(active_subscription)
-                new_subscription = self.create_new_subscription(
-                    user, subscription, account_balance
-                )
-                return self.send_response(new_subscription)
-        else:
-            new_subscription = self.create_new_subscription(
-                user, subscription, account_balance
-            )
-            return self.send_response(new_subscription)
-        return self.send_response(active_subscription)
+        return self.send_response(user_subscription)
 
     def get_subscription_or_error(self, subscription_id):
         try:
-            return Subscription.objects.get(id=subscription_id)
-        except Subscription.DoesNotExist:
+            return Subscription.objects.select_related(
+                "service_id", "trial_period"
+            ).get(id=subscription_id)
+        except (Subscription.DoesNotExist, ValueError, TypeError):
             raise ValidationError("Такой подписки не существует.")
 
-    def check_balance(self, subscription, account_balance):
-        if account_balance.balance - subscription.price >= 0:
-            account_balance.balance -= subscription.price
-            account_balance.save()
-            return True
-        return False
-
-    def get_active_subscription(self, user_id, service):
-        return UserSubscription.objects.filter(user_id=user_id,
-                                               subscription__service_id=service,
-                                               status=True).first()
-
-    def extend_subscription(self, active_subscription, subscription):
-        active_subscription.end += timedelta(days=subscription.period)
-        active_subscription.status = True
-        active_subscription.save()
-
-    def deactivate_subscription(self, active_subscription):
-        active_subscription.end = datetime.now()
-        active_subscription.status = False
-        active_subscription.renewal = False
-        active_subscription.save()
-
-    def create_new_subscription(self, user, subscription, account_balance):
-        new_subscription = UserSubscription(
-            user_id=user,
-            subscription=subscription,
-            status=True,
-            renewal=True,
-            activation=True,
-            start=datetime.now(),
-            end=datetime.now() + timedelta(days=subscription.period),
-            trial=False
-        )
-        new_subscription.save()
-        return new_subscription
-
     def send_response(self, subscription):
         serializer_data = UserSubscriptionSerializer(subscription).data
         return Response(serializer_data, status=status.HTTP_200_OK)
+
+
+class AddUserSubscriptionsBatchView(APIView):
+    @idempotent
+    def post(self, request, user_id):
+        """
+        Метод оформления нескольких подписок одним списанием.
+        Для каждого плана действует та же логика, что и при покупке
+        одной подписки: продление, замена тарифа или новая подписка.
+
+        Тело запроса:
+            {
+                "account_id": <int>,
+                "subscription_ids": [<int>, ...]
+            }
+
+        Возвращает:
+            Результат по каждому плану в порядке запроса.
+        """
+        subscription_ids = request.data.get("subscription_ids")
+        if (
+            not isinstance(subscription_ids, list)
+            or not subscription_ids
+            or not all(
+                isinstance(subscription_id, int)
+                and not isinstance(subscription_id, bool)
+                for subscription_id in subscription_ids
+            )
+        ):
+            raise ValidationError(
+                "subscription_ids - непустой список идентификаторов планов."
+            )
+        account_id = get_account_id_or_error(request.data)
+        try:
+            results = purchase_subscriptions(
+                user_id, subscription_ids, account_id
+            )
+        except (User.DoesNotExist, Account.DoesNotExist):
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        except InsufficientFunds:
+            return Response({"error": "Недостаточно средств на счете."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        results_data = [
+            {
+                "subscription_id": subscription_id,
+                "result": result,
+                "user_subscription": (
+                    UserSubscriptionSerializer(user_subscription).data
+                    if user_subscription is not None else None
+                ),
+            }
+            for subscription_id, result, user_subscription in results
+        ]
+        if any(item["user_subscription"] for item in results_data):
+            return Response(results_data, status=status.HTTP_200_OK)
+        return Response(results_data, status=status.HTTP_400_BAD_REQUEST)
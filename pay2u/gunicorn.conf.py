@@ -0,0 +1,10 @@
+"""
+Настройки gunicorn. Количество воркеров и потоков задается теми же
+переменными окружения, по которым settings проверяет число соединений
+с БД (WEB_CONCURRENCY, WEB_THREADS).
+"""
+
+import os
+
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+threads = int(os.getenv("WEB_THREADS", "1"))
@@ -3,6 +3,10 @@ ASGI config for pay2u project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Under ASGI the read-only API views use their async implementations
+(ASYNC_VIEWS=True), e.g.:
+    gunicorn -k uvicorn.workers.UvicornWorker pay2u.asgi:application
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 """
@@ -12,5 +16,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'pay2u.settings')
+os.environ.setdefault('ASYNC_VIEWS', 'True')
 
 application = get_asgi_application()
@@ -1,32 +1,91 @@
-from django.contrib.auth import get_user_model, login
-from django.contrib.auth.backends import ModelBackend
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from rest_framework import status
+
+from api.renderers import json_response
+from users.authentication import (
+    INVALID_TOKEN,
+    TOKEN_PREFIX,
+    adefault_user,
+    atoken_user,
+    default_user,
+    token_user
+)
+
+
+def token_rejected():
+    """
+    Ответ на неверный или просроченный токен, такой же, как
+    у SignedTokenAuthentication в представлениях DRF.
+    """
+    response = json_response(
+        {"detail": INVALID_TOKEN}, status=status.HTTP_401_UNAUTHORIZED
+    )
+    response["WWW-Authenticate"] = TOKEN_PREFIX
+    return response
 
 
 class AutoLoginMiddleware:
+    """
+    Режим разработки: запрос без токена и без сессии выполняется
+    от имени пользователя по умолчанию. Вход через login() не
+    выполняется, сессия не создается и не записывается в БД.
+    Запрос с неверным или просроченным токеном отклоняется (401).
+    Работает и в синхронном, и в асинхронном режиме.
+    """
+
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
 
     def __call__(self, request):
-        if not request.user.is_authenticated:
-            default_phone = "7999999999"
-            default_email = "default@example.com"
-            password = "a"
-            User = get_user_model()
-            try:
-                user = User.objects.get(phone=default_phone)
-            except User.DoesNotExist:
-                # Создает пользователя если такого нет
-                user = User.objects.create_superuser(
-                    phone=default_phone,
-                    email=default_email,
-                    password=password,
-                )
-                user.save()
-
-            # Авторизует деф пользователя
-            backend = ModelBackend()
-            user.backend = f"{backend.__module__}.{backend.__class__.__name__}"
-            login(request, user)
+        if self.is_async:
+            return self.__acall__(request)
+        user = token_user(request)
+        if user is False:
+            return token_rejected()
+        if user:
+            request.user = user
+        elif not request.user.is_authenticated:
+            request.user = default_user()
 
         response = self.get_response(request)
         return response
+
+    async def __acall__(self, request):
+        user = await atoken_user(request)
+        if user is False:
+            return token_rejected()
+        if not user:
+            user = await request.auser()
+            if not user.is_authenticated:
+                user = await adefault_user()
+
+        async def auser():
+            return user
+
+        request.user = user
+        request.auser = auser
+        return await self.get_response(request)
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Сжимает ответ gzip, если клиент указал gzip в Accept-Encoding
+    и тело не короче GZIP_MIN_LENGTH байт. Потоковые ответы
+    сжимаются всегда.
+    """
+
+    def process_response(self, request, response):
+        if (
+            not response.streaming
+            and len(response.content) < settings.GZIP_MIN_LENGTH
+        ):
+            return response
+        return super().process_response(request, response)
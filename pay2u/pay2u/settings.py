@@ -43,13 +43,14 @@ INSTALLED_APPS = [
     "services",
     "payments",
     "banking",
+    "api",
     "rest_framework",
-    "debug_toolbar",
     'drf_yasg',
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "pay2u.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -57,9 +58,14 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "pay2u.middleware.AutoLoginMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
 ]
 
+# Панель отладки работает только синхронно: под ASGI она заставила бы
+# Django выполнять каждый запрос в одном общем потоке
+if DEBUG:
+    INSTALLED_APPS.append("debug_toolbar")
+    MIDDLEWARE.append("debug_toolbar.middleware.DebugToolbarMiddleware")
+
 ROOT_URLCONF = "pay2u.urls"
 
 TEMPLATES = [
@@ -84,11 +90,34 @@ WSGI_APPLICATION = "pay2u.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# Асинхронные представления чтения (async ORM). pay2u.asgi включает
+# их по умолчанию, под WSGI они выключены
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", "False") == "True"
+
+# Воркеры и потоки gunicorn (см. gunicorn.conf.py). У каждого потока
+# свое соединение с БД: WEB_THREADS соединений на воркер, всего не
+# больше DB_MAX_CONNECTIONS (max_connections сервера БД за вычетом
+# резерва для миграций и администрирования)
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+WEB_THREADS = int(os.getenv("WEB_THREADS", "1"))
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "90"))
+
+# Постоянные соединения: соединение потока переиспользуется до
+# DB_CONN_MAX_AGE секунд и проверяется перед первым запросом очередного
+# HTTP-запроса. Под ASGI каждый запрос выполняется в новом потоке,
+# поэтому по умолчанию соединение закрывается после запроса
+DB_CONN_MAX_AGE = int(
+    os.getenv("DB_CONN_MAX_AGE", "0" if ASYNC_VIEWS else "60")
+)
+DB_CONN_HEALTH_CHECKS = os.getenv("DB_CONN_HEALTH_CHECKS", "True") == "True"
+
 if LOCAL_DB:
     DATABASES = {
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
             "NAME": BASE_DIR / "db.sqlite3",
+            "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+            "CONN_HEALTH_CHECKS": DB_CONN_HEALTH_CHECKS,
         }
     }
     print("Sqlite3 database configured")
@@ -101,11 +130,49 @@ else:
             'PASSWORD': os.getenv('POSTGRES_PASSWORD', 'default_db_password'),
             'HOST': os.getenv('POSTGRES_HOST', 'localhost'),
             'PORT': os.getenv('POSTGRES_PORT', '5432'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': DB_CONN_HEALTH_CHECKS,
         }
     }
     print("Postgresql database configured")
 
 
+# Кэш ответов API. Ответы хранятся в памяти процесса, а в их ключи
+# входят версии семейств и счётчики поколений пользователей из общего
+# кэша counters (по умолчанию таблица БД, manage.py createcachetable;
+# можно задать Redis через COUNTER_CACHE_BACKEND). Процесс читает
+# счётчики не чаще раза в CHANGE_COUNTER_TTL секунд, поэтому попадание
+# в кэш не обращается к БД, а сброс в одном воркере виден остальным
+# не позже чем через CHANGE_COUNTER_TTL секунд. Счётчики хранятся без
+# срока жизни, чтобы их не вытесняли ответы
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", "pay2u"),
+        "TIMEOUT": int(os.getenv("CACHE_TIMEOUT", "300")),
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.getenv("CACHE_MAX_ENTRIES", "10000")),
+        },
+    },
+    "counters": {
+        "BACKEND": os.getenv(
+            "COUNTER_CACHE_BACKEND",
+            "django.core.cache.backends.db.DatabaseCache",
+        ),
+        "LOCATION": os.getenv("COUNTER_CACHE_LOCATION", "api_counters"),
+        "TIMEOUT": None,
+        "OPTIONS": {
+            "MAX_ENTRIES": int(
+                os.getenv("COUNTER_CACHE_MAX_ENTRIES", "1000000")
+            ),
+        },
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -157,6 +224,36 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 AUTH_USER_MODEL = 'users.User'
 
+# Сколько секунд процесс доверяет закэшированным счётчикам изменений
+CHANGE_COUNTER_TTL = float(os.getenv("CHANGE_COUNTER_TTL", "2"))
+
+# Заголовок Idempotency-Key: время хранения ответа, время, после которого
+# незавершенный запрос считается брошенным, и ожидание дубликатов (секунды)
+IDEMPOTENCY_KEY_TTL = int(os.getenv("IDEMPOTENCY_KEY_TTL", "86400"))
+IDEMPOTENCY_LOCK_TIMEOUT = int(os.getenv("IDEMPOTENCY_LOCK_TIMEOUT", "60"))
+IDEMPOTENCY_WAIT_TIMEOUT = float(os.getenv("IDEMPOTENCY_WAIT_TIMEOUT", "10"))
+IDEMPOTENCY_POLL_INTERVAL = 0.1
+
+REST_FRAMEWORK = {
+    "DEFAULT_AUTHENTICATION_CLASSES": [
+        "users.authentication.SignedTokenAuthentication",
+        "rest_framework.authentication.SessionAuthentication",
+        "rest_framework.authentication.BasicAuthentication",
+    ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "api.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+}
+
+# Ответы короче этого размера (байт) не сжимаются
+GZIP_MIN_LENGTH = int(os.getenv("GZIP_MIN_LENGTH", "1024"))
+
+# Срок действия подписанного токена и время, на которое процесс
+# кэширует пользователя (секунды)
+AUTH_TOKEN_MAX_AGE = int(os.getenv("AUTH_TOKEN_MAX_AGE", "86400"))
+AUTH_PRINCIPAL_TTL = float(os.getenv("AUTH_PRINCIPAL_TTL", "60"))
+
 INTERNAL_IPS = [
     # ...
     "127.0.0.1",
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Document, Payment, CashbackApplied
+from .models import Document, Payment, CashbackApplied, SpendRollup
 
 
 @admin.register(Document)
@@ -16,3 +16,11 @@ class PaymentAdmin(admin.ModelAdmin):
 @admin.register(CashbackApplied)
 class CashbackAppliedAdmin(admin.ModelAdmin):
     list_display = ("id", "amount", "applied_status")
+
+
+@admin.register(SpendRollup)
+class SpendRollupAdmin(admin.ModelAdmin):
+    list_display = (
+        "id", "user", "month", "category", "service", "amount", "cashback"
+    )
+    list_filter = ("month",)
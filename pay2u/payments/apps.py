@@ -5,3 +5,6 @@ class PaymentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'payments'
     verbose_name = 'Платежи'
+
+    def ready(self):
+        from . import signals  # noqa: F401
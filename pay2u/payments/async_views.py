@@ -0,0 +1,187 @@
+from django.http import StreamingHttpResponse
+from django.views import View
+from rest_framework import status
+
+from api.cache import (
+    ACCOUNT_SCOPE,
+    PAYMENTS_CACHE,
+    PAYMENT_SCOPE,
+    USER_SCOPE,
+    cached_get
+)
+from api.conditional import versioned_get
+from api.counters import DOCUMENT_COUNTER
+from api.renderers import json_response
+from .export import CONTENT_TYPES, EXPORT_FORMATS, aexport_lines
+from .models import Document, Payment
+from .pagination import apayments_response
+from .payloads import (
+    alatest_document,
+    apayment,
+    aspend,
+    auser_payments,
+    period_bounds
+)
+
+
+@cached_get(PAYMENTS_CACHE, ACCOUNT_SCOPE)
+class AccountPaymentView(View):
+    async def get(self, request, account_id: int):
+        """
+        Метод получения данных о платежах для указанного аккаунта.
+
+        Параметры:
+            account_id: идентификатор аккаунта
+
+        Возвращает:
+            Данные о платежах по указанному аккаунту.
+        """
+        payments = Payment.objects.filter(account_id=account_id)
+        return await apayments_response(request, payments)
+
+
+@versioned_get(DOCUMENT_COUNTER)
+class DocumentView(View):
+    async def get(self, request):
+        """
+        Метод получения данных правил сервиса.
+
+        Возвращает:
+            Данные о платежах с указанным статусом ответа.
+        """
+        try:
+            document_data = await alatest_document()
+        except Document.DoesNotExist:
+            return json_response(status=status.HTTP_404_NOT_FOUND)
+        return json_response(document_data)
+
+
+@cached_get(PAYMENTS_CACHE, USER_SCOPE)
+class PaymentsView(View):
+    async def get(self, request, user_id: int):
+        """
+        Метод получения данных о платежах для указанного пользователя.
+
+        Параметры:
+            user_id: идентификатор пользователя
+
+        Возвращает:
+            Данные о платежах по указанному идентификатору пользователя.
+        """
+        payments = await auser_payments(user_id)
+        if payments is None:
+            return json_response(status=status.HTTP_404_NOT_FOUND)
+        return await apayments_response(request, payments)
+
+
+class PaymentsExportView(View):
+    async def get(self, request, user_id: int, export_format: str):
+        """
+        Метод выгрузки всей истории платежей пользователя файлом.
+        Файл формируется потоком, память не зависит от объема истории.
+
+        Параметры:
+            user_id: идентификатор пользователя
+            export_format: csv или jsonl
+
+        Возвращает:
+            Файл с платежами и данными сервиса, счёта и кэшбэка.
+        """
+        if export_format not in EXPORT_FORMATS:
+            return json_response(status=status.HTTP_404_NOT_FOUND)
+        payments = Payment.objects.filter(account_id__user_id=user_id)
+        response = StreamingHttpResponse(
+            aexport_lines(export_format, payments),
+            content_type=CONTENT_TYPES[export_format],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="payments-{user_id}.{export_format}"'
+        )
+        return response
+
+
+@cached_get(PAYMENTS_CACHE, USER_SCOPE)
+class PaymentsPeriodView(View):
+    async def get(self, request, user_id: int, time_period: str):
+        """
+        Метод получения данных о платежах для указанного пользователя
+        по указанному периоду времени.
+
+        Параметры:
+            user_id: идентификатор пользователя
+            time_period: 2022-01-01_2022-01-31
+            (дата начала_дата конца)
+
+        Возвращает:
+            Данные о платежах с указанным статусом ответа.
+        """
+        try:
+            bounds = period_bounds(time_period)
+        except ValueError:
+            return json_response(status=status.HTTP_400_BAD_REQUEST)
+        payments = await auser_payments(user_id)
+        if payments is None:
+            return json_response(status=status.HTTP_404_NOT_FOUND)
+        return await apayments_response(
+            request, payments.filter(date__range=bounds)
+        )
+
+
+@cached_get(PAYMENTS_CACHE, PAYMENT_SCOPE)
+class PaymentView(View):
+    async def get(self, request, payment_id: int):
+        """
+        Метод получения данных о конкретном платеже.
+
+        Параметры:
+            payment_id: идентификатор платежа
+
+        Возвращает:
+            Данные о платеже с указанным статусом ответа.
+        """
+        return json_response(await apayment(payment_id))
+
+
+@cached_get(PAYMENTS_CACHE, USER_SCOPE)
+class ServicePaymentsView(View):
+    async def get(self, request, user_id: int, service_id: int):
+        """
+        Метод получения данных о платежах для указанного пользователя
+        по указанному идентификатору сервиса.
+
+        Параметры:
+            user_id: идентификатор пользователя
+            service_id: идентификатор сервиса
+
+        Возвращает:
+            Данные о платежах с указанным статусом ответа.
+        """
+        payments = await auser_payments(user_id)
+        if payments is None:
+            return json_response(status=status.HTTP_404_NOT_FOUND)
+        return await apayments_response(
+            request,
+            payments.filter(user_subscription__service_id=service_id),
+        )
+
+
+@cached_get(PAYMENTS_CACHE, USER_SCOPE)
+class SpendSummaryView(View):
+    async def get(self, request, user_id: int, time_period: str):
+        """
+        Метод получения расходов пользователя по категориям и сервисам
+        за указанный период времени.
+
+        Параметры:
+            user_id: идентификатор пользователя
+            time_period: 2022-01-01_2022-01-31
+            (дата начала_дата конца, обе включительно)
+
+        Возвращает:
+            Суммы платежей и кэшбэка по категориям и сервисам.
+        """
+        try:
+            summary_data = await aspend(user_id, time_period)
+        except ValueError:
+            return json_response(status=status.HTTP_400_BAD_REQUEST)
+        return json_response(summary_data)
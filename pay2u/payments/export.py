@@ -0,0 +1,98 @@
+import csv
+
+from django.utils import timezone
+
+from api.flat import aiterate
+from api.renderers import dumps
+from .models import Payment
+
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_COLUMNS = (
+    ("id", "id"),
+    ("receipt", "receipt"),
+    ("date", "date"),
+    ("amount", "amount"),
+    ("service_id", "user_subscription__service_id"),
+    ("service_name", "user_subscription__service_id__name"),
+    ("category_name", "user_subscription__service_id__category__name"),
+    ("account_id", "account_id"),
+    ("account_number", "account_id__account_number"),
+    ("cashback_id", "cashback_applied"),
+    ("cashback_amount", "cashback_applied__amount"),
+    ("cashback_applied", "cashback_applied__applied_status"),
+)
+EXPORT_FORMATS = ("csv", "jsonl")
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/x-ndjson; charset=utf-8",
+}
+
+EXPORT_PATHS = tuple(path for _, path in EXPORT_COLUMNS)
+
+DATE_COLUMN = 2
+
+
+def ordered_payments(payments=None):
+    if payments is None:
+        payments = Payment.objects.all()
+    return payments.order_by("date", "id")
+
+
+def export_row(row) -> list:
+    row = list(row)
+    row[DATE_COLUMN] = timezone.localtime(row[DATE_COLUMN]).isoformat()
+    return row
+
+
+def export_rows(payments=None):
+    """
+    Строки платежей со связанными данными сервиса, счёта и кэшбэка
+    в порядке даты и идентификатора. Строки читаются пачками
+    серверным курсором (в PostgreSQL), память не зависит от объема.
+    """
+    rows = ordered_payments(payments).values_list(*EXPORT_PATHS)
+    for row in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield export_row(row)
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def line_writer(export_format: str):
+    """
+    Заголовок файла (или None) и функция, которая переводит
+    строку платежа в строку файла формата csv или jsonl.
+    """
+    names = [name for name, _ in EXPORT_COLUMNS]
+    if export_format == "csv":
+        writer = csv.writer(Echo())
+        return writer.writerow(names), writer.writerow
+    return None, lambda row: dumps(dict(zip(names, row))).decode() + "\n"
+
+
+def export_lines(export_format: str, payments=None):
+    """
+    Выгрузка платежей построчно в формате csv или jsonl.
+    """
+    header, write = line_writer(export_format)
+    if header is not None:
+        yield header
+    for row in export_rows(payments):
+        yield write(row)
+
+
+async def aexport_lines(export_format: str, payments=None):
+    """
+    То же, что export_lines, для асинхронных представлений.
+    """
+    header, write = line_writer(export_format)
+    if header is not None:
+        yield header
+    rows = aiterate(
+        ordered_payments(payments), EXPORT_PATHS, EXPORT_CHUNK_SIZE
+    )
+    async for row in rows:
+        yield write(export_row(row))
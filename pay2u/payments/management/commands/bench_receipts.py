@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.benchmarks import bench_database, run_concurrently
+from api.seeding import seed_user
+from payments.models import CashbackApplied, Payment
+from payments.rollups import add_payments
+
+
+class Command(BaseCommand):
+    help = (
+        "Параллельная пакетная вставка платежей: скорость вставки "
+        "и уникальность номеров чеков. Запускается в отдельной "
+        "тестовой БД."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--payments", type=int, default=100_000)
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        threads = options["threads"]
+        batch_size = options["batch_size"]
+        per_thread = options["payments"] // threads
+        batches = -(-per_thread // batch_size)
+        with bench_database():
+            seed = seed_user(1, accounts=1)
+            template = seed["payments"][0]
+            cashback = CashbackApplied.objects.create(amount=0)
+
+            def insert_batch(step):
+                size = min(batch_size, per_thread - (step - 1) * batch_size)
+                payments = Payment.objects.bulk_create(
+                    Payment(
+                        amount=1,
+                        document=template.document,
+                        cashback_applied=cashback,
+                        user_subscription=template.user_subscription,
+                        account_id=template.account_id,
+                    )
+                    for _ in range(size)
+                )
+                add_payments([payment.id for payment in payments])
+
+            results, elapsed = run_concurrently(
+                threads, batches, insert_batch
+            )
+            created = Payment.objects.exclude(id=template.id)
+            inserted = created.count()
+            unique_receipts = created.values("receipt").distinct().count()
+
+        self.stdout.write(
+            f"потоков: {threads}, вставлено: {inserted} "
+            f"за {elapsed:.2f} с\n"
+            f"платежей в секунду: {inserted / elapsed:.0f}\n"
+            f"уникальных чеков: {unique_receipts}, "
+            f"ошибок: {results['errors']}"
+        )
+        if unique_receipts != inserted:
+            raise CommandError("Номера чеков повторяются.")
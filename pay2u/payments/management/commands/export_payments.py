@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from payments.export import EXPORT_FORMATS, export_lines
+from payments.models import Payment
+
+
+class Command(BaseCommand):
+    help = "Выгружает историю платежей в формате CSV или JSONL."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format", choices=EXPORT_FORMATS, default="csv"
+        )
+        parser.add_argument(
+            "--user",
+            type=int,
+            default=None,
+            help="Идентификатор пользователя; по умолчанию все платежи.",
+        )
+        parser.add_argument(
+            "--output",
+            default=None,
+            help="Файл для выгрузки; по умолчанию стандартный вывод.",
+        )
+
+    def handle(self, *args, **options):
+        payments = Payment.objects.all()
+        if options["user"] is not None:
+            payments = payments.filter(account_id__user_id=options["user"])
+        lines = export_lines(options["format"], payments)
+        if options["output"] is None:
+            for line in lines:
+                self.stdout.write(line, ending="")
+            return
+        with open(options["output"], "w", encoding="utf-8",
+                  newline="") as output:
+            output.writelines(lines)
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from payments.rollups import rebuild_spend_rollups
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает помесячные суммы расходов по всем платежам."
+
+    def handle(self, *args, **options):
+        count = rebuild_spend_rollups()
+        self.stdout.write(self.style.SUCCESS(f"Строк сводки: {count}."))
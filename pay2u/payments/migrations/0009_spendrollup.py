@@ -0,0 +1,76 @@
+# Generated by Django 5.0.3 on 2026-10-17 17:48
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+
+def fill_spend_rollups(apps, schema_editor):
+    Payment = apps.get_model("payments", "Payment")
+    SpendRollup = apps.get_model("payments", "SpendRollup")
+    totals = (
+        Payment.objects.annotate(month=TruncMonth("date"))
+        .values(
+            "month",
+            "account_id__user_id",
+            "user_subscription__service_id__category_id",
+            "user_subscription__service_id",
+        )
+        .annotate(
+            total_amount=Sum("amount"),
+            total_cashback=Sum("cashback_applied__amount"),
+            total_payments=Count("id"),
+        )
+        .order_by()
+    )
+    SpendRollup.objects.bulk_create(
+        SpendRollup(
+            user_id=row["account_id__user_id"],
+            month=timezone.localdate(row["month"]),
+            category_id=row["user_subscription__service_id__category_id"],
+            service_id=row["user_subscription__service_id"],
+            amount=row["total_amount"],
+            cashback=row["total_cashback"],
+            payments=row["total_payments"],
+        )
+        for row in totals
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0008_alter_payment_account_id_and_more'),
+        ('services', '0002_alter_category_options_alter_service_options_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SpendRollup',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('month', models.DateField(verbose_name='Месяц')),
+                ('amount', models.BigIntegerField(default=0, verbose_name='Сумма')),
+                ('cashback', models.BigIntegerField(default=0, verbose_name='Кэшбэк')),
+                ('payments', models.IntegerField(default=0, verbose_name='Платежей')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='services.category', verbose_name='Категория')),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='services.service', verbose_name='Сервис')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='spend_rollups', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Расходы за месяц',
+                'verbose_name_plural': 'Расходы по месяцам',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='spendrollup',
+            constraint=models.UniqueConstraint(fields=('user', 'month', 'category', 'service'), name='unique_spend_rollup'),
+        ),
+        migrations.RunPython(
+            fill_spend_rollups, migrations.RunPython.noop
+        ),
+    ]
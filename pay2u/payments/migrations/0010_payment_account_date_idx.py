@@ -0,0 +1,19 @@
+# Generated by Django 5.0.3 on 2026-10-17 17:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0009_spendrollup'),
+        ('subscriptions', '0014_usersubscription_active_indexes'),
+        ('users', '0014_ledger'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['account_id', 'date', 'id'], name='payment_account_date_idx'),
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
 
+from api.sequences import receipt_numbers
+
 
 class CashbackApplied(models.Model):
     id = models.BigAutoField(primary_key=True)
@@ -15,14 +17,7 @@ class CashbackApplied(models.Model):
 
 
 def increment_receipt_number():
-    last_invoice = Payment.objects.all().order_by('id').last()
-    if not last_invoice:
-        return 'R000001'
-    receipt_no = last_invoice.receipt
-    receipt_int = int(receipt_no.split('R')[-1])
-    new_receipt_int = receipt_int + 1
-    new_receipt_no = 'R' + str(new_receipt_int).zfill(4)
-    return new_receipt_no
+    return 'R' + str(receipt_numbers.next()).zfill(4)
 
 
 class Document(models.Model):
@@ -79,6 +74,49 @@ class Payment(models.Model):
     class Meta:
         verbose_name = "Платеж"
         verbose_name_plural = "Платежи"
+        indexes = [
+            models.Index(
+                fields=["account_id", "date", "id"],
+                name="payment_account_date_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.receipt
+
+
+class SpendRollup(models.Model):
+    id = models.BigAutoField(primary_key=True)
+    user = models.ForeignKey(
+        "users.User",
+        on_delete=models.CASCADE,
+        related_name="spend_rollups",
+        verbose_name="Пользователь",
+    )
+    month = models.DateField(verbose_name="Месяц")
+    category = models.ForeignKey(
+        "services.Category",
+        on_delete=models.CASCADE,
+        verbose_name="Категория",
+    )
+    service = models.ForeignKey(
+        "services.Service",
+        on_delete=models.CASCADE,
+        verbose_name="Сервис",
+    )
+    amount = models.BigIntegerField(default=0, verbose_name="Сумма")
+    cashback = models.BigIntegerField(default=0, verbose_name="Кэшбэк")
+    payments = models.IntegerField(default=0, verbose_name="Платежей")
+
+    class Meta:
+        verbose_name = "Расходы за месяц"
+        verbose_name_plural = "Расходы по месяцам"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "month", "category", "service"],
+                name="unique_spend_rollup",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.month:%Y-%m}: {self.amount}"
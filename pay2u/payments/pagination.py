@@ -0,0 +1,176 @@
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from api.renderers import dumps, json_response
+from .serializers import FLAT_PAYMENTS
+
+CURSOR_PARAM = "cursor"
+LIMIT_PARAM = "limit"
+STREAM_PARAM = "stream"
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+STREAM_CHUNK_SIZE = 500
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(date, payment_id: int) -> str:
+    position = json.dumps([date.isoformat(), payment_id])
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+
+def decode_cursor(cursor: str):
+    try:
+        date, payment_id = json.loads(base64.urlsafe_b64decode(cursor))
+        return datetime.fromisoformat(date), int(payment_id)
+    except (TypeError, ValueError):
+        raise InvalidCursor
+
+
+def after_cursor(payments, cursor: str):
+    """
+    Платежи после позиции курсора в порядке (date, id).
+    """
+    date, payment_id = decode_cursor(cursor)
+    return payments.filter(
+        Q(date__gt=date) | Q(date=date, id__gt=payment_id)
+    )
+
+
+def stream_payments(payments):
+    yield b"["
+    separator = b""
+    rows = FLAT_PAYMENTS.rows(payments)
+    for row in rows.iterator(chunk_size=STREAM_CHUNK_SIZE):
+        yield separator + dumps(FLAT_PAYMENTS.to_representation(row))
+        separator = b","
+    yield b"]"
+
+
+async def astream_payments(payments):
+    yield b"["
+    separator = b""
+    async for row in FLAT_PAYMENTS.arows(payments, STREAM_CHUNK_SIZE):
+        yield separator + dumps(FLAT_PAYMENTS.to_representation(row))
+        separator = b","
+    yield b"]"
+
+
+def next_page_url(request, page, limit: int):
+    """
+    Ссылка на следующую страницу или None, если page - последняя.
+    page содержит на одну строку больше limit, если есть продолжение.
+    """
+    if len(page) <= limit:
+        return None
+    last = page[limit - 1]
+    return replace_query_param(
+        request.build_absolute_uri(),
+        CURSOR_PARAM,
+        encode_cursor(
+            last[FLAT_PAYMENTS.index("date")],
+            last[FLAT_PAYMENTS.index("id")],
+        ),
+    )
+
+
+def page_params(payments, params):
+    """
+    Размер страницы и платежи после курсора из параметров запроса.
+    """
+    limit = min(int(params.get(LIMIT_PARAM, DEFAULT_LIMIT)), MAX_LIMIT)
+    if limit < 1:
+        raise ValueError
+    if params.get(CURSOR_PARAM):
+        payments = after_cursor(payments, params[CURSOR_PARAM])
+    return limit, payments
+
+
+def page_data(request, page, limit: int) -> dict:
+    return {
+        "next": next_page_url(request, page, limit),
+        "results": [
+            FLAT_PAYMENTS.to_representation(row) for row in page[:limit]
+        ],
+    }
+
+
+def payments_page(request, payments):
+    """
+    Метод формирования списка платежей или его страницы по параметрам
+    запроса (cursor, limit).
+
+    Возвращает:
+        Весь список или {"next": ссылка на следующую страницу,
+        "results": [...]}. Некорректные параметры - ValueError
+        или InvalidCursor.
+    """
+    params = request.GET
+    if CURSOR_PARAM not in params and LIMIT_PARAM not in params:
+        return FLAT_PAYMENTS.serialize(payments)
+    limit, payments = page_params(payments, params)
+    page = list(FLAT_PAYMENTS.rows(payments)[:limit + 1])
+    return page_data(request, page, limit)
+
+
+async def apayments_page(request, payments):
+    """
+    То же, что payments_page, с чтением платежей через async ORM.
+    """
+    params = request.GET
+    if CURSOR_PARAM not in params and LIMIT_PARAM not in params:
+        return await FLAT_PAYMENTS.aserialize(payments)
+    limit, payments = page_params(payments, params)
+    page = [row async for row in FLAT_PAYMENTS.rows(payments)[:limit + 1]]
+    return page_data(request, page, limit)
+
+
+def payments_response(request, payments) -> Response:
+    """
+    Метод формирования ответа со списком платежей.
+
+    Параметры запроса:
+        stream=1: список отдается потоком, платежи читаются
+            из БД пачками, память не зависит от длины истории
+        cursor, limit: постраничная выдача по ключу (date, id);
+            ответ {"next": ссылка на следующую страницу, "results": [...]}
+        без параметров: весь список одним ответом
+
+    Возвращает:
+        Данные о платежах в порядке даты и идентификатора.
+    """
+    payments = payments.order_by("date", "id")
+    if request.GET.get(STREAM_PARAM) in ("1", "true"):
+        return StreamingHttpResponse(
+            stream_payments(payments), content_type="application/json"
+        )
+    try:
+        payments_data = payments_page(request, payments)
+    except (ValueError, InvalidCursor):
+        return Response(status=status.HTTP_400_BAD_REQUEST)
+    return Response(payments_data, status=status.HTTP_200_OK)
+
+
+async def apayments_response(request, payments):
+    """
+    То же, что payments_response, для асинхронных представлений.
+    """
+    payments = payments.order_by("date", "id")
+    if request.GET.get(STREAM_PARAM) in ("1", "true"):
+        return StreamingHttpResponse(
+            astream_payments(payments), content_type="application/json"
+        )
+    try:
+        payments_data = await apayments_page(request, payments)
+    except (ValueError, InvalidCursor):
+        return json_response(status=status.HTTP_400_BAD_REQUEST)
+    return json_response(payments_data)
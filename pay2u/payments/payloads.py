@@ -0,0 +1,119 @@
+from datetime import datetime
+
+from django.utils import timezone
+
+from users.models import Account
+from .models import Document, Payment
+from .rollups import aspend_summary, spend_summary
+from .serializers import (
+    DocumentSerializer,
+    PaymentsSerializer,
+    SpendSummarySerializer
+)
+
+# Данные ответов о платежах для views и async_views. Асинхронные
+# варианты строят те же запросы и выполняют их через async ORM.
+
+PAYMENT_RELATED = (
+    "user_subscription__service_id",
+    "account_id",
+    "cashback_applied",
+)
+
+
+def period_dates(time_period: str):
+    """
+    Даты начала и конца из периода вида 2022-01-01_2022-01-31.
+    Некорректный период - ValueError.
+    """
+    start_date_str, end_date_str = time_period.split("_")
+    return (
+        datetime.strptime(start_date_str, "%Y-%m-%d").date(),
+        datetime.strptime(end_date_str, "%Y-%m-%d").date(),
+    )
+
+
+def period_bounds(time_period: str):
+    """
+    Начало дат периода в текущем часовом поясе для фильтра date__range.
+    """
+    return tuple(
+        timezone.make_aware(datetime.combine(day, datetime.min.time()))
+        for day in period_dates(time_period)
+    )
+
+
+def user_accounts(user_id: int):
+    return Account.objects.filter(user__id=user_id)
+
+
+def user_payments(user_id: int):
+    """
+    Платежи по счетам пользователя или None, если счетов нет.
+    """
+    accounts = user_accounts(user_id)
+    if not accounts.exists():
+        return None
+    return Payment.objects.filter(account_id__in=accounts)
+
+
+async def auser_payments(user_id: int):
+    accounts = user_accounts(user_id)
+    if not await accounts.aexists():
+        return None
+    return Payment.objects.filter(account_id__in=accounts)
+
+
+def latest_document() -> dict:
+    """
+    Последняя редакция правил сервиса.
+    Если правил нет - Document.DoesNotExist.
+    """
+    return DocumentSerializer(Document.objects.latest("id")).data
+
+
+async def alatest_document() -> dict:
+    return DocumentSerializer(await Document.objects.alatest("id")).data
+
+
+def payment_query(payment_id: int):
+    return Payment.objects.filter(id=payment_id).select_related(
+        *PAYMENT_RELATED
+    )
+
+
+def payment(payment_id: int) -> dict:
+    return PaymentsSerializer(payment_query(payment_id).first()).data
+
+
+async def apayment(payment_id: int) -> dict:
+    return PaymentsSerializer(await payment_query(payment_id).afirst()).data
+
+
+def spend_period(time_period: str):
+    """
+    Даты начала и конца периода расходов.
+    Некорректный период или начало позже конца - ValueError.
+    """
+    start_date, end_date = period_dates(time_period)
+    if start_date > end_date:
+        raise ValueError(time_period)
+    return start_date, end_date
+
+
+def spend(user_id: int, time_period: str) -> dict:
+    """
+    Расходы пользователя за период по категориям и сервисам.
+    Некорректный период или начало позже конца - ValueError.
+    """
+    start_date, end_date = spend_period(time_period)
+    return SpendSummarySerializer(
+        spend_summary(user_id, start_date, end_date)
+    ).data
+
+
+async def aspend(user_id: int, time_period: str) -> dict:
+    start_date, end_date = spend_period(time_period)
+    return SpendSummarySerializer(
+        await aspend_summary(user_id, start_date, end_date)
+    ).data
@@ -0,0 +1,260 @@
+from datetime import date, datetime, time, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from api.cache import PAYMENTS_CACHE, invalidate_on_commit
+from .models import Payment, SpendRollup
+
+ROLLUP_CHUNK_SIZE = 2000
+
+PAYMENT_FIELDS = (
+    "account_id__user_id",
+    "user_subscription__service_id__category_id",
+    "user_subscription__service_id",
+    "amount",
+    "cashback_applied__amount",
+)
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def next_month(month: date) -> date:
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def local_midnight(day: date) -> datetime:
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _payment_deltas(payment_ids) -> dict:
+    deltas = {}
+    rows = Payment.objects.filter(id__in=payment_ids).values_list(
+        "date", *PAYMENT_FIELDS
+    )
+    for paid, user_id, category_id, service_id, amount, cashback in rows:
+        month = month_start(timezone.localdate(paid))
+        key = (user_id, month, category_id, service_id)
+        total = deltas.setdefault(key, [0, 0, 0])
+        total[0] += amount
+        total[1] += cashback
+        total[2] += 1
+    return deltas
+
+
+def add_payments(payment_ids):
+    """
+    Добавляет платежи к помесячным суммам расходов.
+    Вызывается в транзакции, создавшей платежи, в том числе после
+    bulk_create, который не отправляет post_save.
+    """
+    for key, (amount, cashback, payments) in _payment_deltas(
+        payment_ids
+    ).items():
+        _apply(key, amount, cashback, payments)
+
+
+def remove_payments(payment_ids):
+    """
+    Вычитает платежи из помесячных сумм расходов.
+    Вызывается до удаления платежей в той же транзакции.
+    """
+    for key, (amount, cashback, payments) in _payment_deltas(
+        payment_ids
+    ).items():
+        _apply(key, -amount, -cashback, -payments)
+
+
+def _apply(key, amount, cashback, payments):
+    user_id, month, category_id, service_id = key
+    rollup = SpendRollup.objects.filter(
+        user_id=user_id,
+        month=month,
+        category_id=category_id,
+        service_id=service_id,
+    )
+    increment = {
+        "amount": F("amount") + amount,
+        "cashback": F("cashback") + cashback,
+        "payments": F("payments") + payments,
+    }
+    if rollup.update(**increment):
+        return
+    try:
+        with transaction.atomic():
+            SpendRollup.objects.create(
+                user_id=user_id,
+                month=month,
+                category_id=category_id,
+                service_id=service_id,
+                amount=amount,
+                cashback=cashback,
+                payments=payments,
+            )
+    except IntegrityError:
+        rollup.update(**increment)
+
+
+def rebuild_spend_rollups() -> int:
+    """
+    Полностью пересчитывает помесячные суммы расходов по платежам.
+
+    Возвращает:
+        Количество строк сводной таблицы.
+    """
+    totals = (
+        Payment.objects.annotate(month=TruncMonth("date"))
+        .values("month", *PAYMENT_FIELDS[:3])
+        .annotate(
+            total_amount=Sum("amount"),
+            total_cashback=Sum("cashback_applied__amount"),
+            total_payments=Count("id"),
+        )
+        .order_by()
+    )
+    count = 0
+    with transaction.atomic():
+        SpendRollup.objects.all().delete()
+        batch = []
+        for row in totals.iterator(chunk_size=ROLLUP_CHUNK_SIZE):
+            batch.append(
+                SpendRollup(
+                    user_id=row["account_id__user_id"],
+                    month=timezone.localdate(row["month"]),
+                    category_id=row[
+                        "user_subscription__service_id__category_id"
+                    ],
+                    service_id=row["user_subscription__service_id"],
+                    amount=row["total_amount"],
+                    cashback=row["total_cashback"],
+                    payments=row["total_payments"],
+                )
+            )
+            if len(batch) == ROLLUP_CHUNK_SIZE:
+                SpendRollup.objects.bulk_create(batch)
+                count += len(batch)
+                batch = []
+        SpendRollup.objects.bulk_create(batch)
+        invalidate_on_commit(PAYMENTS_CACHE)
+    return count + len(batch)
+
+
+def spend_queries(user_id: int, start: date, end: date) -> list:
+    """
+    Запросы сумм за период с start по end включительно:
+    полные месяцы периода берутся из сводной таблицы,
+    неполные месяцы на краях периода - из платежей.
+    """
+    stop = end + timedelta(days=1)
+    first_full = month_start(start)
+    if first_full < start:
+        first_full = next_month(first_full)
+    last_full = month_start(stop)
+
+    totals = []
+    if first_full < last_full:
+        totals.append(
+            SpendRollup.objects.filter(
+                user_id=user_id, month__gte=first_full, month__lt=last_full
+            )
+            .values_list(
+                "category_id", "category__name", "service_id", "service__name"
+            )
+            .annotate(Sum("amount"), Sum("cashback"), Sum("payments"))
+            .order_by()
+        )
+        edges = ((start, first_full), (last_full, stop))
+    else:
+        edges = ((start, stop),)
+    for edge_start, edge_stop in edges:
+        if edge_start >= edge_stop:
+            continue
+        totals.append(
+            Payment.objects.filter(
+                account_id__user_id=user_id,
+                date__gte=local_midnight(edge_start),
+                date__lt=local_midnight(edge_stop),
+            )
+            .values_list(
+                "user_subscription__service_id__category_id",
+                "user_subscription__service_id__category__name",
+                "user_subscription__service_id",
+                "user_subscription__service_id__name",
+            )
+            .annotate(Sum("amount"), Sum("cashback_applied__amount"),
+                      Count("id"))
+            .order_by()
+        )
+    return totals
+
+
+def summarize(start: date, end: date, totals) -> dict:
+    categories = {}
+    for rows in totals:
+        for (category_id, category_name, service_id, service_name,
+             amount, cashback, payments) in rows:
+            category = categories.setdefault(
+                category_id,
+                {
+                    "category_id": category_id,
+                    "category_name": category_name,
+                    "amount": 0,
+                    "cashback": 0,
+                    "payments": 0,
+                    "services": {},
+                },
+            )
+            service = category["services"].setdefault(
+                service_id,
+                {
+                    "service_id": service_id,
+                    "service_name": service_name,
+                    "amount": 0,
+                    "cashback": 0,
+                    "payments": 0,
+                },
+            )
+            for total in (category, service):
+                total["amount"] += amount
+                total["cashback"] += cashback
+                total["payments"] += payments
+
+    summary = sorted(
+        categories.values(), key=lambda category: -category["amount"]
+    )
+    for category in summary:
+        category["services"] = sorted(
+            category["services"].values(),
+            key=lambda service: -service["amount"],
+        )
+    return {
+        "start": start,
+        "end": end,
+        "amount": sum(category["amount"] for category in summary),
+        "cashback": sum(category["cashback"] for category in summary),
+        "payments": sum(category["payments"] for category in summary),
+        "categories": summary,
+    }
+
+
+def spend_summary(user_id: int, start: date, end: date) -> dict:
+    """
+    Расходы пользователя за период с start по end включительно
+    по категориям и сервисам.
+    """
+    return summarize(start, end, spend_queries(user_id, start, end))
+
+
+async def aspend_summary(user_id: int, start: date, end: date) -> dict:
+    """
+    То же, что spend_summary, с чтением сумм через async ORM.
+    """
+    totals = [
+        [row async for row in rows]
+        for rows in spend_queries(user_id, start, end)
+    ]
+    return summarize(start, end, totals)
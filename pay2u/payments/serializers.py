@@ -1,6 +1,7 @@
 from rest_framework import serializers
 
-from services.serializers import ServiceSerializer
+from api.flat import Field, FlatSerializer, Nested, datetime_representation
+from services.serializers import SERVICE_FLAT_FIELDS, ServiceSerializer
 from users.serializers import AccountSerializer
 from .models import CashbackApplied, Document, Payment
 
@@ -36,3 +37,44 @@ class PaymentsSerializer(serializers.ModelSerializer):
             "account",
             "cashback",
         )
+
+
+# Быстрый вариант PaymentsSerializer для списков.
+FLAT_PAYMENTS = FlatSerializer(
+    Field("id"),
+    Field("date", to_representation=datetime_representation),
+    Field("amount"),
+    Nested("service", "user_subscription__service_id", SERVICE_FLAT_FIELDS),
+    Nested("account", "account_id", (Field("id"), Field("account_number"))),
+    Nested(
+        "cashback",
+        "cashback_applied",
+        (Field("id"), Field("amount"), Field("applied_status")),
+    ),
+)
+
+
+class ServiceSpendSerializer(serializers.Serializer):
+    service_id = serializers.IntegerField()
+    service_name = serializers.CharField()
+    amount = serializers.IntegerField()
+    cashback = serializers.IntegerField()
+    payments = serializers.IntegerField()
+
+
+class CategorySpendSerializer(serializers.Serializer):
+    category_id = serializers.IntegerField()
+    category_name = serializers.CharField()
+    amount = serializers.IntegerField()
+    cashback = serializers.IntegerField()
+    payments = serializers.IntegerField()
+    services = ServiceSpendSerializer(many=True)
+
+
+class SpendSummarySerializer(serializers.Serializer):
+    start = serializers.DateField()
+    end = serializers.DateField()
+    amount = serializers.IntegerField()
+    cashback = serializers.IntegerField()
+    payments = serializers.IntegerField()
+    categories = CategorySpendSerializer(many=True)
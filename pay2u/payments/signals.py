@@ -0,0 +1,17 @@
+from django.db.models.signals import post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import Payment
+from .rollups import add_payments, remove_payments
+
+
+@receiver(post_save, sender=Payment)
+def add_payment_to_rollups(sender, instance, created, raw, **kwargs):
+    if raw or not created:
+        return
+    add_payments([instance.id])
+
+
+@receiver(pre_delete, sender=Payment)
+def remove_payment_from_rollups(sender, instance, **kwargs):
+    remove_payments([instance.id])
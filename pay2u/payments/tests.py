@@ -0,0 +1,92 @@
+from datetime import date, timedelta
+from unittest import mock
+
+from django.db.models import Count, Sum
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+
+from api.seeding import seed_user
+from users.models import User
+from .models import Payment
+from .rollups import local_midnight, month_start, next_month, spend_summary
+from .views import PaymentsPeriodView, PaymentsView, ServicePaymentsView
+
+
+class UserWithoutAccountsTests(TestCase):
+    def test_payments_of_user_without_accounts_not_found(self):
+        """
+        Платежи пользователя без счетов - 404, а не ошибка сервера.
+        """
+        user = User.objects.create_user(
+            phone="no-accounts",
+            email="no-accounts@example.com",
+            password="no-accounts",
+        )
+        factory = APIRequestFactory()
+        calls = (
+            (PaymentsView, {}),
+            (PaymentsPeriodView, {"time_period": "2024-01-01_2024-01-31"}),
+            (ServicePaymentsView, {"service_id": 1}),
+        )
+        for view, kwargs in calls:
+            with self.subTest(view=view.__name__):
+                request = factory.get("/api/v1/")
+                response = view.as_view()(request, user_id=user.id, **kwargs)
+                self.assertEqual(response.status_code, 404)
+
+
+class SpendRollupTests(TestCase):
+    def test_summary_matches_payments(self):
+        """
+        Сводка расходов по таблице SpendRollup совпадает с суммами
+        по платежам после пакетной вставки, вставки на границах
+        месяцев и удаления платежа.
+        """
+        seed = seed_user(3)
+        user_id = seed["user"].id
+        template = seed["payments"][0]
+        moments = (
+            local_midnight(date(2024, 2, 1)) - timedelta(microseconds=1),
+            local_midnight(date(2024, 2, 1)),
+            local_midnight(date(2024, 3, 1)) - timedelta(seconds=1),
+            local_midnight(date(2024, 3, 1)),
+        )
+        for number, moment in enumerate(moments, start=1):
+            with mock.patch("django.utils.timezone.now", return_value=moment):
+                Payment.objects.create(
+                    amount=number * 100,
+                    document=template.document,
+                    cashback_applied=template.cashback_applied,
+                    user_subscription=template.user_subscription,
+                    account_id=template.account_id,
+                )
+        seed["payments"][1].delete()
+
+        today = timezone.localdate()
+        this_month = month_start(today)
+        periods = (
+            (date(2024, 2, 1), date(2024, 2, 29)),
+            (date(2024, 1, 31), date(2024, 3, 1)),
+            (date(2024, 1, 1), date(2024, 3, 31)),
+            (date(2024, 2, 1), date(2024, 2, 1)),
+            (this_month, next_month(this_month) - timedelta(days=1)),
+            (date(2024, 1, 1), today),
+        )
+        for start, end in periods:
+            with self.subTest(start=start, end=end):
+                summary = spend_summary(user_id, start, end)
+                expected = Payment.objects.filter(
+                    account_id__user_id=user_id,
+                    date__gte=local_midnight(start),
+                    date__lt=local_midnight(end + timedelta(days=1)),
+                ).aggregate(
+                    amount=Sum("amount"),
+                    cashback=Sum("cashback_applied__amount"),
+                    payments=Count("id"),
+                )
+                self.assertEqual(summary["amount"], expected["amount"] or 0)
+                self.assertEqual(
+                    summary["cashback"], expected["cashback"] or 0
+                )
+                self.assertEqual(summary["payments"], expected["payments"])
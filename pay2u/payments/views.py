@@ -1,15 +1,30 @@
-from datetime import datetime
-
-from django.db.models import Q
+from django.http import StreamingHttpResponse
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from users.models import Account
+from api.cache import (
+    ACCOUNT_SCOPE,
+    PAYMENTS_CACHE,
+    PAYMENT_SCOPE,
+    USER_SCOPE,
+    cached_get
+)
+from api.conditional import versioned_get
+from api.counters import DOCUMENT_COUNTER
+from .export import CONTENT_TYPES, EXPORT_FORMATS, export_lines
 from .models import Document, Payment
-from .serializers import PaymentsSerializer, DocumentSerializer
+from .pagination import payments_response
+from .payloads import (
+    latest_document,
+    payment,
+    period_bounds,
+    spend,
+    user_payments
+)
 
 
+@cached_get(PAYMENTS_CACHE, ACCOUNT_SCOPE)
 class AccountPaymentView(APIView):
     def get(self, request, account_id: int) -> Response:
         """
@@ -21,19 +36,11 @@ class AccountPaymentView(APIView):
         Возвращает:
             Данные о платежах по указанному аккаунту.
         """
-        try:
-            payments = (
-                Payment.objects.filter(account_id=account_id)
-                .select_related("user_subscription__service_id")
-                .select_related("account_id")
-                .select_related("cashback_applied")
-            )
-            payments_data = PaymentsSerializer(payments, many=True).data
-            return Response(payments_data, status=status.HTTP_200_OK)
-        except Account.DoesNotExist:
-            return Response(status=status.HTTP_404_NOT_FOUND)
+        payments = Payment.objects.filter(account_id=account_id)
+        return payments_response(request, payments)
 
 
+@versioned_get(DOCUMENT_COUNTER)
 class DocumentView(APIView):
     def get(self, request):
         """
@@ -43,13 +50,13 @@ class DocumentView(APIView):
             Данные о платежах с указанным статусом ответа.
         """
         try:
-            document = Document.objects.latest("id")
+            document_data = latest_document()
         except Document.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
-        document_data = DocumentSerializer(document).data
         return Response(document_data, status=status.HTTP_200_OK)
 
 
+@cached_get(PAYMENTS_CACHE, USER_SCOPE)
 class PaymentsView(APIView):
     def get(self, request, user_id: int) -> Response:
         """
@@ -61,25 +68,39 @@ class PaymentsView(APIView):
         Возвращает:
             Данные о платежах по указанному идентификатору пользователя.
         """
-        try:
-            accounts = Account.objects.filter(user__id=user_id)
-            if not accounts:
-                raise status.HTTP_404_NOT_FOUND(
-                    "No Accounts found for the given user_id."
-                )
-            payments = Payment.objects.filter(
-                account_id__in=accounts
-            ).select_related(
-                "user_subscription__service_id",
-                "account_id",
-                "cashback_applied",
-            )
-            payments_data = PaymentsSerializer(payments, many=True).data
-            return Response(payments_data, status=status.HTTP_200_OK)
-        except Account.DoesNotExist:
+        payments = user_payments(user_id)
+        if payments is None:
             return Response(status=status.HTTP_404_NOT_FOUND)
+        return payments_response(request, payments)
+
+
+class PaymentsExportView(APIView):
+    def get(self, request, user_id: int, export_format: str):
+        """
+        Метод выгрузки всей истории платежей пользователя файлом.
+        Файл формируется потоком, память не зависит от объема истории.
 
+        Параметры:
+            user_id: идентификатор пользователя
+            export_format: csv или jsonl
 
+        Возвращает:
+            Файл с платежами и данными сервиса, счёта и кэшбэка.
+        """
+        if export_format not in EXPORT_FORMATS:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        payments = Payment.objects.filter(account_id__user_id=user_id)
+        response = StreamingHttpResponse(
+            export_lines(export_format, payments),
+            content_type=CONTENT_TYPES[export_format],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="payments-{user_id}.{export_format}"'
+        )
+        return response
+
+
+@cached_get(PAYMENTS_CACHE, USER_SCOPE)
 class PaymentsPeriodView(APIView):
     def get(self, request, user_id: int, time_period: str) -> Response:
         """
@@ -95,30 +116,18 @@ class PaymentsPeriodView(APIView):
             Данные о платежах с указанным статусом ответа.
         """
         try:
-            start_date_str, end_date_str = time_period.split("_")
-            start_date = datetime.strptime(start_date_str, "%Y-%m-%d")
-            end_date = datetime.strptime(end_date_str, "%Y-%m-%d")
-
-            accounts = Account.objects.filter(user__id=user_id)
-            if not accounts:
-                raise status.HTTP_404_NOT_FOUND(
-                    "No Accounts found for the given user_id."
-                )
-            payments = (
-                Payment.objects.filter(
-                    Q(account_id__in=accounts)
-                    & Q(date__range=(start_date, end_date))
-                )
-                .select_related("user_subscription__service_id")
-                .select_related("account_id")
-                .select_related("cashback_applied")
-            )
-            payments_data = PaymentsSerializer(payments, many=True).data
-            return Response(payments_data, status=status.HTTP_200_OK)
-        except Account.DoesNotExist:
+            bounds = period_bounds(time_period)
+        except ValueError:
+            return Response(status=status.HTTP_400_BAD_REQUEST)
+        payments = user_payments(user_id)
+        if payments is None:
             return Response(status=status.HTTP_404_NOT_FOUND)
+        return payments_response(
+            request, payments.filter(date__range=bounds)
+        )
 
 
+@cached_get(PAYMENTS_CACHE, PAYMENT_SCOPE)
 class PaymentView(APIView):
     def get(self, request, payment_id):
         """
@@ -130,20 +139,10 @@ class PaymentView(APIView):
         Возвращает:
             Данные о платеже с указанным статусом ответа.
         """
-        try:
-            payment = (
-                Payment.objects.filter(id=payment_id)
-                .select_related("user_subscription__service_id")
-                .select_related("account_id")
-                .select_related("cashback_applied")
-                .first()
-            )
-            payment_data = PaymentsSerializer(payment).data
-            return Response(payment_data, status=status.HTTP_200_OK)
-        except Payment.DoesNotExist:
-            return Response(status=status.HTTP_404_NOT_FOUND)
+        return Response(payment(payment_id), status=status.HTTP_200_OK)
 
 
+@cached_get(PAYMENTS_CACHE, USER_SCOPE)
 class ServicePaymentsView(APIView):
     def get(self, request, user_id: int, service_id: int) -> Response:
         """
@@ -157,19 +156,32 @@ class ServicePaymentsView(APIView):
         Возвращает:
             Данные о платежах с указанным статусом ответа.
         """
-        try:
-            accounts = Account.objects.filter(user__id=user_id)
-            if not accounts:
-                raise status.HTTP_404_NOT_FOUND(
-                    "No Accounts found for the given user_id."
-                )
-            payments = (
-                Payment.objects.filter(account_id__in=accounts)
-                .select_related("user_subscription__service_id")
-                .select_related("account_id")
-                .select_related("cashback_applied")
-            ).filter(user_subscription__service_id=service_id)
-            payments_data = PaymentsSerializer(payments, many=True).data
-            return Response(payments_data, status=status.HTTP_200_OK)
-        except Account.DoesNotExist:
+        payments = user_payments(user_id)
+        if payments is None:
             return Response(status=status.HTTP_404_NOT_FOUND)
+        return payments_response(
+            request,
+            payments.filter(user_subscription__service_id=service_id),
+        )
+
+
+@cached_get(PAYMENTS_CACHE, USER_SCOPE)
+class SpendSummaryView(APIView):
+    def get(self, request, user_id: int, time_period: str) -> Response:
+        """
+        Метод получения расходов пользователя по категориям и сервисам
+        за указанный период времени.
+
+        Параметры:
+            user_id: идентификатор пользователя
+            time_period: 2022-01-01_2022-01-31
+            (дата начала_дата конца, обе включительно)
+
+        Возвращает:
+            Суммы платежей и кэшбэка по категориям и сервисам.
+        """
+        try:
+            summary_data = spend(user_id, time_period)
+        except ValueError:
+            return Response(status=status.HTTP_400_BAD_REQUEST)
+        return Response(summary_data, status=status.HTTP_200_OK)
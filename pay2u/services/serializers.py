@@ -1,5 +1,6 @@
 from rest_framework import serializers
 
+from api.flat import Field, file_representation
 from .models import Service
 
 
@@ -7,3 +8,11 @@ class ServiceSerializer(serializers.ModelSerializer):
     class Meta:
         model = Service
         fields = ("id", "image", "name", "availability")
+
+
+SERVICE_FLAT_FIELDS = (
+    Field("id"),
+    Field("image", to_representation=file_representation(Service, "image")),
+    Field("name"),
+    Field("availability"),
+)
@@ -1,6 +1,12 @@
 from django.contrib import admin
 
-from .models import Subscription, TrialPeriod, AccessCode, UserSubscription
+from .models import (
+    AccessCode,
+    ServiceCatalog,
+    Subscription,
+    TrialPeriod,
+    UserSubscription
+)
 
 
 @admin.register(Subscription)
@@ -21,3 +27,8 @@ class UserSubscriptionAdmin(admin.ModelAdmin):
 @admin.register(AccessCode)
 class AccessCodeAdmin(admin.ModelAdmin):
     list_display = ("name", "end_date", "status")
+
+
+@admin.register(ServiceCatalog)
+class ServiceCatalogAdmin(admin.ModelAdmin):
+    list_display = ("service_name", "category_name", "min_price", "period")
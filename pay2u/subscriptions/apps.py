@@ -5,3 +5,6 @@ class SubscriptionsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'subscriptions'
     verbose_name = 'Подписки'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,148 @@
+from django.views import View
+
+from api.cache import SUBSCRIPTIONS_CACHE, USER_SCOPE, cached_get
+from api.renderers import json_response
+from .payloads import (
+    aactive_subscriptions,
+    ahome_page,
+    amain_page,
+    anonactive_subscriptions,
+    apayments_plan,
+    aservice_subscription,
+    asubscription_card,
+    auser_subscriptions
+)
+
+
+@cached_get(SUBSCRIPTIONS_CACHE, USER_SCOPE)
+class ActiveUserSubscriptionView(View):
+    async def get(self, request, user_id: int):
+        """
+        Метод получения данных об активных подписках пользователя.
+
+        Параметры:
+            user_id: идентификатор пользователя
+
+        Возвращает:
+            Данные о всех активных подписках пользователя.
+        """
+        return json_response(
+            await aactive_subscriptions(user_id)
+        )
+
+
+class HomePageView(View):
+    async def get(self, request, user_id: int):
+        """
+        Метод получения сводных данных для главного экрана приложения:
+        активные подписки, ближайшие списания, балансы счетов
+        и расходы с начала месяца.
+
+        Параметры:
+            user_id: идентификатор пользователя
+
+        Возвращает:
+            Сводные данные для главного экрана приложения.
+        """
+        return json_response(await ahome_page(user_id))
+
+
+@cached_get(SUBSCRIPTIONS_CACHE, USER_SCOPE)
+class MainPageView(View):
+    async def get(self, request, user_id: int):
+        """
+        Метод получения данных для главного экрана приложения.
+
+        Параметры:
+            user_id: идентификатор пользователя
+
+        Возвращает:
+            Данные для главного экрана приложения.
+        """
+        return json_response(await amain_page(user_id))
+
+
+@cached_get(SUBSCRIPTIONS_CACHE, USER_SCOPE)
+class NonActiveUserSubscriptionView(View):
+    async def get(self, request, user_id: int):
+        """
+        Метод получения данных о неактивных подписках пользователя.
+
+        Параметры:
+            user_id: идентификатор пользователя
+
+        Возвращает:
+            Данные о всех неактивных подписках пользователя.
+        """
+        return json_response(
+            await anonactive_subscriptions(user_id)
+        )
+
+
+@cached_get(SUBSCRIPTIONS_CACHE, USER_SCOPE)
+class ServiceUserSubscriptionsView(View):
+    async def get(self, request, user_id: int, service_id: int):
+        """
+        Метод получения данных о подписке пользователя по сервису.
+
+        Параметры:
+            user_id: идентификатор пользователя
+            service_id: идентификатор сервиса
+
+        Возвращает:
+            Данные о подписке пользователя по сервису.
+        """
+        return json_response(
+            await aservice_subscription(user_id, service_id)
+        )
+
+
+@cached_get(SUBSCRIPTIONS_CACHE, USER_SCOPE)
+class UserSubscriptionView(View):
+    async def get(self, request, subscription_id: int):
+        """
+        Метод получения данных о карточке активной подписки.
+
+        Параметры:
+            subscription_id: идентификатор активной подписки пользователя
+
+        Возвращает:
+            Данные о карточке активной подписки пользователя.
+        """
+        return json_response(
+            await asubscription_card(
+                request.user.pk, subscription_id
+            )
+        )
+
+
+@cached_get(SUBSCRIPTIONS_CACHE, USER_SCOPE)
+class UserSubscriptionsView(View):
+    async def get(self, request, user_id: int):
+        """
+        Метод получения данных о всех подписках пользователя.
+
+        Параметры:
+            user_id: идентификатор пользователя
+
+        Возвращает:
+            Данные о всех подписках пользователя.
+        """
+        return json_response(
+            await auser_subscriptions(user_id)
+        )
+
+
+@cached_get(SUBSCRIPTIONS_CACHE, USER_SCOPE)
+class UserPaymentsPlanView(View):
+    async def get(self, request, user_id: int):
+        """
+        Метод получения данных о ближайших платежах пользователя.
+
+        Параметры:
+            user_id: идентификатор пользователя
+
+        Возвращает:
+            Данные о всех ближайших платежах пользователя.
+        """
+        return json_response(await apayments_plan(user_id))
@@ -0,0 +1,104 @@
+from django.db import connection, transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.dispatch import Signal
+
+from .models import ServiceCatalog, Subscription
+
+# Отправляется после любого изменения строк витрины.
+catalog_changed = Signal()
+
+CATALOG_CHUNK_SIZE = 2000
+
+CATALOG_FIELDS = (
+    "service_id",
+    "service_id__name",
+    "service_id__image",
+    "service_id__popularity",
+    "service_id__category_id",
+    "service_id__category__name",
+    "price",
+    "period",
+    "cashback",
+    "trial_period__period_days",
+    "trial_period__period_cost",
+)
+
+
+def catalog_entry(plan: dict) -> ServiceCatalog:
+    return ServiceCatalog(
+        service_id=plan["service_id"],
+        service_name=plan["service_id__name"],
+        image=plan["service_id__image"],
+        min_price=plan["price"],
+        period=plan["period"],
+        cashback=plan["cashback"],
+        trial_period_days=plan["trial_period__period_days"],
+        trial_period_cost=plan["trial_period__period_cost"],
+        popularity=plan["service_id__popularity"],
+        category_id=plan["service_id__category_id"],
+        category_name=plan["service_id__category__name"],
+    )
+
+
+def cheapest_plans(service_ids=None):
+    """
+    Самые дешевые планы подписки каждого сервиса.
+    Выбор выполняется в БД: DISTINCT ON в PostgreSQL,
+    оконная функция ROW_NUMBER в остальных СУБД.
+    """
+    plans = Subscription.objects.all()
+    if service_ids is not None:
+        plans = plans.filter(service_id__in=service_ids)
+    if connection.features.can_distinct_on_fields:
+        plans = plans.order_by("service_id", "price", "id").distinct(
+            "service_id"
+        )
+    else:
+        plans = plans.annotate(
+            price_rank=Window(
+                RowNumber(),
+                partition_by=F("service_id"),
+                order_by=(F("price").asc(), F("id").asc()),
+            )
+        ).filter(price_rank=1).order_by("service_id")
+    return plans.values(*CATALOG_FIELDS)
+
+
+def _write_entries(plans) -> int:
+    count = 0
+    batch = []
+    for plan in plans.iterator(chunk_size=CATALOG_CHUNK_SIZE):
+        batch.append(catalog_entry(plan))
+        if len(batch) == CATALOG_CHUNK_SIZE:
+            ServiceCatalog.objects.bulk_create(batch)
+            count += len(batch)
+            batch = []
+    ServiceCatalog.objects.bulk_create(batch)
+    return count + len(batch)
+
+
+def refresh_service_catalog(service_ids):
+    """
+    Пересчитывает строки витрины для указанных сервисов.
+    Сервисы без планов подписки удаляются из витрины.
+    """
+    service_ids = set(service_ids)
+    with transaction.atomic():
+        ServiceCatalog.objects.filter(service_id__in=service_ids).delete()
+        _write_entries(cheapest_plans(service_ids))
+        catalog_changed.send(sender=ServiceCatalog)
+
+
+def rebuild_service_catalog() -> int:
+    """
+    Полностью перестраивает витрину сервисов.
+
+    Возвращает:
+        Количество строк витрины.
+    """
+    with transaction.atomic():
+        ServiceCatalog.objects.all().delete()
+        count = _write_entries(cheapest_plans())
+        catalog_changed.send(sender=ServiceCatalog)
+    return count
@@ -0,0 +1,32 @@
+from django.db import transaction
+from django.utils import timezone
+
+from api.cache import invalidate_users_on_commit
+from .models import UserSubscription
+
+
+def expire_subscriptions(chunk_size: int = 1000) -> int:
+    """
+    Переводит в неактивные подписки, срок которых истек.
+    Обновление идет пачками по chunk_size строк, каждая
+    в своей короткой транзакции.
+
+    Возвращает:
+        Количество деактивированных подписок.
+    """
+    expired = 0
+    while True:
+        with transaction.atomic():
+            due = dict(
+                UserSubscription.objects.filter(
+                    status=True, end__lt=timezone.now()
+                )
+                .select_for_update(skip_locked=True)
+                .values_list("id", "user_id")[:chunk_size]
+            )
+            if not due:
+                return expired
+            expired += UserSubscription.objects.filter(
+                id__in=list(due)
+            ).update(status=False)
+            invalidate_users_on_commit(due.values())
@@ -0,0 +1,113 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Min
+
+from services.models import Category, Service
+from subscriptions.catalog import cheapest_plans
+from subscriptions.models import Subscription
+
+
+def legacy_min_price_plans():
+    """
+    Прежний способ: GROUP BY по всем планам и отбор в Python.
+    """
+    lowest_prices = (
+        Subscription.objects.values(
+            "service_id__name",
+            "service_id__image",
+            "period",
+            "cashback",
+            "trial_period__period_days",
+            "trial_period__period_cost",
+            "service_id__popularity",
+            "service_id__category_id",
+            "service_id__category_id__name",
+        )
+        .annotate(Min("price"))
+        .order_by("service_id")
+    )
+    unique_subscriptions = []
+    seen_services = set()
+    for subscription in lowest_prices:
+        service_name = subscription["service_id__name"]
+        if service_name not in seen_services:
+            unique_subscriptions.append(subscription)
+            seen_services.add(service_name)
+        elif subscription["price__min"] < unique_subscriptions[-1][
+            "price__min"
+        ]:
+            unique_subscriptions[-1] = subscription
+    return unique_subscriptions
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает отбор минимальной цены в БД с прежним отбором в Python "
+        "на синтетическом каталоге. Данные откатываются после замера."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--services", type=int, default=10_000)
+        parser.add_argument("--plans", type=int, default=20)
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options["services"], options["plans"])
+            legacy = self.measure(legacy_min_price_plans, options["repeat"])
+            builder = self.measure(
+                lambda: list(cheapest_plans()), options["repeat"]
+            )
+            transaction.set_rollback(True)
+        self.stdout.write(
+            f"{options['services']} сервисов x {options['plans']} планов\n"
+            f"python: {legacy * 1000:.0f} мс\n"
+            f"sql:    {builder * 1000:.0f} мс\n"
+            f"x{legacy / builder:.1f}"
+        )
+
+    def seed(self, services, plans):
+        category = Category.objects.create(name="bench")
+        Service.objects.bulk_create(
+            Service(
+                name=f"bench-{number}",
+                image="services/images/bench.png",
+                description="",
+                conditions="",
+                website="https://example.com",
+                instruction="",
+                rules="",
+                category=category,
+            )
+            for number in range(services)
+        )
+        service_ids = Service.objects.filter(category=category).values_list(
+            "id", flat=True
+        )
+        Subscription.objects.bulk_create(
+            (
+                Subscription(
+                    name=f"bench-{service_id}-{plan}",
+                    availability=True,
+                    price=(service_id * 7 + plan * 13) % 1000,
+                    period=30,
+                    cashback=plan % 10,
+                    service_id_id=service_id,
+                    activation_method="Телефон",
+                )
+                for service_id in service_ids
+                for plan in range(plans)
+            ),
+            batch_size=5000,
+        )
+
+    def measure(self, query, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            query()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
@@ -0,0 +1,93 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.benchmarks import bench_database, run_concurrently
+from services.models import Category, Service
+from subscriptions.models import Subscription, UserSubscription
+from subscriptions.purchases import purchase_subscription
+from users.ledger import account_balance, credit
+from users.models import Account, LedgerEntry, User
+
+
+class Command(BaseCommand):
+    help = (
+        "Параллельные покупки подписок с одного счёта: покупки в секунду "
+        "и проверка, что баланс не уходит в минус. Запускается "
+        "в отдельной тестовой БД. Рассчитан на PostgreSQL: SQLite "
+        "сериализует запись и отвечает ошибками блокировки."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--purchases", type=int, default=200)
+        parser.add_argument("--price", type=int, default=10)
+        parser.add_argument(
+            "--balance",
+            type=int,
+            default=None,
+            help="Начальный баланс; по умолчанию хватает на половину покупок.",
+        )
+
+    def handle(self, *args, **options):
+        threads = options["threads"]
+        purchases = options["purchases"]
+        price = options["price"]
+        balance = options["balance"]
+        if balance is None:
+            balance = price * threads * purchases // 2
+        with bench_database():
+            user, account, subscription = self.create_fixture(price, balance)
+            results, elapsed = run_concurrently(
+                threads,
+                purchases,
+                lambda step: purchase_subscription(
+                    user.id, subscription, account.id
+                ),
+            )
+            final_balance = account_balance(account.id)
+            active = UserSubscription.objects.filter(
+                user_id=user, status=True
+            ).count()
+
+        total = threads * purchases
+        self.stdout.write(
+            f"потоков: {threads}, попыток: {total}, за {elapsed:.2f} с\n"
+            f"успешно: {results['ok']}, отказано: {results['declined']}, "
+            f"ошибок БД: {results['errors']}\n"
+            f"покупок в секунду: {results['ok'] / elapsed:.0f}, "
+            f"попыток в секунду: {total / elapsed:.0f}\n"
+            f"баланс: {balance} -> {final_balance}, "
+            f"активных подписок: {active}"
+        )
+        if final_balance < 0:
+            raise CommandError("Баланс ушел в минус.")
+        if final_balance != balance - price * results["ok"]:
+            raise CommandError("Потеряны списания: баланс не сходится.")
+        if results["ok"] and active != 1:
+            raise CommandError("Ожидалась одна активная подписка.")
+
+    def create_fixture(self, price, balance):
+        user = User.objects.create_user(
+            phone="bench", email="bench@example.com", password="bench"
+        )
+        account = Account.objects.create(user=user)
+        credit(account.id, balance, LedgerEntry.TOPUP)
+        service = Service.objects.create(
+            name="bench",
+            image="services/images/bench.png",
+            description="",
+            conditions="",
+            website="https://example.com",
+            instruction="",
+            rules="",
+            category=Category.objects.create(name="bench"),
+        )
+        subscription = Subscription.objects.create(
+            name="bench",
+            availability=True,
+            price=price,
+            period=30,
+            cashback=0,
+            service_id=service,
+            activation_method="Телефон",
+        )
+        return user, account, subscription
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from subscriptions.expiry import expire_subscriptions
+
+
+class Command(BaseCommand):
+    help = "Деактивирует подписки пользователей с истекшим сроком."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        expired = expire_subscriptions(options["chunk_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Деактивировано подписок: {expired}.")
+        )
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from subscriptions.catalog import rebuild_service_catalog
+
+
+class Command(BaseCommand):
+    help = "Перестраивает витрину сервисов с минимальными ценами."
+
+    def handle(self, *args, **options):
+        count = rebuild_service_catalog()
+        self.stdout.write(
+            self.style.SUCCESS(f"Витрина перестроена: {count} сервисов.")
+        )
@@ -0,0 +1,56 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from payments.models import Document
+from subscriptions.renewal import RenewalStats, renew_subscriptions
+
+
+class Command(BaseCommand):
+    help = (
+        "Продлевает подписки с автопродлением, срок которых истекает "
+        "в ближайшие --horizon-hours часов. Можно запускать несколько "
+        "процессов одновременно: занятые строки пропускаются."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--horizon-hours", type=int, default=24)
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Количество параллельных обработчиков в этом процессе.",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=None,
+            help="Максимум подписок на обработчик за запуск.",
+        )
+
+    def handle(self, *args, **options):
+        if not Document.objects.exists():
+            raise CommandError("Нет документа с правилами для платежей.")
+        horizon = timedelta(hours=options["horizon_hours"])
+
+        def worker(_):
+            try:
+                return renew_subscriptions(
+                    horizon, options["chunk_size"], options["limit"]
+                )
+            finally:
+                connection.close()
+
+        total = RenewalStats()
+        with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+            for stats in pool.map(worker, range(options["workers"])):
+                total.merge(stats)
+        self.stdout.write(
+            f"продлено: {total.renewed}, отказано: {total.declined}, "
+            f"списано: {total.charged}, пачек: {total.chunks}\n"
+            f"время: {total.elapsed:.2f} с, "
+            f"продлений в секунду: {total.rate:.0f}"
+        )
@@ -0,0 +1,67 @@
+# Generated by Django 5.0.3 on 2026-10-17 17:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_service_catalog(apps, schema_editor):
+    Subscription = apps.get_model("subscriptions", "Subscription")
+    ServiceCatalog = apps.get_model("subscriptions", "ServiceCatalog")
+    plans = Subscription.objects.select_related(
+        "service_id__category", "trial_period"
+    ).order_by("service_id", "price", "id")
+    entries = {}
+    for plan in plans:
+        if plan.service_id_id in entries:
+            continue
+        service = plan.service_id
+        trial = plan.trial_period
+        entries[service.id] = ServiceCatalog(
+            service_id=service.id,
+            service_name=service.name,
+            image=service.image.name,
+            min_price=plan.price,
+            period=plan.period,
+            cashback=plan.cashback,
+            trial_period_days=trial.period_days if trial else None,
+            trial_period_cost=trial.period_cost if trial else None,
+            popularity=service.popularity,
+            category_id=service.category_id,
+            category_name=service.category.name,
+        )
+    ServiceCatalog.objects.bulk_create(entries.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0002_alter_category_options_alter_service_options_and_more'),
+        ('subscriptions', '0012_alter_usersubscription_access_code_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ServiceCatalog',
+            fields=[
+                ('service', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='catalog', serialize=False, to='services.service')),
+                ('service_name', models.CharField(db_index=True, max_length=32)),
+                ('image', models.CharField(max_length=100)),
+                ('min_price', models.IntegerField()),
+                ('period', models.IntegerField()),
+                ('cashback', models.IntegerField()),
+                ('trial_period_days', models.IntegerField(blank=True, null=True)),
+                ('trial_period_cost', models.IntegerField(blank=True, null=True)),
+                ('popularity', models.IntegerField(default=0)),
+                ('category_name', models.CharField(db_index=True, max_length=20)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='catalog', to='services.category')),
+            ],
+            options={
+                'verbose_name': 'Витрина сервиса',
+                'verbose_name_plural': 'Витрина сервисов',
+                'ordering': ('service_id',),
+            },
+        ),
+        migrations.RunPython(
+            fill_service_catalog, migrations.RunPython.noop
+        ),
+    ]
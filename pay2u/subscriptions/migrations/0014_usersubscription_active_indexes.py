@@ -0,0 +1,23 @@
+# Generated by Django 5.0.3 on 2026-10-17 17:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0013_servicecatalog'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='usersubscription',
+            index=models.Index(condition=models.Q(('status', True)), fields=['user_id', 'end'], name='usersub_active_user_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usersubscription',
+            index=models.Index(condition=models.Q(('status', True)), fields=['end'], name='usersub_active_end_idx'),
+        ),
+    ]
@@ -87,6 +87,49 @@ class UserSubscription(models.Model):
     class Meta:
         verbose_name = "Подписка пользователя"
         verbose_name_plural = "Подписки пользователей"
+        indexes = [
+            models.Index(
+                fields=["user_id", "end"],
+                condition=models.Q(status=True),
+                name="usersub_active_user_end_idx",
+            ),
+            models.Index(
+                fields=["end"],
+                condition=models.Q(status=True),
+                name="usersub_active_end_idx",
+            ),
+        ]
 
     def __str__(self):
         return str(self.id)
+
+
+class ServiceCatalog(models.Model):
+    service = models.OneToOneField(
+        "services.Service",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="catalog",
+    )
+    service_name = models.CharField(max_length=32, db_index=True)
+    image = models.CharField(max_length=100)
+    min_price = models.IntegerField()
+    period = models.IntegerField()
+    cashback = models.IntegerField()
+    trial_period_days = models.IntegerField(blank=True, null=True)
+    trial_period_cost = models.IntegerField(blank=True, null=True)
+    popularity = models.IntegerField(default=0)
+    category = models.ForeignKey(
+        "services.Category",
+        on_delete=models.CASCADE,
+        related_name="catalog",
+    )
+    category_name = models.CharField(max_length=20, db_index=True)
+
+    class Meta:
+        ordering = ("service_id",)
+        verbose_name = "Витрина сервиса"
+        verbose_name_plural = "Витрина сервисов"
+
+    def __str__(self):
+        return self.service_name
@@ -0,0 +1,206 @@
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from payments.models import Payment
+from users.models import Account
+from .models import UserSubscription
+from .serializers import (
+    FLAT_MAIN_PAGE,
+    FLAT_PAYMENTS_PLAN,
+    FLAT_USER_SUBSCRIPTION,
+    FLAT_USER_SUBSCRIPTIONS,
+    HomePageSerializer,
+    UserSubscriptionSerializer
+)
+
+# Данные ответов о подписках пользователя. Запросы строятся общими
+# функциями, синхронные представления выполняют их обычным ORM,
+# асинхронные (функции с префиксом a) - через async ORM.
+
+CARD_RELATED = (
+    "subscription__service_id",
+    "subscription__trial_period",
+    "access_code",
+)
+UPCOMING_CHARGES_LIMIT = 5
+
+
+def active_query(user_id: int):
+    return UserSubscription.objects.filter(user_id=user_id, status=True)
+
+
+def nonactive_query(user_id: int):
+    return UserSubscription.objects.filter(user_id=user_id, status=False)
+
+
+def main_page_query(user_id: int):
+    return active_query(user_id).order_by("end")
+
+
+def user_subscriptions_query(user_id: int):
+    return UserSubscription.objects.filter(user_id=user_id).order_by(
+        "status"
+    )
+
+
+def payments_plan_query(user_id: int):
+    return UserSubscription.objects.filter(user_id=user_id).order_by("-end")
+
+
+def active_subscriptions(user_id: int) -> list:
+    return FLAT_USER_SUBSCRIPTION.serialize(active_query(user_id))
+
+
+async def aactive_subscriptions(user_id: int) -> list:
+    return await FLAT_USER_SUBSCRIPTION.aserialize(active_query(user_id))
+
+
+def nonactive_subscriptions(user_id: int) -> list:
+    return FLAT_USER_SUBSCRIPTION.serialize(nonactive_query(user_id))
+
+
+async def anonactive_subscriptions(user_id: int) -> list:
+    return await FLAT_USER_SUBSCRIPTION.aserialize(nonactive_query(user_id))
+
+
+def main_page(user_id: int) -> list:
+    return FLAT_MAIN_PAGE.serialize(main_page_query(user_id))
+
+
+async def amain_page(user_id: int) -> list:
+    return await FLAT_MAIN_PAGE.aserialize(main_page_query(user_id))
+
+
+def user_subscriptions(user_id: int) -> list:
+    return FLAT_USER_SUBSCRIPTIONS.serialize(
+        user_subscriptions_query(user_id)
+    )
+
+
+async def auser_subscriptions(user_id: int) -> list:
+    return await FLAT_USER_SUBSCRIPTIONS.aserialize(
+        user_subscriptions_query(user_id)
+    )
+
+
+def payments_plan(user_id: int) -> list:
+    return FLAT_PAYMENTS_PLAN.serialize(payments_plan_query(user_id))
+
+
+async def apayments_plan(user_id: int) -> list:
+    return await FLAT_PAYMENTS_PLAN.aserialize(payments_plan_query(user_id))
+
+
+def service_subscription_query(user_id: int, service_id: int):
+    return UserSubscription.objects.select_related(*CARD_RELATED).filter(
+        user_id=user_id, subscription__service_id=service_id
+    )
+
+
+def service_subscription(user_id: int, service_id: int) -> dict:
+    """
+    Карточка первой подписки пользователя по сервису.
+    """
+    return UserSubscriptionSerializer(
+        service_subscription_query(user_id, service_id).first()
+    ).data
+
+
+async def aservice_subscription(user_id: int, service_id: int) -> dict:
+    return UserSubscriptionSerializer(
+        await service_subscription_query(user_id, service_id).afirst()
+    ).data
+
+
+def subscription_card_query(user_id: int, subscription_id: int):
+    return UserSubscription.objects.select_related(*CARD_RELATED).filter(
+        user_id=user_id, id=subscription_id
+    )
+
+
+def subscription_card(user_id: int, subscription_id: int) -> dict:
+    """
+    Карточка подписки subscription_id, если она принадлежит пользователю.
+    """
+    return UserSubscriptionSerializer(
+        subscription_card_query(user_id, subscription_id).first()
+    ).data
+
+
+async def asubscription_card(user_id: int, subscription_id: int) -> dict:
+    return UserSubscriptionSerializer(
+        await subscription_card_query(user_id, subscription_id).afirst()
+    ).data
+
+
+def home_page_queries(user_id: int):
+    """
+    Запросы главного экрана: активные подписки, балансы счетов
+    и расходы с начала месяца, и начало месяца.
+    """
+    active = (
+        active_query(user_id)
+        .select_related(
+            "subscription__service_id",
+            "subscription__trial_period",
+        )
+        .order_by("end")
+    )
+    accounts = Account.objects.with_balance().filter(
+        user_id=user_id
+    ).order_by("id")
+    month_start = timezone.localtime().replace(
+        day=1, hour=0, minute=0, second=0, microsecond=0
+    )
+    payments = Payment.objects.filter(
+        account_id__user_id=user_id, date__gte=month_start
+    )
+    return active, accounts, payments, month_start
+
+
+def home_page_data(active, accounts, spend, month_start) -> dict:
+    upcoming_charges = [
+        user_subscription
+        for user_subscription in active
+        if user_subscription.renewal
+    ][:UPCOMING_CHARGES_LIMIT]
+    return HomePageSerializer(
+        {
+            "active_subscriptions": active,
+            "upcoming_charges": upcoming_charges,
+            "accounts": accounts,
+            "month_to_date_spend": {
+                "since": month_start,
+                "amount": spend["amount"] or 0,
+                "payments": spend["payments"],
+            },
+        }
+    ).data
+
+
+def home_page(user_id: int) -> dict:
+    """
+    Сводные данные главного экрана: активные подписки, ближайшие
+    списания, балансы счетов и расходы с начала месяца.
+    Данные собираются тремя запросами независимо от количества
+    подписок и счетов пользователя.
+    """
+    active, accounts, payments, month_start = home_page_queries(user_id)
+    return home_page_data(
+        list(active),
+        list(accounts),
+        payments.aggregate(amount=Sum("amount"), payments=Count("id")),
+        month_start,
+    )
+
+
+async def ahome_page(user_id: int) -> dict:
+    active, accounts, payments, month_start = home_page_queries(user_id)
+    return home_page_data(
+        [user_subscription async for user_subscription in active],
+        [account async for account in accounts],
+        await payments.aaggregate(
+            amount=Sum("amount"), payments=Count("id")
+        ),
+        month_start,
+    )
@@ -0,0 +1,165 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from api.cache import invalidate_users_on_commit
+from users.ledger import debit
+from users.models import LedgerEntry, User
+from .models import Subscription, UserSubscription
+
+
+CREATED = "created"
+EXTENDED = "extended"
+REPLACED = "replaced"
+NOT_FOUND = "not_found"
+DUPLICATE_SERVICE = "duplicate_service"
+
+
+def purchase_subscription(
+        user_id: int,
+        subscription: Subscription,
+        account_id: int,
+) -> UserSubscription:
+    """
+    Оплачивает план подписки со счёта пользователя в одной транзакции.
+    Если подписка на этот план уже активна - продлевает.
+    Если активен другой план сервиса - заменяет.
+    Если подписки нет - создает новую.
+
+    Строка пользователя блокируется до конца транзакции, чтобы
+    параллельные покупки не создали две активные подписки.
+    Счёт другого пользователя - Account.DoesNotExist.
+    """
+    with transaction.atomic():
+        user = User.objects.select_for_update().get(id=user_id)
+        debit(
+            account_id, subscription.price, LedgerEntry.PURCHASE,
+            user_id=user.id,
+        )
+        active_subscription = (
+            UserSubscription.objects.filter(
+                user_id=user,
+                subscription__service_id=subscription.service_id_id,
+                status=True,
+            ).select_related("access_code").first()
+        )
+        now = timezone.now()
+        if active_subscription is not None:
+            if active_subscription.subscription_id == subscription.id:
+                active_subscription.end += timedelta(days=subscription.period)
+                active_subscription.save(update_fields=["end"])
+                active_subscription.subscription = subscription
+                return active_subscription
+            active_subscription.end = now
+            active_subscription.status = False
+            active_subscription.renewal = False
+            active_subscription.save(
+                update_fields=["end", "status", "renewal"]
+            )
+        return UserSubscription.objects.create(
+            user_id=user,
+            subscription=subscription,
+            status=True,
+            renewal=True,
+            activation=True,
+            start=now,
+            end=now + timedelta(days=subscription.period),
+            trial=False,
+        )
+
+
+def purchase_subscriptions(
+        user_id: int,
+        subscription_ids,
+        account_id: int,
+):
+    """
+    Оплачивает несколько планов подписки одним списанием.
+    Все планы проверяются одним запросом, подписки продлеваются,
+    заменяются или создаются пакетно в одной транзакции.
+
+    Возвращает:
+        Список результатов в порядке subscription_ids:
+        (subscription_id, результат, подписка пользователя или None).
+        Если денег не хватает на все планы, не списывается ничего.
+    """
+    with transaction.atomic():
+        user = User.objects.select_for_update().get(id=user_id)
+        plans = Subscription.objects.select_related(
+            "service_id", "trial_period"
+        ).in_bulk(subscription_ids)
+
+        errors = {}
+        selected = {}
+        for position, subscription_id in enumerate(subscription_ids):
+            plan = plans.get(subscription_id)
+            if plan is None:
+                errors[position] = NOT_FOUND
+            elif plan.service_id_id in selected:
+                errors[position] = DUPLICATE_SERVICE
+            else:
+                selected[plan.service_id_id] = plan
+        if not selected:
+            return [
+                (subscription_id, errors[position], None)
+                for position, subscription_id in enumerate(subscription_ids)
+            ]
+
+        total = sum(plan.price for plan in selected.values())
+        debit(account_id, total, LedgerEntry.PURCHASE, user_id=user.id)
+
+        active_subscriptions = {
+            active.subscription.service_id_id: active
+            for active in UserSubscription.objects.filter(
+                user_id=user,
+                subscription__service_id__in=list(selected),
+                status=True,
+            ).select_related("subscription", "access_code")
+        }
+        now = timezone.now()
+        outcome = {}
+        extended = []
+        replaced = []
+        created = []
+        for service_id, plan in selected.items():
+            active = active_subscriptions.get(service_id)
+            if active is not None and active.subscription_id == plan.id:
+                active.end += timedelta(days=plan.period)
+                active.subscription = plan
+                extended.append(active)
+                outcome[plan.id] = (EXTENDED, active)
+                continue
+            if active is not None:
+                active.end = now
+                active.status = False
+                active.renewal = False
+                replaced.append(active)
+            new_subscription = UserSubscription(
+                user_id=user,
+                subscription=plan,
+                status=True,
+                renewal=True,
+                activation=True,
+                start=now,
+                end=now + timedelta(days=plan.period),
+                trial=False,
+            )
+            created.append(new_subscription)
+            outcome[plan.id] = (
+                REPLACED if active is not None else CREATED,
+                new_subscription,
+            )
+        UserSubscription.objects.bulk_update(extended, ["end"])
+        UserSubscription.objects.bulk_update(
+            replaced, ["end", "status", "renewal"]
+        )
+        UserSubscription.objects.bulk_create(created)
+        invalidate_users_on_commit([user.id])
+
+    return [
+        (subscription_id, errors[position], None)
+        if position in errors
+        else (subscription_id, *outcome[subscription_id])
+        for position, subscription_id in enumerate(subscription_ids)
+    ]
@@ -0,0 +1,186 @@
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from api.cache import (
+    ACCOUNT_SCOPE,
+    invalidate_generations_on_commit,
+    invalidate_users_on_commit
+)
+from payments.models import CashbackApplied, Document, Payment
+from payments.rollups import add_payments
+from users.ledger import account_balances
+from users.models import Account, LedgerEntry, User
+from .models import UserSubscription
+
+
+@dataclass
+class RenewalStats:
+    renewed: int = 0
+    declined: int = 0
+    charged: int = 0
+    chunks: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def rate(self) -> float:
+        return self.renewed / self.elapsed if self.elapsed else 0.0
+
+    def merge(self, other: "RenewalStats") -> None:
+        self.renewed += other.renewed
+        self.declined += other.declined
+        self.charged += other.charged
+        self.chunks += other.chunks
+
+
+def cashback_amount(plan) -> int:
+    return plan.price * plan.cashback // 100
+
+
+def due_subscriptions(horizon: timedelta):
+    return UserSubscription.objects.filter(
+        renewal=True, status=True, end__lte=timezone.now() + horizon
+    )
+
+
+def renew_chunk(horizon: timedelta, after_id: int, chunk_size: int,
+                document: Document, stats: RenewalStats):
+    """
+    Продлевает одну пачку подписок, срок которых истекает в пределах
+    horizon.
+
+    Строки блокируются в том же порядке, что и при покупке:
+    пользователь, счёт, подписка пользователя. Пользователи, занятые
+    другими обработчиками или покупкой, пропускаются
+    (SELECT ... FOR UPDATE SKIP LOCKED).
+
+    Возвращает:
+        Идентификатор последней просмотренной подписки или None,
+        если подписок к продлению больше нет.
+    """
+    with transaction.atomic():
+        candidates = list(
+            due_subscriptions(horizon)
+            .filter(id__gt=after_id)
+            .order_by("id")
+            .values_list("id", "user_id")[:chunk_size]
+        )
+        if not candidates:
+            return None
+        user_ids = list(
+            User.objects.select_for_update(skip_locked=True)
+            .filter(id__in={user_id for _, user_id in candidates})
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+        funding_accounts = {}
+        for account in (
+            Account.objects.select_for_update()
+            .filter(user_id__in=user_ids, account_status=True)
+            .order_by("user_id", "id")
+        ):
+            funding_accounts.setdefault(account.user_id, account)
+        # Состояние подписок перечитывается под блокировкой:
+        # между выборкой кандидатов и блокировкой их могли изменить.
+        due = list(
+            due_subscriptions(horizon)
+            .filter(
+                id__in=[item_id for item_id, _ in candidates],
+                user_id__in=user_ids,
+            )
+            .select_related("subscription")
+            .select_for_update(of=("self",))
+            .order_by("id")
+        )
+        balances = account_balances(
+            [account.id for account in funding_accounts.values()]
+        )
+
+        renewed = []
+        charges = []
+        now = timezone.now()
+        for user_subscription in due:
+            plan = user_subscription.subscription
+            account = funding_accounts.get(user_subscription.user_id_id)
+            if account is None or balances[account.id] < plan.price:
+                stats.declined += 1
+                continue
+            balances[account.id] -= plan.price
+            # Просроченная подписка продлевается от текущего момента:
+            # пропущенные периоды не оплачиваются задним числом.
+            user_subscription.end = max(
+                user_subscription.end, now
+            ) + timedelta(days=plan.period)
+            user_subscription.trial = False
+            renewed.append(user_subscription)
+            charges.append((plan, account))
+
+        if renewed:
+            entries = []
+            for plan, account in charges:
+                entries.append(
+                    LedgerEntry(
+                        account=account,
+                        amount=-plan.price,
+                        kind=LedgerEntry.RENEWAL,
+                    )
+                )
+                if cashback_amount(plan):
+                    entries.append(
+                        LedgerEntry(
+                            account=account,
+                            amount=cashback_amount(plan),
+                            kind=LedgerEntry.CASHBACK,
+                        )
+                    )
+            LedgerEntry.objects.bulk_create(entries)
+            UserSubscription.objects.bulk_update(renewed, ["end", "trial"])
+            cashbacks = CashbackApplied.objects.bulk_create(
+                CashbackApplied(amount=cashback_amount(plan))
+                for plan, _ in charges
+            )
+            payments = Payment.objects.bulk_create(
+                Payment(
+                    amount=plan.price,
+                    document=document,
+                    cashback_applied=cashback,
+                    user_subscription=plan,
+                    account_id=account,
+                )
+                for (plan, account), cashback in zip(charges, cashbacks)
+            )
+            add_payments([payment.id for payment in payments])
+            invalidate_generations_on_commit(
+                ACCOUNT_SCOPE, [account.id for _, account in charges]
+            )
+            invalidate_users_on_commit(
+                item.user_id_id for item in renewed
+            )
+        stats.renewed += len(renewed)
+        stats.charged += sum(plan.price for plan, _ in charges)
+        stats.chunks += 1
+        return candidates[-1][0]
+
+
+def renew_subscriptions(horizon: timedelta, chunk_size: int = 1000,
+                        limit: int = None) -> RenewalStats:
+    """
+    Продлевает подписки с автопродлением пачками по chunk_size,
+    списывая стоимость с привязанного счёта пользователя.
+    Несколько обработчиков могут работать одновременно.
+    """
+    stats = RenewalStats()
+    document = Document.objects.latest("id")
+    after_id = 0
+    while limit is None or stats.renewed + stats.declined < limit:
+        after_id = renew_chunk(horizon, after_id, chunk_size, document, stats)
+        if after_id is None:
+            break
+    return stats
@@ -1,7 +1,15 @@
 from rest_framework import serializers
 
-from services.serializers import ServiceSerializer
-from .models import AccessCode, Subscription, TrialPeriod, UserSubscription
+from api.flat import FlatSerializer, Field, Nested, datetime_representation
+from services.serializers import SERVICE_FLAT_FIELDS, ServiceSerializer
+from users.serializers import AccountBalanceSerializer
+from .models import (
+    AccessCode,
+    ServiceCatalog,
+    Subscription,
+    TrialPeriod,
+    UserSubscription
+)
 
 
 class AccessCodeSerializer(serializers.ModelSerializer):
@@ -11,23 +19,10 @@ class AccessCodeSerializer(serializers.ModelSerializer):
 
 
 class AvailableServiceSerializer(serializers.ModelSerializer):
-    min_subscription_cost = serializers.IntegerField(source="price__min")
-    service_name = serializers.StringRelatedField(source="service_id__name")
-    image = serializers.StringRelatedField(source="service_id__image")
-    trial_period_days = serializers.IntegerField(
-        source="trial_period__period_days"
-    )
-    trial_period_cost = serializers.IntegerField(
-        source="trial_period__period_cost"
-    )
-    category_id = serializers.IntegerField(source="service_id__category_id")
-    category_name = serializers.StringRelatedField(
-        source="service_id__category_id__name"
-    )
-    popularity = serializers.IntegerField(source="service_id__popularity")
+    min_subscription_cost = serializers.IntegerField(source="min_price")
 
     class Meta:
-        model = Subscription
+        model = ServiceCatalog
         fields = (
             "service_name",
             "image",
@@ -141,3 +136,78 @@ class UserPaymentsPlanSerializer(serializers.ModelSerializer):
             "service",
             "end"
         )
+
+
+SUBSCRIPTION_FLAT_FIELDS = (
+    Field("id"),
+    Field("name"),
+    Field("availability"),
+    Field("price"),
+    Field("period"),
+    Field("cashback"),
+    Nested(
+        "trial",
+        "trial_period",
+        (Field("period_cost"), Field("period_days")),
+        null_source="id",
+    ),
+    Nested("service", "service_id", SERVICE_FLAT_FIELDS),
+)
+
+# Быстрые варианты сериализаторов подписок пользователя для списков.
+FLAT_MAIN_PAGE = FlatSerializer(
+    Nested(
+        "user_subscription",
+        None,
+        (
+            Field("id"),
+            Field("status"),
+            Field("activation"),
+            Field("renewal"),
+            Field("start", to_representation=datetime_representation),
+            Field("end", to_representation=datetime_representation),
+            Field("trial"),
+            Nested("subscription", "subscription", SUBSCRIPTION_FLAT_FIELDS),
+        ),
+    ),
+)
+FLAT_USER_SUBSCRIPTION = FlatSerializer(
+    Nested("user_subscription", "subscription", SUBSCRIPTION_FLAT_FIELDS),
+    Field("renewal"),
+    Field("end", to_representation=datetime_representation),
+    Field("trial"),
+    Nested(
+        "access_code",
+        "access_code",
+        (
+            Field("name"),
+            Field("end_date", to_representation=datetime_representation),
+        ),
+        null_source="id",
+    ),
+)
+FLAT_USER_SUBSCRIPTIONS = FlatSerializer(
+    Nested("user_subscription", "subscription", SUBSCRIPTION_FLAT_FIELDS),
+    Field("id"),
+    Field("status"),
+    Field("renewal"),
+    Field("end", to_representation=datetime_representation),
+)
+FLAT_PAYMENTS_PLAN = FlatSerializer(
+    Field("user_subscription_cost", "subscription__price"),
+    Nested("service", "subscription__service_id", SERVICE_FLAT_FIELDS),
+    Field("end", to_representation=datetime_representation),
+)
+
+
+class MonthToDateSpendSerializer(serializers.Serializer):
+    since = serializers.DateTimeField()
+    amount = serializers.IntegerField()
+    payments = serializers.IntegerField()
+
+
+class HomePageSerializer(serializers.Serializer):
+    active_subscriptions = MainPageSerializer(many=True)
+    upcoming_charges = UserPaymentsPlanSerializer(many=True)
+    accounts = AccountBalanceSerializer(many=True)
+    month_to_date_spend = MonthToDateSpendSerializer()
@@ -0,0 +1,58 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from services.models import Category, Service
+from .catalog import catalog_changed, refresh_service_catalog
+from .models import ServiceCatalog, Subscription, TrialPeriod
+
+
+@receiver(pre_save, sender=Subscription)
+def remember_previous_service(sender, instance, raw, **kwargs):
+    instance._previous_service_id = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_service_id = (
+        Subscription.objects.filter(pk=instance.pk)
+        .values_list("service_id", flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+def refresh_subscription_catalog(sender, instance, **kwargs):
+    if kwargs.get("raw"):
+        return
+    service_ids = {instance.service_id_id}
+    previous_service_id = getattr(instance, "_previous_service_id", None)
+    if previous_service_id is not None:
+        service_ids.add(previous_service_id)
+    refresh_service_catalog(service_ids)
+
+
+@receiver(post_save, sender=Service)
+def refresh_service(sender, instance, raw, **kwargs):
+    if raw:
+        return
+    refresh_service_catalog([instance.id])
+
+
+@receiver(post_save, sender=TrialPeriod)
+def refresh_trial_period(sender, instance, raw, **kwargs):
+    if raw:
+        return
+    refresh_service_catalog(
+        Subscription.objects.filter(trial_period=instance).values_list(
+            "service_id", flat=True
+        )
+    )
+
+
+@receiver(post_save, sender=Category)
+def refresh_category_name(sender, instance, raw, **kwargs):
+    if raw:
+        return
+    ServiceCatalog.objects.filter(category=instance).update(
+        category_name=instance.name
+    )
+    catalog_changed.send(sender=ServiceCatalog)
@@ -0,0 +1,57 @@
+from asgiref.sync import async_to_sync
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+
+from api.seeding import seed_user
+from . import payloads
+from .views import HomePageView
+
+# Активные подписки, счета с балансами и расходы с начала месяца.
+HOME_PAGE_QUERIES = 3
+
+
+class HomePageQueriesTests(TestCase):
+    def test_query_count_does_not_depend_on_data(self):
+        """
+        Сводка главного экрана строится одинаковым количеством
+        запросов при любом количестве подписок пользователя.
+        """
+        view = HomePageView.as_view()
+        factory = APIRequestFactory()
+        for size in (1, 10, 100):
+            with self.subTest(size=size):
+                user = seed_user(size)["user"]
+                request = factory.get(f"/api/v1/users/{user.id}/home/")
+                with self.assertNumQueries(HOME_PAGE_QUERIES):
+                    response = view(request, user_id=user.id)
+                    response.render()
+                self.assertEqual(response.status_code, 200)
+
+
+class AsyncPayloadsTests(TestCase):
+    def test_async_payloads_match_sync(self):
+        """
+        Асинхронные варианты данных ответов читают БД через async ORM
+        и совпадают с синхронными.
+        """
+        seed = seed_user(5)
+        user_id = seed["user"].id
+        calls = (
+            ("active_subscriptions", (user_id,)),
+            ("nonactive_subscriptions", (user_id,)),
+            ("main_page", (user_id,)),
+            ("user_subscriptions", (user_id,)),
+            ("payments_plan", (user_id,)),
+            ("service_subscription", (user_id, seed["services"][1].id)),
+            (
+                "subscription_card",
+                (user_id, seed["user_subscriptions"][1].id),
+            ),
+            ("home_page", (user_id,)),
+        )
+        for name, args in calls:
+            with self.subTest(payload=name):
+                self.assertEqual(
+                    async_to_sync(getattr(payloads, "a" + name))(*args),
+                    getattr(payloads, name)(*args),
+                )
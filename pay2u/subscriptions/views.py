@@ -2,15 +2,23 @@ from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import UserSubscription, Subscription
-from .serializers import (
-    MainPageSerializer,
-    UserPaymentsPlanSerializer,
-    UserSubscriptionSerializer,
-    UserSubscriptionsSerializer
+from api.cache import SUBSCRIPTIONS_CACHE, USER_SCOPE, cached_get
+from .models import UserSubscription
+from .payloads import (
+    CARD_RELATED,
+    active_subscriptions,
+    home_page,
+    main_page,
+    nonactive_subscriptions,
+    payments_plan,
+    service_subscription,
+    subscription_card,
+    user_subscriptions
 )
+from .serializers import UserSubscriptionSerializer
 
 
+@cached_get(SUBSCRIPTIONS_CACHE, USER_SCOPE)
 class ActiveUserSubscriptionView(APIView):
     def get(self, request, user_id: int) -> Response:
         """
@@ -22,19 +30,29 @@ class ActiveUserSubscriptionView(APIView):
         Возвращает:
             Данные о всех неактивных подписках пользователя.
         """
-        try:
-            user_subscription = UserSubscription.objects.select_related(
-                "subscription__service_id"
-            ).filter(user_id=user_id, status=True)
-        except Subscription.DoesNotExist:
-            return Response(status=status.HTTP_404_NOT_FOUND)
-        subscription_data = UserSubscriptionSerializer(
-            user_subscription, many=True, read_only=True
-        ).data
-        return Response(subscription_data, status=status.HTTP_200_OK)
+        return Response(
+            active_subscriptions(user_id), status=status.HTTP_200_OK
+        )
+
+
+class HomePageView(APIView):
+    def get(self, request, user_id: int) -> Response:
+        """
+        Метод получения сводных данных для главного экрана приложения:
+        активные подписки, ближайшие списания, балансы счетов
+        и расходы с начала месяца.
+
+        Параметры:
+            user_id: идентификатор пользователя
+
+        Возвращает:
+            Сводные данные для главного экрана приложения.
+        """
+        return Response(home_page(user_id), status=status.HTTP_200_OK)
 
 
-class MainPageView(APIView):  # ДОДЕЛАТЬ (один запрос в бд)
+@cached_get(SUBSCRIPTIONS_CACHE, USER_SCOPE)
+class MainPageView(APIView):
     def get(self, request, user_id):
         """
         Метод получения данных для главного экрана приложения.
@@ -45,22 +63,10 @@ class MainPageView(APIView):  # ДОДЕЛАТЬ (один запрос в бд)
         Возвращает:
             Данные для главного экрана приложения.
         """
-        try:
-            active_subs = (
-                UserSubscription.objects.filter(user_id=user_id, status=True)
-                .select_related(
-                    "subscription",
-                    "subscription__service_id",
-                    "subscription__trial_period",
-                )
-                .order_by("end")
-            )
-            active_subs_data = MainPageSerializer(active_subs, many=True).data
-            return Response(active_subs_data, status=status.HTTP_200_OK)
-        except UserSubscription.DoesNotExist:
-            return Response(status=status.HTTP_404_NOT_FOUND)
+        return Response(main_page(user_id), status=status.HTTP_200_OK)
 
 
+@cached_get(SUBSCRIPTIONS_CACHE, USER_SCOPE)
 class NonActiveUserSubscriptionView(APIView):
     def get(self, request, user_id: int) -> Response:
         """
@@ -72,18 +78,12 @@ class NonActiveUserSubscriptionView(APIView):
         Возвращает:
             Данные о всех неактивных подписках пользователя.
         """
-        try:
-            user_subscription = UserSubscription.objects.select_related(
-                "subscription__service_id"
-            ).filter(user_id=user_id, status=False)
-        except Subscription.DoesNotExist:
-            return Response(status=status.HTTP_404_NOT_FOUND)
-        subscription_data = UserSubscriptionSerializer(
-            user_subscription, many=True, read_only=True
-        ).data
-        return Response(subscription_data, status=status.HTTP_200_OK)
+        return Response(
+            nonactive_subscriptions(user_id), status=status.HTTP_200_OK
+        )
 
 
+@cached_get(SUBSCRIPTIONS_CACHE, USER_SCOPE)
 class ServiceUserSubscriptionsView(APIView):
     def get(self, request, user_id: int, service_id: int) -> Response:
         """
@@ -96,16 +96,13 @@ class ServiceUserSubscriptionsView(APIView):
         Возвращает:
             Данные о всех подписках пользователя по сервису.
         """
-        try:
-            user_subscriptions = UserSubscription.objects.filter(
-                user_id=user_id, subscription__service_id=service_id).first()
-        except UserSubscription.DoesNotExist:
-            return Response(status=status.HTTP_404_NOT_FOUND)
-        subscription_data = UserSubscriptionSerializer(
-            user_subscriptions, read_only=True).data
-        return Response(subscription_data, status=status.HTTP_200_OK)
+        return Response(
+            service_subscription(user_id, service_id),
+            status=status.HTTP_200_OK,
+        )
 
 
+@cached_get(SUBSCRIPTIONS_CACHE, USER_SCOPE)
 class UserSubscriptionView(APIView):
     def get(self, request, subscription_id: int) -> Response:
         """
@@ -117,18 +114,10 @@ class UserSubscriptionView(APIView):
         Возвращает:
             Данные о карточке активной подписки пользователя.
         """
-        try:
-            user_subscription = (
-                UserSubscription.objects.select_related(
-                    "subscription__service_id"
-                )
-                .filter(user_id=request.user, id=subscription_id)
-                .first()
-            )
-        except UserSubscription.DoesNotExist:
-            return Response(status=status.HTTP_404_NOT_FOUND)
-        subscription_data = UserSubscriptionSerializer(user_subscription).data
-        return Response(subscription_data, status=status.HTTP_200_OK)
+        return Response(
+            subscription_card(request.user.pk, subscription_id),
+            status=status.HTTP_200_OK,
+        )
 
 
 class UserSubscriptionRenewalView(APIView):
@@ -148,9 +137,9 @@ class UserSubscriptionRenewalView(APIView):
             Измененные данные активной подписки.
         """
         try:
-            user_subscription = UserSubscription.objects.get(
-                id=user_subscription_id
-            )
+            user_subscription = UserSubscription.objects.select_related(
+                *CARD_RELATED
+            ).get(id=user_subscription_id)
         except UserSubscription.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
         data = {
@@ -165,6 +154,7 @@ class UserSubscriptionRenewalView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@cached_get(SUBSCRIPTIONS_CACHE, USER_SCOPE)
 class UserSubscriptionsView(APIView):
     def get(self, request, user_id: int) -> Response:
         """
@@ -176,18 +166,12 @@ class UserSubscriptionsView(APIView):
         Возвращает:
             Данные о всех подписках пользователя.
         """
-        try:
-            user_subscriptions = UserSubscription.objects.select_related(
-                "subscription__service_id"
-            ).filter(user_id=user_id).order_by("status")
-        except UserSubscription.DoesNotExist:
-            return Response(status=status.HTTP_404_NOT_FOUND)
-        subscription_data = UserSubscriptionsSerializer(
-            user_subscriptions, many=True, read_only=True
-        ).data
-        return Response(subscription_data, status=status.HTTP_200_OK)
+        return Response(
+            user_subscriptions(user_id), status=status.HTTP_200_OK
+        )
 
 
+@cached_get(SUBSCRIPTIONS_CACHE, USER_SCOPE)
 class UserPaymentsPlanView(APIView):
     def get(self, request, user_id: int):
         """
@@ -199,13 +183,4 @@ class UserPaymentsPlanView(APIView):
         Возвращает:
             Данные о всех ближайших платежах пользователя.
         """
-        try:
-            upcoming_payments = UserSubscription.objects.filter(
-                user_id=user_id
-            ).order_by("-end")
-        except Subscription.DoesNotExist:
-            return Response(status=status.HTTP_404_NOT_FOUND)
-        upcoming_payments_data = UserPaymentsPlanSerializer(
-            upcoming_payments, many=True, read_only=True
-        ).data
-        return Response(upcoming_payments_data, status=status.HTTP_200_OK)
+        return Response(payments_plan(user_id), status=status.HTTP_200_OK)
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import User, Account
+from .models import User, Account, LedgerEntry
 
 
 @admin.register(User)
@@ -11,3 +11,23 @@ class UserAdmin(admin.ModelAdmin):
 @admin.register(Account)
 class AccountAdmin(admin.ModelAdmin):
     list_display = ("id", "account_number", "user", "balance")
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_balance()
+
+    @admin.display(description="Баланс", ordering="balance")
+    def balance(self, obj):
+        return obj.balance
+
+
+@admin.register(LedgerEntry)
+class LedgerEntryAdmin(admin.ModelAdmin):
+    list_display = ("id", "account", "amount", "kind", "created")
+    list_filter = ("kind",)
+    raw_id_fields = ("account",)
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
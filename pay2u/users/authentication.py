@@ -0,0 +1,152 @@
+import copy
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from rest_framework import authentication, exceptions
+
+from .models import User
+
+TOKEN_SALT = "users.authentication.token"
+TOKEN_PREFIX = "Bearer"
+INVALID_TOKEN = "Неверный или просроченный токен."
+
+DEFAULT_USER_PHONE = "7999999999"
+DEFAULT_USER_EMAIL = "default@example.com"
+DEFAULT_USER_PASSWORD = "a"
+
+_principals = {}
+_principals_lock = threading.Lock()
+_default_user_id = None
+
+
+def issue_token(user) -> str:
+    """
+    Подписанный токен пользователя. Токен не хранится в БД,
+    срок действия - AUTH_TOKEN_MAX_AGE секунд с момента выдачи.
+    """
+    return signing.dumps(user.id, salt=TOKEN_SALT)
+
+
+def principal(user_id: int):
+    """
+    Пользователь по идентификатору из кэша процесса.
+    Значение кэшируется на AUTH_PRINCIPAL_TTL секунд, каждый запрос
+    получает свою копию объекта.
+
+    Возвращает:
+        Пользователя или None, если пользователь не найден
+        или не активен.
+    """
+    cached = _principals.get(user_id)
+    now = time.monotonic()
+    if cached is None or now - cached[1] >= settings.AUTH_PRINCIPAL_TTL:
+        user = User.objects.filter(id=user_id, is_active=True).first()
+        cached = (user, now)
+        with _principals_lock:
+            _principals[user_id] = cached
+    return copy.copy(cached[0])
+
+
+async def aprincipal(user_id: int):
+    """
+    То же, что principal, для асинхронных представлений.
+    """
+    cached = _principals.get(user_id)
+    now = time.monotonic()
+    if cached is None or now - cached[1] >= settings.AUTH_PRINCIPAL_TTL:
+        user = await User.objects.filter(id=user_id, is_active=True).afirst()
+        cached = (user, now)
+        _principals[user_id] = cached
+    return copy.copy(cached[0])
+
+
+def forget_principal(user_id: int) -> None:
+    with _principals_lock:
+        _principals.pop(user_id, None)
+
+
+def default_user():
+    """
+    Пользователь для автоматического входа в режиме разработки.
+    Создается при первом обращении, если его нет.
+    """
+    global _default_user_id
+    if _default_user_id is None:
+        user = User.objects.filter(phone=DEFAULT_USER_PHONE).first()
+        if user is None:
+            user = User.objects.create_superuser(
+                phone=DEFAULT_USER_PHONE,
+                email=DEFAULT_USER_EMAIL,
+                password=DEFAULT_USER_PASSWORD,
+            )
+        _default_user_id = user.id
+    return principal(_default_user_id)
+
+
+async def adefault_user():
+    if _default_user_id is None:
+        await sync_to_async(default_user)()
+    return await aprincipal(_default_user_id)
+
+
+def token_user_id(request):
+    """
+    Идентификатор пользователя из заголовка Authorization: Bearer <token>.
+
+    Возвращает:
+        Идентификатор, None, если заголовка нет, или False,
+        если токен неверный или просрочен.
+    """
+    header = request.META.get("HTTP_AUTHORIZATION", "").split()
+    if not header or header[0] != TOKEN_PREFIX:
+        return None
+    if len(header) != 2:
+        return False
+    try:
+        return signing.loads(
+            header[1], salt=TOKEN_SALT, max_age=settings.AUTH_TOKEN_MAX_AGE
+        )
+    except signing.BadSignature:
+        return False
+
+
+def token_user(request):
+    """
+    Пользователь по токену из заголовка Authorization: Bearer <token>.
+
+    Возвращает:
+        Пользователя, None, если заголовка нет, или False,
+        если токен неверный, просрочен или пользователь не найден.
+    """
+    user_id = token_user_id(request)
+    if not user_id:
+        return user_id
+    return principal(user_id) or False
+
+
+async def atoken_user(request):
+    user_id = token_user_id(request)
+    if not user_id:
+        return user_id
+    return await aprincipal(user_id) or False
+
+
+class SignedTokenAuthentication(authentication.BaseAuthentication):
+    """
+    Аутентификация DRF по подписанному токену без обращения к сессии.
+    Токен передается явно в заголовке, поэтому CSRF не проверяется.
+    """
+
+    def authenticate(self, request):
+        user = token_user(request._request)
+        if user is None:
+            return None
+        if user is False:
+            raise exceptions.AuthenticationFailed(INVALID_TOKEN)
+        return user, None
+
+    def authenticate_header(self, request):
+        return TOKEN_PREFIX
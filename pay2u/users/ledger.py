@@ -0,0 +1,144 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Account, BalanceSnapshot, LedgerEntry
+
+
+class InsufficientFunds(Exception):
+    pass
+
+
+def account_balances(account_ids) -> dict:
+    """
+    Балансы счетов: снимок плюс операции журнала после него.
+
+    Возвращает:
+        Словарь {идентификатор счёта: баланс}.
+    """
+    return dict(
+        Account.objects.with_balance()
+        .filter(id__in=account_ids)
+        .values_list("id", "balance")
+    )
+
+
+def account_balance(account_id: int) -> int:
+    """
+    Баланс одного счёта.
+    Если счёта нет - выбрасывает Account.DoesNotExist.
+    """
+    balances = account_balances([account_id])
+    if account_id not in balances:
+        raise Account.DoesNotExist
+    return balances[account_id]
+
+
+def credit(account_id: int, amount: int, kind: str) -> LedgerEntry:
+    """
+    Зачисляет сумму на счёт. Зачисление не блокирует счёт:
+    в журнал добавляется одна строка.
+    """
+    return LedgerEntry.objects.create(
+        account_id=account_id, amount=amount, kind=kind
+    )
+
+
+def debit(account_id: int, amount: int, kind: str,
+          user_id: int = None) -> LedgerEntry:
+    """
+    Списывает сумму со счёта, если хватает средств.
+    Если задан user_id, списание возможно только со счёта этого
+    пользователя, чужой счёт - Account.DoesNotExist.
+
+    Списания по одному счёту выполняются по очереди: строка счёта
+    блокируется до конца транзакции, а баланс читается следующим
+    запросом, чтобы увидеть операции, зафиксированные до блокировки.
+    Сама строка счёта не изменяется.
+    """
+    accounts = Account.objects.select_for_update().filter(id=account_id)
+    if user_id is not None:
+        accounts = accounts.filter(user_id=user_id)
+    with transaction.atomic():
+        if not accounts.exists():
+            raise Account.DoesNotExist
+        if account_balance(account_id) < amount:
+            raise InsufficientFunds
+        return LedgerEntry.objects.create(
+            account_id=account_id, amount=-amount, kind=kind
+        )
+
+
+def compact_account(account_id: int, before: timedelta) -> int:
+    """
+    Переносит операции счёта старше before в снимок баланса.
+    Граница задается идентификатором: в снимок попадают все операции
+    до первой операции не старше before, поэтому операция с меньшим
+    идентификатором, но более поздним временем создания не окажется
+    ниже last_entry_id неучтенной.
+
+    Возвращает:
+        Количество операций, учтенных в новом снимке.
+    """
+    with transaction.atomic():
+        Account.objects.select_for_update().filter(id=account_id).exists()
+        snapshot, _ = BalanceSnapshot.objects.get_or_create(
+            account_id=account_id
+        )
+        entries = LedgerEntry.objects.filter(
+            account_id=account_id, id__gt=snapshot.last_entry_id
+        )
+        boundary = entries.filter(
+            created__gte=timezone.now() - before
+        ).aggregate(first=Min("id"))["first"]
+        if boundary is not None:
+            entries = entries.filter(id__lt=boundary)
+        rolled = entries.aggregate(
+            total=Sum("amount"), last=Max("id"), count=Count("id")
+        )
+        if not rolled["count"]:
+            return 0
+        snapshot.balance += rolled["total"]
+        snapshot.last_entry_id = rolled["last"]
+        snapshot.save(update_fields=["balance", "last_entry_id", "updated"])
+        return rolled["count"]
+
+
+def compact_ledger(min_entries: int = 100,
+                   before: timedelta = timedelta(minutes=5)):
+    """
+    Сворачивает журнал в снимки для счетов, у которых после
+    последнего снимка накопилось не меньше min_entries операций.
+
+    Сворачиваются только операции старше before: идентификаторы
+    выдаются до фиксации транзакции, и более свежая операция
+    с меньшим идентификатором могла бы не попасть в снимок.
+
+    Возвращает:
+        Кортеж (количество счетов, количество свернутых операций).
+    """
+    account_ids = (
+        Account.objects.annotate(
+            pending=Count(
+                "ledger_entries",
+                filter=Q(
+                    ledger_entries__id__gt=Coalesce(
+                        F("snapshot__last_entry_id"), 0
+                    )
+                ),
+            )
+        )
+        .filter(pending__gte=min_entries)
+        .values_list("id", flat=True)
+    )
+    accounts = 0
+    entries = 0
+    for account_id in list(account_ids):
+        rolled = compact_account(account_id, before)
+        if rolled:
+            accounts += 1
+            entries += rolled
+    return accounts, entries
@@ -0,0 +1,53 @@
+import time
+
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from users.authentication import default_user, issue_token
+
+PATH = "/api/v1/token/"
+
+
+class Command(BaseCommand):
+    help = (
+        "Измеряет число запросов к БД, новые строки django_session "
+        "и время на запрос при автоматическом входе без cookie, "
+        "по подписанному токену и по сессии. Собственных запросов "
+        "у маршрута нет, поэтому все запросы относятся к авторизации."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+
+    def handle(self, *args, **options):
+        user = default_user()
+        token_client = Client(
+            HTTP_HOST="localhost",
+            HTTP_AUTHORIZATION=f"Bearer {issue_token(user)}",
+        )
+        session_client = Client(HTTP_HOST="localhost")
+        session_client.force_login(user)
+        scenarios = (
+            ("без cookie", lambda: Client(HTTP_HOST="localhost")),
+            ("токен", lambda: token_client),
+            ("сессия", lambda: session_client),
+        )
+        for name, client in scenarios:
+            client().get(PATH)
+            sessions = Session.objects.count()
+            queries = 0
+            started = time.perf_counter()
+            for _ in range(options["requests"]):
+                with CaptureQueriesContext(connection) as captured:
+                    response = client().get(PATH)
+                queries += len(captured)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{name}: ответ {response.status_code}, запросов к БД "
+                f"{queries / options['requests']:.2f} на запрос, "
+                f"новых сессий {Session.objects.count() - sessions}, "
+                f"{elapsed / options['requests'] * 1e3:.2f} мс на запрос"
+            )
@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.benchmarks import bench_database, run_concurrently
+from users.ledger import account_balance, compact_account, credit, debit
+from users.models import Account, LedgerEntry, User
+
+
+class Command(BaseCommand):
+    help = (
+        "Параллельные списания с одного «горячего» счёта по журналу "
+        "операций: списания в секунду и проверка баланса. Запускается "
+        "в отдельной тестовой БД. Рассчитан на PostgreSQL: SQLite "
+        "сериализует запись и отвечает ошибками блокировки."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--debits", type=int, default=500)
+        parser.add_argument("--amount", type=int, default=10)
+        parser.add_argument(
+            "--balance",
+            type=int,
+            default=None,
+            help="Начальный баланс; по умолчанию хватает на половину "
+                 "списаний.",
+        )
+        parser.add_argument(
+            "--compact-every",
+            type=int,
+            default=0,
+            help="Сворачивать журнал в снимок каждые N списаний "
+                 "(0 - не сворачивать).",
+        )
+
+    def handle(self, *args, **options):
+        threads = options["threads"]
+        debits = options["debits"]
+        amount = options["amount"]
+        compact_every = options["compact_every"]
+        balance = options["balance"]
+        if balance is None:
+            balance = amount * threads * debits // 2
+        with bench_database():
+            account = self.create_fixture(balance)
+
+            def attempt(step):
+                if compact_every and step % compact_every == 0:
+                    compact_account(account.id, timedelta(0))
+                debit(account.id, amount, LedgerEntry.PURCHASE)
+
+            results, elapsed = run_concurrently(threads, debits, attempt)
+            final_balance = account_balance(account.id)
+            entries = LedgerEntry.objects.filter(account=account).count()
+
+        total = threads * debits
+        self.stdout.write(
+            f"потоков: {threads}, попыток: {total}, за {elapsed:.2f} с\n"
+            f"успешно: {results['ok']}, отказано: {results['declined']}, "
+            f"ошибок БД: {results['errors']}\n"
+            f"списаний в секунду: {results['ok'] / elapsed:.0f}, "
+            f"попыток в секунду: {total / elapsed:.0f}\n"
+            f"баланс: {balance} -> {final_balance}, "
+            f"операций в журнале: {entries}"
+        )
+        if final_balance < 0:
+            raise CommandError("Баланс ушел в минус.")
+        if final_balance != balance - amount * results["ok"]:
+            raise CommandError("Потеряны списания: баланс не сходится.")
+
+    def create_fixture(self, balance):
+        user = User.objects.create_user(
+            phone="bench", email="bench@example.com", password="bench"
+        )
+        account = Account.objects.create(user=user)
+        credit(account.id, balance, LedgerEntry.TOPUP)
+        return account
@@ -0,0 +1,34 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from users.ledger import compact_ledger
+
+
+class Command(BaseCommand):
+    help = "Сворачивает журнал операций по счетам в снимки балансов."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-entries",
+            type=int,
+            default=100,
+            help="Сколько операций после снимка нужно для свертки.",
+        )
+        parser.add_argument(
+            "--lag-seconds",
+            type=int,
+            default=300,
+            help="Операции моложе этого возраста не сворачиваются.",
+        )
+
+    def handle(self, *args, **options):
+        accounts, entries = compact_ledger(
+            options["min_entries"],
+            timedelta(seconds=options["lag_seconds"]),
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Счетов: {accounts}, свернуто операций: {entries}."
+            )
+        )
@@ -0,0 +1,77 @@
+# Generated by Django 5.0.3 on 2026-10-17 17:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def snapshot_balances(apps, schema_editor):
+    Account = apps.get_model("users", "Account")
+    BalanceSnapshot = apps.get_model("users", "BalanceSnapshot")
+    BalanceSnapshot.objects.bulk_create(
+        BalanceSnapshot(account_id=account_id, balance=balance)
+        for account_id, balance in Account.objects.values_list(
+            "id", "balance"
+        ).iterator()
+    )
+
+
+def restore_balances(apps, schema_editor):
+    Account = apps.get_model("users", "Account")
+    BalanceSnapshot = apps.get_model("users", "BalanceSnapshot")
+    LedgerEntry = apps.get_model("users", "LedgerEntry")
+    balances = {}
+    for snapshot in BalanceSnapshot.objects.iterator():
+        balances[snapshot.account_id] = snapshot.balance
+        balances[snapshot.account_id] += sum(
+            LedgerEntry.objects.filter(
+                account_id=snapshot.account_id,
+                id__gt=snapshot.last_entry_id,
+            ).values_list("amount", flat=True)
+        )
+    for account_id, balance in balances.items():
+        Account.objects.filter(id=account_id).update(balance=balance)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0013_account_account_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BalanceSnapshot',
+            fields=[
+                ('account', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='snapshot', serialize=False, to='users.account', verbose_name='Счёт')),
+                ('balance', models.IntegerField(default=0, verbose_name='Баланс')),
+                ('last_entry_id', models.BigIntegerField(default=0, verbose_name='Последняя учтенная операция')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='Обновлен')),
+            ],
+            options={
+                'verbose_name': 'Снимок баланса',
+                'verbose_name_plural': 'Снимки балансов',
+            },
+        ),
+        migrations.CreateModel(
+            name='LedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('amount', models.IntegerField(verbose_name='Сумма')),
+                ('kind', models.CharField(choices=[('purchase', 'Покупка подписки'), ('renewal', 'Продление подписки'), ('cashback', 'Кэшбэк'), ('topup', 'Пополнение')], max_length=20, verbose_name='Тип операции')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Создана')),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.RESTRICT, related_name='ledger_entries', to='users.account', verbose_name='Счёт')),
+            ],
+            options={
+                'verbose_name': 'Операция по счёту',
+                'verbose_name_plural': 'Операции по счетам',
+                'indexes': [models.Index(fields=['account', 'id'], name='ledger_account_id_idx')],
+            },
+        ),
+        migrations.RunPython(
+            snapshot_balances, restore_balances
+        ),
+        migrations.RemoveField(
+            model_name='account',
+            name='balance',
+        ),
+    ]
@@ -1,6 +1,9 @@
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager
 from django.db import models
 from django.contrib.auth.models import PermissionsMixin
+from django.db.models.functions import Coalesce
+
+from api.sequences import account_numbers
 
 
 class UserManager(BaseUserManager):
@@ -54,14 +57,28 @@ class User(AbstractBaseUser, PermissionsMixin):
 
 
 def increment_account_number():
-    last_account = Account.objects.all().order_by('id').last()
-    if not last_account:
-        return 'AN000001'
-    account_no = last_account.account_number
-    account_int = int(account_no.split('AN')[-1])
-    new_account_int = account_int + 1
-    new_account_no = 'AN' + str(new_account_int).zfill(4)
-    return new_account_no
+    return 'AN' + str(account_numbers.next()).zfill(4)
+
+
+class AccountQuerySet(models.QuerySet):
+    def with_balance(self):
+        """
+        Добавляет поле balance: снимок баланса плюс сумма
+        операций журнала, записанных после снимка.
+        """
+        entries_since_snapshot = (
+            LedgerEntry.objects.filter(
+                account=models.OuterRef("pk"),
+                id__gt=Coalesce(models.OuterRef("snapshot__last_entry_id"), 0),
+            )
+            .values("account")
+            .annotate(total=models.Sum("amount"))
+            .values("total")
+        )
+        return self.annotate(
+            balance=Coalesce(models.F("snapshot__balance"), 0)
+            + Coalesce(models.Subquery(entries_since_snapshot), 0)
+        )
 
 
 class Account(models.Model):
@@ -74,7 +91,6 @@ class Account(models.Model):
         blank=False,
         verbose_name="Пользователь",
     )
-    balance = models.IntegerField(default=0, verbose_name="Баланс")
     account_number = models.CharField(
         default=increment_account_number,
         max_length=20,
@@ -87,6 +103,7 @@ class Account(models.Model):
         blank=False,
         verbose_name="Статус привязки счёта"
     )
+    objects = AccountQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Счёт"
@@ -94,3 +111,63 @@ class Account(models.Model):
 
     def __str__(self):
         return self.account_number
+
+
+class LedgerEntry(models.Model):
+    PURCHASE = "purchase"
+    RENEWAL = "renewal"
+    CASHBACK = "cashback"
+    TOPUP = "topup"
+    KINDS = {
+        PURCHASE: "Покупка подписки",
+        RENEWAL: "Продление подписки",
+        CASHBACK: "Кэшбэк",
+        TOPUP: "Пополнение",
+    }
+
+    id = models.BigAutoField(primary_key=True)
+    account = models.ForeignKey(
+        Account,
+        on_delete=models.RESTRICT,
+        related_name="ledger_entries",
+        verbose_name="Счёт",
+    )
+    amount = models.IntegerField(verbose_name="Сумма")
+    kind = models.CharField(
+        max_length=20, choices=KINDS, verbose_name="Тип операции"
+    )
+    created = models.DateTimeField(auto_now_add=True, verbose_name="Создана")
+
+    class Meta:
+        verbose_name = "Операция по счёту"
+        verbose_name_plural = "Операции по счетам"
+        indexes = [
+            models.Index(
+                fields=["account", "id"], name="ledger_account_id_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.account_id}: {self.amount}"
+
+
+class BalanceSnapshot(models.Model):
+    account = models.OneToOneField(
+        Account,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="snapshot",
+        verbose_name="Счёт",
+    )
+    balance = models.IntegerField(default=0, verbose_name="Баланс")
+    last_entry_id = models.BigIntegerField(
+        default=0, verbose_name="Последняя учтенная операция"
+    )
+    updated = models.DateTimeField(auto_now=True, verbose_name="Обновлен")
+
+    class Meta:
+        verbose_name = "Снимок баланса"
+        verbose_name_plural = "Снимки балансов"
+
+    def __str__(self):
+        return f"{self.account_id}: {self.balance}"
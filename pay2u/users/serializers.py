@@ -7,3 +7,11 @@ class AccountSerializer(serializers.ModelSerializer):
     class Meta:
         model = Account
         fields = ("id", "account_number")
+
+
+class AccountBalanceSerializer(serializers.ModelSerializer):
+    balance = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Account
+        fields = ("id", "account_number", "account_status", "balance")
@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from django.db import transaction
+from django.db.models import Sum
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+
+from pay2u.middleware import AutoLoginMiddleware
+from .ledger import (
+    InsufficientFunds,
+    account_balance,
+    compact_account,
+    credit,
+    debit
+)
+from .models import Account, BalanceSnapshot, LedgerEntry, User
+
+
+class AutoLoginMiddlewareTests(TestCase):
+    def test_invalid_token_rejected_in_async_mode(self):
+        """
+        Неверный токен отклоняется, а не подменяется пользователем
+        по умолчанию.
+        """
+
+        async def get_response(request):
+            return HttpResponse()
+
+        middleware = AutoLoginMiddleware(get_response)
+        request = RequestFactory().get(
+            "/api/v1/rules/", HTTP_AUTHORIZATION="Bearer invalid"
+        )
+        response = async_to_sync(middleware)(request)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response["WWW-Authenticate"], "Bearer")
+
+
+class LedgerTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(
+            phone="ledger", email="ledger@example.com", password="ledger"
+        )
+        self.account = Account.objects.create(user=user)
+        credit(self.account.id, 100, LedgerEntry.TOPUP)
+
+    def test_overdraft_refused(self):
+        """
+        Списание больше баланса отклоняется без записи в журнал.
+        """
+        debit(self.account.id, 60, LedgerEntry.PURCHASE)
+        with self.assertRaises(InsufficientFunds):
+            debit(self.account.id, 60, LedgerEntry.PURCHASE)
+        self.assertEqual(account_balance(self.account.id), 40)
+        self.assertEqual(self.account.ledger_entries.count(), 2)
+
+    def test_debit_rolled_back_with_transaction(self):
+        """
+        Списание откатывается вместе с транзакцией покупки.
+        """
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                debit(self.account.id, 30, LedgerEntry.PURCHASE)
+                raise RuntimeError
+        self.assertEqual(account_balance(self.account.id), 100)
+
+    def test_balance_after_compaction(self):
+        """
+        После сворачивания баланс равен снимку плюс операциям после
+        него и сумме всех операций журнала.
+        """
+        debit(self.account.id, 30, LedgerEntry.PURCHASE)
+        credit(self.account.id, 20, LedgerEntry.TOPUP)
+        self.assertEqual(compact_account(self.account.id, timedelta(0)), 3)
+        debit(self.account.id, 5, LedgerEntry.PURCHASE)
+        snapshot = BalanceSnapshot.objects.get(account=self.account)
+        self.assertEqual(snapshot.balance, 90)
+        after = self.account.ledger_entries.filter(
+            id__gt=snapshot.last_entry_id
+        ).aggregate(total=Sum("amount"))["total"]
+        total = self.account.ledger_entries.aggregate(
+            total=Sum("amount")
+        )["total"]
+        self.assertEqual(account_balance(self.account.id), 85)
+        self.assertEqual(snapshot.balance + after, 85)
+        self.assertEqual(total, 85)
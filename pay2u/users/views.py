@@ -3,7 +3,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from .models import Account
-from .serializers import AccountSerializer
+from .serializers import AccountBalanceSerializer, AccountSerializer
 
 
 class AccountView(APIView):
@@ -15,7 +15,8 @@ class AccountView(APIView):
         account_status: статус привязки счёта
 
     Возвращает:
-        Данные о новом платежном счёте для указанного аккаунта.
+        Данные о новом платежном счёте для указанного аккаунта
+        с балансом по журналу операций.
     """
 
     def post(self, request, account_id: int, account_status: str) -> Response:
@@ -24,8 +25,12 @@ class AccountView(APIView):
         }
         serializer = AccountSerializer(data=data)
         if serializer.is_valid():
-            serializer.save(user=request.user)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            account = serializer.save(user=request.user)
+            account = Account.objects.with_balance().get(id=account.id)
+            return Response(
+                AccountBalanceSerializer(account).data,
+                status=status.HTTP_200_OK,
+            )
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def patch(
@@ -45,13 +50,13 @@ class AccountView(APIView):
             Изменение данных о платеже пользователя для указанного аккаунта.
         """
         try:
-            account_to_patch = Account.objects.get(
+            account_to_patch = Account.objects.with_balance().get(
                 user__id=request.user.id, id=account_id
             )
         except Account.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
         data = {"account_status": account_status}
-        serializer = AccountSerializer(
+        serializer = AccountBalanceSerializer(
             account_to_patch, data=data, partial=True
         )
         if serializer.is_valid():